@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+기관 색인
+Per-agency bid counts and last-seen dates maintained from ingested batches, with prefix/substring autocomplete
+
+저장소(BidStore)의 리스너로 붙어 배치마다 기관별 공고 수와 마지막 공고일을
+갱신한다. 색인은 같은 SQLite DB에 두므로 웹 워커, CLI(fetch --store, watch,
+backfill) 어느 프로세스가 반영해도 함께 쓰인다.
+
+- 조회: 프로세스마다 기관명(소문자) 순으로 정렬한 목록을 메모리에 두고
+  앞부분 일치는 bisect로, 부분 일치는 한 번 훑어서 찾는다 (앞부분 일치 먼저, 각각 공고 많은 순).
+- 기관명은 앞뒤 공백을 뺀 값(agency_name)으로 세며, 같은 함수를 SQLite 함수로도 등록해
+  재구성과 배치 반영이 같은 키를 쓴다.
+- 버전: 배치를 반영할 때마다 올라가는 번호. 다른 프로세스가 바꿨으면 다음 조회에서
+  정렬 목록을 다시 읽고, API는 이 값으로 ETag를 만든다.
+"""
+
+import bisect
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from bid_filter import INSTITUTION_FIELDS
+from bid_store import BidStore, IngestBatch
+from config import AGENCY_LIST_LIMIT, AGENCY_LIST_MAX
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agency_index (
+    institution TEXT NOT NULL,
+    name TEXT NOT NULL,
+    bid_count INTEGER NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (institution, name)
+);
+CREATE TABLE IF NOT EXISTS agency_index_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    generation TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+"""
+
+
+def agency_name(value) -> str:
+    """색인 키로 쓰는 기관명 (앞뒤 공백 제거)"""
+    return (value or '').strip()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더에 etag가 있는지 (약한 비교)"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(',')}
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+class _Sorted:
+    """기관 구분 하나의 정렬 목록"""
+
+    def __init__(self, rows: List[Tuple[str, int, str]]):
+        entries = sorted(((name.casefold(), name, count, last_seen) for name, count, last_seen in rows))
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+        self.by_count = sorted(entries, key=lambda entry: (-entry[2], entry[0]))
+
+
+class AgencyIndex:
+    """기관 색인 (BidStore와 같은 SQLite DB 사용, store.add_listener로 등록)"""
+
+    transactional = True   # 공고 저장과 같은 트랜잭션에서 갱신 (실패하면 배치가 롤백됨)
+
+    def __init__(self, store: BidStore):
+        self._store = store
+        self._lock = store.lock
+        self._loaded: Optional[Tuple[str, int]] = None
+        self._sorted: Dict[str, _Sorted] = {}
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+        with store.transaction():
+            # 색인이 없거나 공백을 빼지 않은 기관명으로 만든 색인이면 다시 만듦
+            missing = self._conn.execute('SELECT 1 FROM agency_index_meta').fetchone() is None
+            untrimmed = self._conn.execute(
+                'SELECT 1 FROM agency_index WHERE name != agency_name(name) LIMIT 1').fetchone()
+            if missing or untrimmed:
+                self.rebuild()
+
+    @property
+    def _conn(self):
+        # 연결이 새로 열릴 수 있으므로(fork된 워커) 쓸 때마다 등록
+        connection = self._store.connection
+        connection.create_function('agency_name', 1, agency_name, deterministic=True)
+        return connection
+
+    def rebuild(self) -> None:
+        """저장된 공고 전체로 색인을 다시 만듦 (색인이 없던 저장소를 처음 열 때)"""
+        with self._store.transaction():
+            self._conn.execute('DELETE FROM agency_index')
+            for institution, field in INSTITUTION_FIELDS.items():
+                self._conn.execute(
+                    f'INSERT INTO agency_index (institution, name, bid_count, last_seen)'
+                    f' SELECT ?, agency_name({field}) AS name, COUNT(*), MAX(substr(bidNtceDt, 1, 10)) FROM bids'
+                    f" WHERE name != '' GROUP BY name",
+                    (institution,)
+                )
+            self._conn.execute(
+                'INSERT OR REPLACE INTO agency_index_meta (id, generation, version)'
+                ' VALUES (1, ?, COALESCE((SELECT version FROM agency_index_meta WHERE id = 1), 0) + 1)',
+                (uuid.uuid4().hex[:8],)
+            )
+
+    def __call__(self, batch: IngestBatch) -> None:
+        """배치 반영 (새 공고는 +1, 기관이 바뀐 정정 공고는 이전 기관 -1, 이후 기관 +1)"""
+        counts: Counter = Counter()
+        last_seen: Dict[Tuple[str, str], str] = {}
+
+        def add(bid: Dict, delta: int) -> None:
+            for institution, field in INSTITUTION_FIELDS.items():
+                name = agency_name(bid.get(field))
+                if not name:
+                    continue
+                counts[(institution, name)] += delta
+                if delta > 0:
+                    seen = (bid.get('bidNtceDt') or '')[:10]
+                    last_seen[(institution, name)] = max(last_seen.get((institution, name), ''), seen)
+
+        for bid in batch.new:
+            add(bid, 1)
+        for before, after in batch.updated:
+            add(before, -1)
+            add(after, 1)
+
+        rows = [(institution, name, delta, last_seen.get((institution, name), ''))
+                for (institution, name), delta in counts.items()
+                if delta or (institution, name) in last_seen]
+        if not rows:
+            return
+        with self._store.transaction():
+            self._conn.executemany(
+                'INSERT INTO agency_index (institution, name, bid_count, last_seen) VALUES (?, ?, ?, ?)'
+                ' ON CONFLICT(institution, name) DO UPDATE SET'
+                ' bid_count = bid_count + excluded.bid_count,'
+                ' last_seen = MAX(last_seen, excluded.last_seen)',
+                rows
+            )
+            self._conn.execute('DELETE FROM agency_index WHERE bid_count <= 0')
+            self._conn.execute('UPDATE agency_index_meta SET version = version + 1 WHERE id = 1')
+
+    @property
+    def etag(self) -> str:
+        """색인 내용이 바뀌면 달라지는 ETag (따옴표 포함)"""
+        generation, version = self._version()
+        return f'"agencies-{generation}-{version}"'
+
+    def _version(self) -> Tuple[str, int]:
+        with self._lock:
+            row = self._conn.execute('SELECT generation, version FROM agency_index_meta WHERE id = 1').fetchone()
+        return (row['generation'], row['version']) if row else ('', 0)
+
+    def _current(self, institution: str) -> _Sorted:
+        version = self._version()
+        with self._lock:
+            if self._loaded != version:
+                rows: Dict[str, List] = {name: [] for name in INSTITUTION_FIELDS}
+                for row in self._conn.execute('SELECT institution, name, bid_count, last_seen FROM agency_index'):
+                    rows.setdefault(row['institution'], []).append((row['name'], row['bid_count'], row['last_seen']))
+                self._sorted = {name: _Sorted(values) for name, values in rows.items()}
+                self._loaded = version
+            return self._sorted[institution]
+
+    def search(self, q: str = '', institution: str = 'demand', limit: int = AGENCY_LIST_LIMIT) -> Tuple[List[Dict], int]:
+        """
+        기관명 자동완성
+
+        q가 없으면 공고 많은 순, 있으면 앞부분 일치(공고 많은 순) 다음에 부분 일치(공고 많은 순).
+
+        Returns:
+            (최대 limit개의 {'name', 'count', 'last_seen'}, 조건에 맞는 전체 기관 수)
+        """
+        if institution not in INSTITUTION_FIELDS:
+            raise ValueError(f'기관 구분은 demand 또는 notice여야 합니다: {institution}')
+        if not 1 <= limit <= AGENCY_LIST_MAX:
+            raise ValueError(f'limit은 1~{AGENCY_LIST_MAX} 사이여야 합니다.')
+
+        index = self._current(institution)
+        key = q.strip().casefold()
+        if not key:
+            matches = index.by_count
+        else:
+            start = bisect.bisect_left(index.keys, key)
+            end = bisect.bisect_left(index.keys, key + '\U0010ffff', start)
+            prefix = sorted(index.entries[start:end], key=lambda entry: (-entry[2], entry[0]))
+            contains = [entry for entry in index.by_count if key in entry[0] and not entry[0].startswith(key)]
+            matches = prefix + contains
+        return [{'name': name, 'count': count, 'last_seen': last_seen}
+                for _, name, count, last_seen in matches[:limit]], len(matches)
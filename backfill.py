@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+과거 입찰공고 일괄 수집
+Checkpointed, resumable backfill of a long date range into the local store or an archive
+
+기간을 (구간, 입찰 구분) 작업으로 나눠 최근 구간부터 과거로 거슬러 올라가며
+병렬로 수집한다. 작업마다 다음에 받을 페이지와 기록한 위치를 페이지 단위로
+체크포인트에 남기므로, 중단(오류, 일일 요청 한도 초과, Ctrl+C) 뒤 같은 명령을
+다시 실행하면 멈춘 페이지부터 이어서 수집한다. 체크포인트는 로컬 저장소와 같은
+SQLite DB에 둔다.
+
+- 저장소: 페이지마다 BidStore.ingest (같은 공고는 다시 넣어도 한 건)
+- 보관 파일: archive_dir/<입찰 구분>/<구간 시작일>.jsonl, 수집 중에는 .part 파일에
+  쓰고 체크포인트의 기록 위치까지 잘라낸 뒤 이어 쓰므로 중복 줄이 생기지 않는다.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from bid_store import BidStore
+from config import BACKFILL_QUOTA_CODES, BACKFILL_RETRIES, BACKFILL_WINDOW_DAYS, BACKFILL_WORKERS
+from search_service import date_windows, page_chunk
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backfill_windows (
+    job TEXT NOT NULL,
+    bid_type TEXT NOT NULL,
+    window_start TEXT NOT NULL,
+    window_end TEXT NOT NULL,
+    next_page INTEGER NOT NULL DEFAULT 1,
+    pages INTEGER,
+    rows INTEGER NOT NULL DEFAULT 0,
+    archive_offset INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    error TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job, bid_type, window_start)
+);
+"""
+
+PAGE_SIZE = 100
+
+
+class QuotaExceededError(Exception):
+    """일일 요청 한도 초과 (남은 작업은 다음 실행에서 이어서)"""
+    pass
+
+
+def job_name(types: List[str], start_dt: datetime, end_dt: datetime) -> str:
+    """기간과 입찰 구분으로 정한 작업 이름 (같은 명령을 다시 실행하면 같은 작업)"""
+    return f"{start_dt:%Y%m%d}-{end_dt:%Y%m%d}-{'+'.join(types)}"
+
+
+class Backfill:
+    """
+    체크포인트 기반 일괄 수집
+
+    Args:
+        client: G2BClient (속도 제한은 클라이언트의 rate_limiter를 따름)
+        store: 체크포인트를 둘 BidStore (ingest=True면 수집한 공고도 저장)
+        archive_dir: 구간별 JSON Lines 보관 위치 (None이면 보관하지 않음)
+        parser: 응답 해석 프로세스 풀 (page_parser.ParserPool, None이면 작업 스레드에서 해석)
+    """
+
+    def __init__(self,
+                 client,
+                 store: BidStore,
+                 types: List[str],
+                 start_dt: datetime,
+                 end_dt: datetime,
+                 job: Optional[str] = None,
+                 window_days: int = BACKFILL_WINDOW_DAYS,
+                 workers: int = BACKFILL_WORKERS,
+                 archive_dir: Optional[str] = None,
+                 ingest: bool = True,
+                 parser=None):
+        self.client = client
+        self.store = store
+        self.job = job or job_name(types, start_dt, end_dt)
+        self.workers = max(1, workers)
+        self.archive_dir = archive_dir
+        self.ingest = ingest
+        self.parser = parser
+        self._lock = store.lock
+        self._stop = threading.Event()
+        self._progress_lock = threading.Lock()
+        self.quota_exceeded = False
+        self.pages_fetched = 0
+        self.rows_fetched = 0
+        self._started = time.monotonic()
+
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO backfill_windows (job, bid_type, window_start, window_end, updated_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(self.job, type_name, window_start.isoformat(), window_end.isoformat(), now)
+                 for window_start, window_end in date_windows(start_dt, end_dt, window_days)
+                 for type_name in types]
+            )
+
+    @property
+    def _conn(self):
+        return self.store.connection
+
+    def windows(self) -> List[Dict]:
+        """작업의 모든 (구간, 입찰 구분) 체크포인트 (최근 구간부터)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM backfill_windows WHERE job = ? ORDER BY window_start DESC, bid_type', (self.job,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def run(self, on_progress: Optional[Callable[[], None]] = None) -> Dict:
+        """
+        끝나지 않은 작업을 모두 수집하고 진행 상황 반환
+
+        on_progress는 페이지를 기록할 때마다 작업 스레드에서 인자 없이 호출된다
+        (필요할 때 status()로 진행 상황 조회).
+        """
+        self._stop.clear()
+        self._started = time.monotonic()
+        self.pages_fetched = self.rows_fetched = 0
+        pending = [window for window in self.windows() if window['status'] != 'done']
+
+        def fill(window: Dict) -> None:
+            if self._stop.is_set():
+                return
+            try:
+                self._fill(window, on_progress)
+            except QuotaExceededError as e:
+                self.quota_exceeded = True
+                self._stop.set()
+                self._checkpoint(window, error=str(e))
+            except Exception as e:
+                self._checkpoint(window, status='failed', error=str(e))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                list(pool.map(fill, pending))
+            except BaseException:
+                # Ctrl+C 등: 진행 중인 페이지까지만 기록하고 멈춤
+                self._stop.set()
+                raise
+        return self.status()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> Dict:
+        """
+        진행 상황: 작업/페이지/건수, 이번 실행의 처리 속도와 남은 예상 시간 (초)
+
+        첫 페이지를 받기 전이라 페이지 수를 모르는 작업은 아는 작업의 평균으로 추정한다.
+        """
+        windows = self.windows()
+        known = [window['pages'] for window in windows if window['pages'] is not None]
+        average_pages = sum(known) / len(known) if known else 1
+        pages_done = sum(window['next_page'] - 1 for window in windows)
+        pages_total = sum(window['pages'] if window['pages'] is not None else average_pages
+                          for window in windows)
+        remaining = sum(max(0, (window['pages'] if window['pages'] is not None else average_pages)
+                            - window['next_page'] + 1)
+                        for window in windows if window['status'] != 'done')
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        pages_per_second = self.pages_fetched / elapsed
+        return {
+            'job': self.job,
+            'windows': len(windows),
+            'done': sum(window['status'] == 'done' for window in windows),
+            'failed': sum(window['status'] == 'failed' for window in windows),
+            'pages_done': pages_done,
+            'pages_total': round(pages_total),
+            'rows': sum(window['rows'] for window in windows),
+            'rows_per_second': self.rows_fetched / elapsed,
+            'pages_per_second': pages_per_second,
+            'eta_seconds': remaining / pages_per_second if pages_per_second else None,
+            'quota_exceeded': self.quota_exceeded,
+            'errors': [f"{window['window_start'][:10]} {window['bid_type']}: {window['error']}"
+                       for window in windows if window['error']],
+        }
+
+    def _fill(self, window: Dict, on_progress: Optional[Callable[[], None]]) -> None:
+        type_name = window['bid_type']
+        window_start = datetime.fromisoformat(window['window_start'])
+        window_end = datetime.fromisoformat(window['window_end'])
+        page_no = window['next_page']
+        archive = self._open_archive(window)
+        try:
+            while not self._stop.is_set():
+                chunk = self._get_chunk(type_name, window_start, window_end, page_no)
+                if chunk['error']:
+                    self._checkpoint(window, status='failed', error=chunk['error'])
+                    return
+
+                if self.ingest and chunk['items']:
+                    self.store.ingest(chunk['items'])
+                if archive is not None:
+                    archive.write(''.join(json.dumps(bid, ensure_ascii=False) + '\n'
+                                          for bid in chunk['items']).encode('utf-8'))
+                    archive.flush()
+
+                pages = max(1, -(-chunk['total'] // PAGE_SIZE))
+                finished = page_no >= pages or not chunk['items']
+                window.update(next_page=page_no + 1, pages=pages, rows=window['rows'] + len(chunk['items']),
+                              archive_offset=archive.tell() if archive is not None else 0)
+                if finished and archive is not None:
+                    archive.close()
+                    os.replace(archive.name, archive.name[:-len('.part')])
+                    archive = None
+                self._checkpoint(window, status='done' if finished else 'pending')
+
+                with self._progress_lock:
+                    self.pages_fetched += 1
+                    self.rows_fetched += len(chunk['items'])
+                if on_progress is not None:
+                    on_progress()
+                if finished:
+                    return
+                page_no += 1
+        finally:
+            if archive is not None:
+                archive.close()
+
+    def _get_chunk(self, type_name: str, window_start: datetime, window_end: datetime, page_no: int) -> Dict:
+        """페이지 하나 조회 (일시적인 실패는 간격을 늘려가며 재시도, 한도 초과면 QuotaExceededError)"""
+        chunk: Dict = {}
+        for attempt in range(BACKFILL_RETRIES + 1):
+            request = dict(bid_type=type_name, start_date=window_start, end_date=window_end, page_no=page_no,
+                           num_of_rows=PAGE_SIZE)
+            if self.parser is not None:
+                chunk = self.parser.parse(type_name, page_no, self.client.get_bid_list_raw(**request))
+                result_code = chunk['result_code']
+            else:
+                result = self.client.get_bid_list(**request)
+                chunk = page_chunk(type_name, page_no, result)
+                result_code = (result or {}).get('response', {}).get('header', {}).get('resultCode')
+            if result_code in BACKFILL_QUOTA_CODES:
+                raise QuotaExceededError(chunk['error'] or '요청 한도를 초과했습니다.')
+            if result_code == '00' or attempt == BACKFILL_RETRIES or self._stop.wait(2 ** attempt):
+                break
+        return chunk
+
+    def _open_archive(self, window: Dict):
+        """구간 보관 파일(.part)을 체크포인트의 기록 위치에서 이어 쓰도록 열기"""
+        if self.archive_dir is None:
+            return None
+        directory = os.path.join(self.archive_dir, window['bid_type'])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{window['window_start'][:10]}.jsonl.part")
+        archive = open(path, 'ab')
+        archive.truncate(window['archive_offset'])
+        archive.seek(window['archive_offset'])
+        return archive
+
+    def _checkpoint(self, window: Dict, status: Optional[str] = None, error: Optional[str] = None) -> None:
+        if status is not None:
+            window['status'] = status
+        window['error'] = error
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE backfill_windows SET next_page = ?, pages = ?, rows = ?, archive_offset = ?, status = ?, '
+                'error = ?, updated_at = ? WHERE job = ? AND bid_type = ? AND window_start = ?',
+                (window['next_page'], window['pages'], window['rows'], window['archive_offset'], window['status'],
+                 error, time.time(), self.job, window['bid_type'], window['window_start'])
+            )
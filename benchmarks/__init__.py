@@ -0,0 +1,3 @@
+"""
+나라장터 입찰공고 조회 시스템 벤치마크
+"""
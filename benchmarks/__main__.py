@@ -0,0 +1,7 @@
+"""python -m benchmarks (benchmarks.suite 참고)"""
+
+import sys
+
+from benchmarks.suite import main
+
+sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+내보내기 메모리/시간 벤치마크
+
+형식마다 새 프로세스에서 N건의 검색 결과를 만든 뒤 내보내기를 끝까지
+소비하고, 결과 집합을 만든 직후 대비 최대 RSS 증가량을 측정한다.
+
+실행: python -m benchmarks.bench_export --rows 100000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bid_index import BidIndex
+
+
+FORMATS = ['xlsx', 'csv', 'parquet', 'legacy-xlsx']
+
+
+def make_bids(rows):
+    """합성 입찰공고 결과 집합"""
+    agencies = [f'기관{i:03d}' for i in range(300)]
+    return [{
+        'id': f'servc_R25BK{i:08d}',
+        'bidType': '용역',
+        'bidNtceNo': f'R25BK{i:08d}',
+        'bidNtceNm': f'{agencies[i % 300]} 정보시스템 유지관리 용역 입찰공고 {i}',
+        'dminsttNm': agencies[i % 300],
+        'bidNtceDt': f'2025-01-{i % 28 + 1:02d} {i % 24:02d}:00:00',
+        'bidClseDt': f'2025-02-{i % 28 + 1:02d} 10:00:00',
+        'presmptPrce': str(1000000 + i * 137),
+        'bidNtceUrl': f'https://www.g2b.go.kr/link/{i}',
+        'ntceInsttNm': agencies[(i * 7) % 300],
+    } for i in range(rows)]
+
+
+def peak_rss_mb():
+    """프로세스 최대 RSS (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def legacy_xlsx(bids):
+    """이전 방식: dict 목록 → DataFrame → BytesIO 워크북"""
+    import io
+    import pandas as pd
+    from exporters import EXPORT_COLUMNS, export_row
+
+    df = pd.DataFrame([dict(zip(EXPORT_COLUMNS, export_row(bid))) for bid in bids])
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='입찰공고', index=False)
+    yield output.getvalue()
+
+
+def run_one(fmt, rows):
+    """현재 프로세스에서 한 형식 측정"""
+    from exporters import stream_export
+
+    index = BidIndex(make_bids(rows))
+    list(index.ordered())
+    base = peak_rss_mb()
+
+    started = time.perf_counter()
+    stream = legacy_xlsx(index.ordered()) if fmt == 'legacy-xlsx' else stream_export(index.ordered(), fmt)
+    size = 0
+    first_byte = None
+    for chunk in stream:
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'format': fmt,
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'first_byte_seconds': round(first_byte or 0.0, 3),
+        'bytes': size,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'export_rss_mb': round(peak_rss_mb() - base, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="내보내기 최대 RSS 벤치마크")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--format', choices=FORMATS, help="한 형식만 현재 프로세스에서 측정")
+    args = parser.parse_args()
+
+    if args.format:
+        print(json.dumps(run_one(args.format, args.rows)))
+        return
+
+    print(f"{'format':<12} {'rows':>8} {'sec':>7} {'1st byte':>9} {'MB out':>8} {'peak RSS':>9} {'export RSS':>11}")
+    for fmt in FORMATS:
+        proc = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_export', '--rows', str(args.rows), '--format', fmt],
+            capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        if proc.returncode != 0:
+            print(f"{fmt:<12} 실패: {proc.stderr.strip().splitlines()[-1] if proc.stderr else proc.returncode}")
+            continue
+        r = json.loads(proc.stdout)
+        print(f"{r['format']:<12} {r['rows']:>8} {r['seconds']:>7} {r['first_byte_seconds']:>9} "
+              f"{r['bytes'] / 1e6:>8.1f} {r['peak_rss_mb']:>9} {r['export_rss_mb']:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+검색 결과 표 렌더링 벤치마크 (헤드리스 브라우저)
+
+웹 앱(대역 서버 연결)을 띄워 헤드리스 Chromium으로 메인 페이지를 연 뒤,
+합성 결과 N건을 app.js의 표(ResultGrid)에 넣고 다음을 잰다.
+
+- render: displayResults 호출부터 첫 프레임까지
+- scroll: 스크롤 영역을 프레임마다 내리며 잰 프레임 간격 (p50/p95/최대, 50ms 넘는 프레임 수)
+- select_all: 전체 선택 후 다음 프레임까지
+- 메모리: JS 힙 사용량, DOM 노드 수 (Chrome DevTools Protocol Performance.getMetrics)
+
+필요: pip install playwright && python -m playwright install chromium
+
+실행: python -m benchmarks.bench_grid --rows 50000
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MEASURE_JS = """
+async ([rows, steps, stepPx]) => {
+    const app = window.bidSearchApp;
+    const frame = () => new Promise(resolve => requestAnimationFrame(() => resolve(performance.now())));
+    const types = ['용역', '건설공사', '물품'];
+    const data = Array.from({ length: rows }, (_, i) => ({
+        id: `bench_${i}`,
+        bidType: types[i % 3],
+        bidNtceNo: `R25BK${String(i).padStart(8, '0')}`,
+        bidNtceNm: `기관${i % 300} 정보시스템 유지관리 용역 입찰공고 ${i}`,
+        dminsttNm: `기관${i % 300}`,
+        bidNtceDt: `2025-01-${String(i % 28 + 1).padStart(2, '0')} 10:00:00`,
+        bidClseDt: `2025-02-${String(i % 28 + 1).padStart(2, '0')} 10:00:00`,
+        presmptPrce: String(1000000 + i * 137),
+        bidNtceUrl: `https://www.g2b.go.kr/link/${i}`,
+        ntceInsttNm: `기관${i % 300}`,
+    }));
+
+    let started = performance.now();
+    app.totalCount = rows;
+    app.displayResults(data);
+    await frame();
+    const render = performance.now() - started;
+
+    const scroller = document.getElementById('resultsScroll');
+    const gaps = [];
+    let last = await frame();
+    for (let step = 0; step < steps; step++) {
+        scroller.scrollTop += stepPx;
+        const now = await frame();
+        gaps.push(now - last);
+        last = now;
+    }
+    gaps.sort((a, b) => a - b);
+
+    started = performance.now();
+    app.toggleSelectAll(true);
+    await frame();
+    const selectAll = performance.now() - started;
+
+    return {
+        rows,
+        render_ms: render,
+        scroll_frames: gaps.length,
+        scroll_p50_ms: gaps[Math.floor(gaps.length * 0.5)],
+        scroll_p95_ms: gaps[Math.floor(gaps.length * 0.95)],
+        scroll_max_ms: gaps[gaps.length - 1],
+        long_frames: gaps.filter(gap => gap > 50).length,
+        select_all_ms: selectAll,
+        selected: app.selectedItems.size,
+        rendered_rows: document.querySelectorAll('#resultsTableBody tr.grid-row').length,
+    };
+}
+"""
+
+
+def serve_app():
+    """대역 서버와 웹 앱을 백그라운드 스레드로 실행하고 웹 앱 주소 반환"""
+    import tempfile
+
+    from mock_upstream import MockUpstream
+
+    upstream = MockUpstream().start()
+    os.environ['G2B_BASE_URL'] = upstream.url
+    os.environ['G2B_DATA_DIR'] = tempfile.mkdtemp(prefix='g2b-bench-')
+    from werkzeug.serving import make_server
+    from web.app import app
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='검색 결과 표 렌더링 벤치마크 (헤드리스 Chromium)')
+    parser.add_argument('--rows', type=int, default=50000, help='표에 넣을 결과 수')
+    parser.add_argument('--steps', type=int, default=300, help='스크롤 프레임 수')
+    parser.add_argument('--step-px', type=int, default=400, help='프레임마다 스크롤할 거리 (px)')
+    parser.add_argument('--url', help='이미 실행 중인 웹 앱 주소 (생략하면 대역 서버와 함께 실행)')
+    args = parser.parse_args()
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        print('playwright가 필요합니다: pip install playwright && python -m playwright install chromium')
+        return 1
+
+    url = args.url or serve_app()
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch()
+        page = browser.new_page(viewport={'width': 1400, 'height': 900})
+        page.goto(url)
+        page.wait_for_function('window.bidSearchApp !== undefined')
+        cdp = page.context.new_cdp_session(page)
+        cdp.send('Performance.enable')
+
+        def heap():
+            values = {metric['name']: metric['value'] for metric in cdp.send('Performance.getMetrics')['metrics']}
+            return values['JSHeapUsedSize'] / 1e6, int(values['Nodes'])
+
+        cdp.send('HeapProfiler.collectGarbage')
+        heap_before, _ = heap()
+        result = page.evaluate(MEASURE_JS, [args.rows, args.steps, args.step_px])
+        cdp.send('HeapProfiler.collectGarbage')
+        heap_after, nodes = heap()
+        browser.close()
+
+    result.update(js_heap_mb=round(heap_after - heap_before, 1), dom_nodes=nodes)
+    print(json.dumps({key: round(value, 1) if isinstance(value, float) else value
+                      for key, value in result.items()}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+응답 해석 처리량 벤치마크
+
+합성 XML 응답 페이지(100건, 실제 응답처럼 항목당 필드 70여 개)를 해석해
+청크로 만드는 처리량을 비교한다.
+
+- single: 기존 경로 (G2BClient._decode_response + page_chunk, 한 스레드)
+- pool-N: page_parser.ParserPool(N) (조회 스레드 2N개가 동시에 넘기는 대량 수집 상황)
+
+프로세스 사이에 오가는 크기도 함께 출력한다 (열 버퍼 vs dict 목록을 pickle).
+--cassette를 주면 합성 페이지 대신 기록한 실제 응답(cassette.py)을 해석한다.
+
+실행: python -m benchmarks.bench_parse --pages 400 --workers 1,2,4,8
+      python -m benchmarks.bench_parse --cassette real.jsonl.gz
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cassette import Cassette
+from g2b_client import G2BClient
+from page_parser import ParserPool, parse_raw
+from search_service import page_chunk
+
+
+EXTRA_FIELDS = [f'field{i:02d}' for i in range(60)]
+
+
+def make_page(page_no, rows=100):
+    """합성 XML 응답 페이지"""
+    items = []
+    for i in range(rows):
+        n = page_no * rows + i
+        fields = {
+            'bidNtceNo': f'R25BK{n:08d}',
+            'bidNtceOrd': '000',
+            'bidNtceNm': f'기관{n % 300:03d} 정보시스템 유지관리 용역 입찰공고 {n}',
+            'dminsttNm': f'기관{n % 300:03d}',
+            'ntceInsttNm': f'기관{n * 7 % 300:03d}',
+            'bidNtceDt': f'2025-01-{n % 28 + 1:02d} {n % 24:02d}:00:00',
+            'bidClseDt': f'2025-02-{n % 28 + 1:02d} 10:00:00',
+            'presmptPrce': str(1000000 + n * 137),
+            'bidNtceUrl': f'https://www.g2b.go.kr/link/{n}',
+            **{name: f'값 {name} {n}' for name in EXTRA_FIELDS},
+        }
+        items.append('<item>' + ''.join(f'<{key}>{value}</{key}>' for key, value in fields.items()) + '</item>')
+    return ('<response><header><resultCode>00</resultCode><resultMsg>정상</resultMsg></header><body><items>'
+            + ''.join(items) + f'</items><numOfRows>{rows}</numOfRows><pageNo>{page_no}</pageNo>'
+            '<totalCount>1000000</totalCount></body></response>').encode('utf-8')
+
+
+def run_single(pages):
+    client = G2BClient()
+    rows = 0
+    for page_no, raw in enumerate(pages, 1):
+        rows += len(page_chunk('servc', page_no, client._decode_response(raw.decode('utf-8')))['items'])
+    return rows
+
+
+def run_pool(pages, workers):
+    with ParserPool(workers) as parser:
+        # 프로세스 시작 비용은 제외
+        parser.parse('servc', 0, {'raw': pages[0]})
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers) * 2) as threads:
+            rows = sum(threads.map(lambda item: len(parser.parse('servc', item[0], {'raw': item[1]})['items']),
+                                   enumerate(pages, 1)))
+        return rows, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='응답 해석 처리량 벤치마크')
+    parser.add_argument('--pages', type=int, default=400, help='해석할 페이지 수 (페이지당 100건)')
+    parser.add_argument('--cassette', help='합성 페이지 대신 해석할 카세트 파일 (.jsonl.gz)')
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1)),
+                        help='비교할 프로세스 수 (쉼표 구분)')
+    args = parser.parse_args()
+
+    if args.cassette:
+        pages = [entry['body'] for entry in Cassette(args.cassette).interactions()]
+        args.pages = len(pages)
+    else:
+        pages = [make_page(page_no) for page_no in range(args.pages)]
+    parsed = G2BClient()._decode_response(pages[0].decode('utf-8'))
+    sizes = [len(pickle.dumps(value)) for value in (parse_raw(pages[0]), page_chunk('servc', 1, parsed), parsed)]
+    print(f'CPU {os.cpu_count()}개, 페이지 {args.pages}개 ({sum(map(len, pages)) / 1e6:.1f}MB)')
+    print('페이지당 IPC 크기: 열 버퍼 {:,}B / 가공한 dict 목록 {:,}B / 해석한 응답 전체 {:,}B'.format(*sizes))
+    print(f"{'방식':<10} {'시간(s)':>8} {'페이지/s':>10} {'건/s':>10} {'배율':>6}")
+
+    started = time.perf_counter()
+    rows = run_single(pages)
+    baseline = time.perf_counter() - started
+    print(f"{'single':<10} {baseline:8.2f} {args.pages / baseline:10.0f} {rows / baseline:10.0f} {1:6.2f}")
+
+    for workers in [int(value) for value in args.workers.split(',') if value.strip()]:
+        rows, elapsed = run_pool(pages, workers)
+        print(f"{f'pool-{workers}':<10} {elapsed:8.2f} {args.pages / elapsed:10.0f} {rows / elapsed:10.0f} "
+              f"{baseline / elapsed:6.2f}")
+
+
+if __name__ == '__main__':
+    main()
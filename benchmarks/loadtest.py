@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+웹 API 부하 테스트
+Ramped load test of the web API against the local mock upstream, with latency percentiles
+
+로컬 대역 서버(mock_upstream.py)와 웹 서버(run_web.py)를 띄우고, 가상 사용자들이
+실제 사용 흐름을 섞어 요청한다. 동시 사용자 수를 단계별로 늘리며 단계마다
+동작별 p50/p95/p99 지연, 오류율, 처리량, 사용자 동작 하나당 upstream 요청 수를
+재고 보고서(JSON)로 남긴다.
+
+동작 (--mix로 비율 지정):
+- page: 페이지 열기 (GET /, /api/agencies, POST /api/search 첫 페이지)
+- filter: 같은 기간에서 필터만 바꿔 검색
+- export: 검색 결과 내보내기 (csv/xlsx, 일부 선택 또는 전체)
+- delete: 검색 결과에서 몇 건 삭제
+
+사용자마다 마지막 검색 결과(result_id)를 기억하고, 결과가 없으면 page부터 한다.
+단계 사이에 서버를 다시 띄우지 않으므로 뒤 단계일수록 캐시가 데워진 상태다.
+
+실행:
+    python -m benchmarks.loadtest --users 1,4,16 --stage-seconds 30 -o load.json
+    python -m benchmarks.loadtest --prod --workers 4 --server-env G2B_UPSTREAM_CACHE_TTL=0
+    python -m benchmarks.loadtest --async --upstream-latency lognormal:150,0.6
+    python -m benchmarks.loadtest --target http://127.0.0.1:5000 --upstream http://127.0.0.1:8800
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ACTIONS = ('page', 'filter', 'export', 'delete')
+DEFAULT_MIX = 'page=5,filter=3,export=1,delete=1'
+KEYWORDS = ('유지관리', '공사', '구매', '용역', '시스템', '')
+AGENCIES = ('서울특별시', '경기도', '한국도로공사', '부산광역시', '')
+FIRST_WEEK = date(2025, 1, 6)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))], 1)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ACTIONS:
+            raise ValueError(f'알 수 없는 동작입니다: {name} (가능: {", ".join(ACTIONS)})')
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError('동작 비율이 모두 0입니다.')
+    return mix
+
+
+class Client:
+    """가상 사용자 하나의 HTTP 연결 (브라우저처럼 keep-alive)"""
+
+    def __init__(self, base_url: str, user: str, timeout: float):
+        url = urlparse(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.user = user
+        self.timeout = timeout
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, bytes]:
+        """응답 본문을 끝까지 읽고 (상태 코드, 본문) 반환 (연결 오류는 한 번 다시 연결)"""
+        headers = {'X-User-Id': self.user}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._conn.request(method, path, payload, headers)
+                response = self._conn.getresponse()
+                return response.status, response.read()
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.BadStatusLine):
+                self.close()
+                if attempt:
+                    raise
+            except Exception:
+                self.close()
+                raise
+        raise AssertionError('unreachable')
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class Recorder:
+    """단계별 동작 지연과 결과 (사용자 스레드끼리 공유)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.calls: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def action(self, name: str, elapsed_ms: float, error: Optional[str]) -> None:
+        with self.lock:
+            self.latencies[name].append(elapsed_ms)
+            if error:
+                self.errors[name][error] += 1
+
+    def call(self, route: str, elapsed_ms: float) -> None:
+        with self.lock:
+            self.calls[route].append(elapsed_ms)
+
+
+class ActionError(Exception):
+    """동작 실패 (상태 코드나 예외 이름)"""
+    pass
+
+
+class VirtualUser:
+    """가상 사용자: 동작 비율에 따라 동작을 고르고 사이사이 생각 시간만큼 쉼"""
+
+    def __init__(self, index: int, client: Client, recorder: Recorder, mix: Dict[str, float], weeks: int,
+                 think: float, seed: int):
+        self.client = client
+        self.recorder = recorder
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.weeks = weeks
+        self.think = think
+        self.rng = random.Random(seed * 1000 + index)
+        self.week: Optional[date] = None
+        self.result_id: Optional[str] = None
+        self.ids: List[str] = []
+
+    def run(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            name = self.rng.choices(self.names, self.weights)[0]
+            if self.result_id is None:
+                name = 'page'
+            started = time.perf_counter()
+            error = None
+            try:
+                getattr(self, name)()
+            except ActionError as e:
+                error = str(e)
+            except Exception as e:
+                error = type(e).__name__
+            if not stop.is_set():
+                self.recorder.action(name, (time.perf_counter() - started) * 1000, error)
+            if self.think:
+                stop.wait(self.rng.expovariate(1 / self.think))
+        self.client.close()
+
+    def _call(self, route: str, method: str, path: str, body: Optional[Dict] = None) -> bytes:
+        started = time.perf_counter()
+        status, data = self.client.request(method, path, body)
+        self.recorder.call(route, (time.perf_counter() - started) * 1000)
+        if status >= 400:
+            raise ActionError(f'{route} {status}')
+        return data
+
+    def _search(self, **filters) -> None:
+        body = {
+            'start_date': f'{self.week:%Y-%m-%d}',
+            'end_date': f'{self.week + timedelta(days=6):%Y-%m-%d}',
+            'limit': 50,
+            **filters,
+        }
+        result = json.loads(self._call('POST /api/search', 'POST', '/api/search', body))
+        self.result_id = result.get('result_id')
+        self.ids = [bid['id'] for bid in result.get('data', [])]
+
+    def page(self) -> None:
+        self.week = FIRST_WEEK + timedelta(weeks=self.rng.randrange(self.weeks))
+        self._call('GET /', 'GET', '/')
+        self._call('GET /api/agencies', 'GET', '/api/agencies')
+        self._search()
+
+    def filter(self) -> None:
+        self._search(keyword=self.rng.choice(KEYWORDS), agency_filter=self.rng.choice(AGENCIES))
+
+    def export(self) -> None:
+        selected = self.rng.sample(self.ids, min(len(self.ids), 20)) if self.ids and self.rng.random() < 0.5 else []
+        self._call('POST /api/export', 'POST', '/api/export',
+                   {'format': self.rng.choice(('csv', 'xlsx')), 'result_id': self.result_id,
+                    'selected_ids': selected})
+
+    def delete(self) -> None:
+        selected = self.rng.sample(self.ids, min(len(self.ids), 3))
+        self._call('POST /api/delete', 'POST', '/api/delete', {'result_id': self.result_id, 'selected_ids': selected})
+        self.ids = [bid_id for bid_id in self.ids if bid_id not in selected]
+
+
+def upstream_requests(upstream: Optional[str]) -> Optional[int]:
+    """대역 서버가 받은 요청 수 (대역 서버가 아니면 None)"""
+    if not upstream:
+        return None
+    url = urlparse(upstream)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=10)
+    try:
+        conn.request('GET', '/_mock/stats')
+        response = conn.getresponse()
+        if response.status != 200:
+            return None
+        return json.loads(response.read()).get('requests', 0)
+    except OSError:
+        return None
+    finally:
+        conn.close()
+
+
+def wait_ready(url: str, path: str, process: Optional[subprocess.Popen], timeout: float = 60) -> None:
+    parsed = urlparse(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f'{url} 서버가 시작하지 못했습니다 (exit {process.returncode})')
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=2)
+        try:
+            conn.request('GET', path)
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+        finally:
+            conn.close()
+    raise RuntimeError(f'{url} 서버가 {timeout:.0f}초 안에 응답하지 않습니다.')
+
+
+@contextmanager
+def launched(command: List[str], env: Dict[str, str], log_path: str) -> Iterator[subprocess.Popen]:
+    """하위 프로세스 실행 (자식 프로세스까지 함께 종료)"""
+    with open(log_path, 'ab') as log:
+        process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                   start_new_session=True)
+    try:
+        yield process
+    finally:
+        if process.poll() is None:
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+
+
+def run_stage(target: str, upstream: Optional[str], users: int, seconds: float, mix: Dict[str, float],
+              args) -> Dict:
+    """동시 사용자 users명으로 seconds초 동안 요청하고 단계 결과 반환"""
+    recorder = Recorder()
+    stop = threading.Event()
+    before = upstream_requests(upstream)
+    virtual_users = [VirtualUser(index, Client(target, f'load-{index}', args.timeout), recorder, mix, args.weeks,
+                                 args.think, args.seed)
+                     for index in range(users)]
+    threads = [threading.Thread(target=user.run, args=(stop,), name=f'load-{index}', daemon=True)
+               for index, user in enumerate(virtual_users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        stop.wait(seconds)
+    finally:
+        stop.set()
+        elapsed = time.perf_counter() - started
+        for thread in threads:
+            thread.join(args.timeout)
+    after = upstream_requests(upstream)
+
+    total = sum(len(values) for values in recorder.latencies.values())
+    failed = sum(sum(errors.values()) for errors in recorder.errors.values())
+    upstream_calls = after - before if before is not None and after is not None else None
+    return {
+        'users': users,
+        'seconds': round(elapsed, 1),
+        'actions': total,
+        'actions_per_second': round(total / elapsed, 2),
+        'error_rate': round(failed / total, 4) if total else 0.0,
+        'upstream_requests': upstream_calls,
+        'upstream_per_action': round(upstream_calls / total, 2) if upstream_calls is not None and total else None,
+        'by_action': {
+            name: {
+                'count': len(values),
+                'p50_ms': percentile(values, 0.50),
+                'p95_ms': percentile(values, 0.95),
+                'p99_ms': percentile(values, 0.99),
+                'error_rate': round(sum(recorder.errors[name].values()) / len(values), 4),
+                'errors': dict(recorder.errors[name]),
+            }
+            for name, values in sorted(recorder.latencies.items())
+        },
+        'by_route': {
+            route: {'count': len(values), 'p50_ms': percentile(values, 0.50), 'p95_ms': percentile(values, 0.95),
+                    'p99_ms': percentile(values, 0.99)}
+            for route, values in sorted(recorder.calls.items())
+        },
+    }
+
+
+def print_stage(stage: Dict) -> None:
+    upstream = (f", upstream {stage['upstream_requests']}건 (동작당 {stage['upstream_per_action']})"
+                if stage['upstream_requests'] is not None else '')
+    print(f"\n👥 동시 사용자 {stage['users']}명, {stage['seconds']}초: 동작 {stage['actions']}건 "
+          f"({stage['actions_per_second']}/s), 오류율 {stage['error_rate']:.1%}{upstream}")
+    print(f"  {'동작/요청':<22} {'건수':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'오류율':>7}")
+    for name, row in stage['by_action'].items():
+        print(f"  {name:<22} {row['count']:>6} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} "
+              f"{row['error_rate']:>7.1%}")
+        for error, count in row['errors'].items():
+            print(f"    ⚠️  {error}: {count}건")
+    for route, row in stage['by_route'].items():
+        print(f"  · {route:<20} {row['count']:>6} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+
+
+def server_label(args) -> str:
+    if args.target:
+        return args.target
+    mode = 'asgi' if args.async_mode else 'wsgi'
+    return f"{mode}-prod-{args.workers}w" if args.prod else f'{mode}-dev'
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest', description='웹 API 부하 테스트')
+    load = parser.add_argument_group('부하')
+    load.add_argument('--users', default='1,4,16', help='단계별 동시 사용자 수 (쉼표 구분, 기본 1,4,16)')
+    load.add_argument('--stage-seconds', type=float, default=30, help='단계별 측정 시간 (초)')
+    load.add_argument('--mix', default=DEFAULT_MIX, help=f'동작 비율 (기본 {DEFAULT_MIX})')
+    load.add_argument('--think', type=float, default=0.5, help='동작 사이 평균 생각 시간 (초, 지수 분포)')
+    load.add_argument('--weeks', type=int, default=12, help='사용자가 고르는 조회 기간 (2025-01-06부터 N주 중 한 주)')
+    load.add_argument('--timeout', type=float, default=120, help='요청 제한 시간 (초)')
+    load.add_argument('--seed', type=int, default=0)
+    load.add_argument('-o', '--output', help='보고서 JSON 파일')
+
+    server = parser.add_argument_group('웹 서버 (--target이 없으면 run_web.py로 실행)')
+    server.add_argument('--target', help='이미 실행 중인 웹 서버 주소')
+    server.add_argument('--async', dest='async_mode', action='store_true', help='ASGI 서버로 실행')
+    server.add_argument('--prod', action='store_true', help='gunicorn 멀티 워커로 실행')
+    server.add_argument('--workers', type=int, default=2, help='--prod 워커 수 (기본 2)')
+    server.add_argument('--server-env', action='append', default=[], metavar='KEY=VALUE',
+                        help='웹 서버 환경 변수 (예: G2B_UPSTREAM_CACHE_TTL=0, G2B_UPSTREAM_RATE_LIMIT=0)')
+
+    upstream = parser.add_argument_group('upstream (--upstream이 없으면 mock_upstream.py로 실행)')
+    upstream.add_argument('--upstream', help='이미 실행 중인 대역 서버 주소 (upstream 요청 수 집계용)')
+    upstream.add_argument('--upstream-latency', default='lognormal:150,0.6', help='대역 서버 응답 지연 (mock_upstream --latency)')
+    upstream.add_argument('--upstream-error-rate', type=float, default=0.0, help='대역 서버 오류 응답 비율')
+    args = parser.parse_args(argv)
+
+    try:
+        stages = [int(value) for value in args.users.split(',') if value.strip()]
+        mix = parse_mix(args.mix)
+        server_env = dict(item.split('=', 1) for item in args.server_env)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with ExitStack() as stack:
+        workdir = tempfile.mkdtemp(prefix='g2b-load-')
+        upstream_url = args.upstream
+        if upstream_url is None and args.target is None:
+            port = free_port()
+            upstream_url = f'http://127.0.0.1:{port}'
+            process = stack.enter_context(launched(
+                [sys.executable, 'mock_upstream.py', '--port', str(port), '--latency', args.upstream_latency,
+                 '--error-rate', str(args.upstream_error_rate)],
+                dict(os.environ), os.path.join(workdir, 'upstream.log')))
+            wait_ready(upstream_url, '/_mock/stats', process)
+
+        target = args.target
+        if target is None:
+            port = free_port()
+            target = f'http://127.0.0.1:{port}'
+            command = [sys.executable, 'run_web.py', '--port', str(port)]
+            if args.async_mode:
+                command.append('--async')
+            if args.prod:
+                command += ['--prod', '--workers', str(args.workers)]
+            env = {**os.environ, 'G2B_BASE_URL': upstream_url, 'G2B_DATA_DIR': os.path.join(workdir, 'data'),
+                   **server_env}
+            process = stack.enter_context(launched(command, env, os.path.join(workdir, 'server.log')))
+            wait_ready(target, '/metrics', process)
+
+        print(f'🎯 {server_label(args)} ({target}), upstream {upstream_url or "-"}, 로그 {workdir}')
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'server': server_label(args),
+                'server_env': server_env,
+                'mix': mix,
+                'think_seconds': args.think,
+                'weeks': args.weeks,
+                'upstream_latency': args.upstream_latency if args.upstream is None else None,
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count(),
+            },
+            'stages': [],
+        }
+        try:
+            for users in stages:
+                stage = run_stage(target, upstream_url, users, args.stage_seconds, mix, args)
+                report['stages'].append(stage)
+                print_stage(stage)
+        except KeyboardInterrupt:
+            print('\n중단했습니다. 끝난 단계까지 기록합니다.')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'\n💾 {args.output}')
+    return 0 if report['stages'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
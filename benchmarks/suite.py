@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+핫패스 벤치마크 모음
+Fetch, parse, transform, filter, export and end-to-end search benchmarks with JSON results
+
+측정 항목마다 새 프로세스에서 실행해 최대 RSS가 서로 섞이지 않게 하고,
+결과는 JSON으로 저장한다. compare는 두 결과를 비교해 기준(기본 10%)보다
+나빠진 지표를 표시하고, 하나라도 있으면 종료 코드 1을 돌려준다.
+
+- curl: G2BClient._make_curl_request 호출 한 번의 시간 (로컬 대역 서버, 지연 없음)
+- parse_xml[N]: G2BClient._parse_xml_response 처리량과 메모리
+- transform[N]: 응답 항목 가공(page_chunk), BidIndex 구성, 정렬 기준별 정렬
+- filter[N]: BidColumns 구성, 조건별 BidQuery.apply
+- export[형식]: stream_export 시간과 메모리 (benchmarks.bench_export)
+- api_search: 대역 서버를 upstream으로 둔 POST /api/search 지연 (재조회, 필터만 변경)
+- cassette[경로]: 기록한 실제 응답(cassette.py)의 해석 처리량 (run --cassette로 추가)
+
+실행:
+    python -m benchmarks run -o before.json
+    python -m benchmarks run -o after.json
+    python -m benchmarks compare before.json after.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PARSE_SIZES = (100, 10000, 100000)
+FULL_PARSE_SIZES = (100, 10000, 100000, 1000000)
+ROWS = 100000
+EXPORT_FORMATS = ('xlsx', 'csv')
+
+# 지표 이름 끝으로 방향을 정함 (_per_second는 클수록, _ms/_seconds/_mb는 작을수록 좋음)
+# 이보다 작은 차이는 측정 잡음으로 보고 무시
+NOISE_FLOOR = {'_ms': 1.0, '_seconds': 0.001, '_mb': 2.0, '_per_second': 0.0}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def timed(fn: Callable, repeat: int = 3) -> float:
+    """가장 빠른 실행 시간 (초)"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def sample_bids(rows: int) -> List[Dict]:
+    """대역 서버 합성 데이터를 웹 응답 형식으로 가공한 항목"""
+    from mock_upstream import Dataset
+    from search_service import normalize_bid
+
+    types = ('servc', 'cnstwk', 'thng')
+    dataset = Dataset()
+    bids = []
+    for index, type_name in enumerate(types):
+        count = rows // len(types) + (index < rows % len(types))
+        bids.extend(normalize_bid(type_name, item) for item in dataset.sample(type_name, count))
+    return bids
+
+
+# 측정 항목 (새 프로세스에서 실행)
+
+def case_curl(calls: int = 50) -> Dict:
+    from g2b_client import G2BClient
+    from mock_upstream import MockUpstream
+
+    with MockUpstream() as upstream:
+        client = G2BClient(base_url=upstream.url)
+        endpoint, params = client._bid_list_request('servc', datetime(2025, 1, 6), datetime(2025, 1, 6, 23, 59),
+                                                    1, 1, '1')
+        for _ in range(3):
+            client._make_curl_request(endpoint, params)
+        durations = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            client._make_curl_request(endpoint, params)
+            durations.append((time.perf_counter() - started) * 1000)
+    return {
+        'calls': calls,
+        'mean_ms': round(statistics.mean(durations), 2),
+        'p50_ms': round(percentile(durations, 0.5), 2),
+        'p95_ms': round(percentile(durations, 0.95), 2),
+    }
+
+
+def case_parse_xml(items: int) -> Dict:
+    from g2b_client import G2BClient
+    from mock_upstream import Dataset, render_xml
+
+    text = render_xml('00', '정상', Dataset().sample('thng', items), items, 1, items)
+    client = G2BClient()
+    base = peak_rss_mb()
+    started = time.perf_counter()
+    result = client._parse_xml_response(text)
+    elapsed = time.perf_counter() - started
+    parsed = len(result['response']['body']['items'])
+    assert parsed == items, parsed
+    return {
+        'items': items,
+        'input_mb': round(len(text.encode('utf-8')) / 1e6, 1),
+        'seconds': round(elapsed, 4),
+        'items_per_second': round(items / elapsed),
+        'parse_rss_mb': round(peak_rss_mb() - base, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def case_transform(rows: int = ROWS) -> Dict:
+    from bid_index import BidIndex, SORT_FIELDS
+    from mock_upstream import Dataset
+    from search_service import page_chunk
+
+    items = list(Dataset().sample('servc', rows))
+    response = {'response': {'header': {'resultCode': '00'}, 'body': {'items': items, 'totalCount': rows}}}
+    result = {'rows': rows}
+    reshape = timed(lambda: page_chunk('servc', 1, response))
+    bids = page_chunk('servc', 1, response)['items']
+    result['reshape_seconds'] = round(reshape, 4)
+    result['reshape_rows_per_second'] = round(rows / reshape)
+    result['index_seconds'] = round(timed(lambda: BidIndex(bids)), 4)
+    for field in SORT_FIELDS:
+        # 정렬 키는 인덱스에 캐시되므로 매번 새 인덱스로 측정
+        result[f'sort_{field}_seconds'] = round(timed(lambda: list(BidIndex(bids).ordered(field, 'desc'))), 4)
+    return result
+
+
+def case_filter(rows: int = ROWS) -> Dict:
+    from bid_filter import BidColumns, BidQuery
+
+    bids = sample_bids(rows)
+    result = {'rows': rows, 'columns_seconds': round(timed(lambda: BidColumns(bids)), 4)}
+    columns = BidColumns(bids)
+    queries = {
+        'keyword': {'keyword': '유지관리'},
+        'agency': {'agencies': ['서울특별시', '한국도로공사']},
+        'price': {'min_price': 100000000, 'max_price': 1000000000},
+        'combined': {'keyword': '공사', 'agencies': ['경기도'], 'min_price': 50000000, 'deadline_from': '2025-01-10'},
+    }
+    for name, data in queries.items():
+        query = BidQuery.from_request(data)
+        result[f'{name}_ms'] = round(timed(lambda: query.apply(columns), repeat=20) * 1000, 2)
+    return result
+
+
+def case_export(fmt: str, rows: int = ROWS) -> Dict:
+    from benchmarks.bench_export import run_one
+
+    result = run_one(fmt, rows)
+    return {
+        'rows': rows,
+        'seconds': result['seconds'],
+        'first_byte_seconds': result['first_byte_seconds'],
+        'output_mb': round(result['bytes'] / 1e6, 1),
+        'export_rss_mb': result['export_rss_mb'],
+    }
+
+
+def case_api_search(cold: int = 8, warm: int = 30) -> Dict:
+    from mock_upstream import MockUpstream
+
+    with MockUpstream() as upstream:
+        # web.app은 가져올 때 설정을 읽으므로 환경 변수를 먼저 지정
+        os.environ['G2B_BASE_URL'] = upstream.url
+        os.environ['G2B_DATA_DIR'] = tempfile.mkdtemp(prefix='g2b-bench-')
+        from web.app import app
+
+        client = app.test_client()
+
+        def search(data: Dict) -> float:
+            started = time.perf_counter()
+            response = client.post('/api/search', json={'limit': 50, **data})
+            assert response.status_code == 200, response.get_data(as_text=True)
+            return (time.perf_counter() - started) * 1000
+
+        first = datetime(2025, 1, 6)
+        search({'start_date': '2024-12-02', 'end_date': '2024-12-08', 'refresh': True})
+        # 재조회: 매번 다른 주를 조회해 upstream 캐시를 피함
+        cold_ms = [search({'start_date': f'{first + timedelta(weeks=week):%Y-%m-%d}',
+                           'end_date': f'{first + timedelta(weeks=week, days=6):%Y-%m-%d}', 'refresh': True})
+                   for week in range(cold)]
+        last_week = first + timedelta(weeks=cold - 1)
+        keywords = ('유지관리', '공사', '구매', '용역', '')
+        # 필터만 변경: 마지막으로 가져온 결과를 재사용
+        warm_ms = [search({'start_date': f'{last_week:%Y-%m-%d}',
+                           'end_date': f'{last_week + timedelta(days=6):%Y-%m-%d}',
+                           'keyword': keywords[index % len(keywords)]})
+                   for index in range(warm)]
+    return {
+        'refetch_p50_ms': round(percentile(cold_ms, 0.5), 1),
+        'refetch_p95_ms': round(percentile(cold_ms, 0.95), 1),
+        'filter_p50_ms': round(percentile(warm_ms, 0.5), 1),
+        'filter_p95_ms': round(percentile(warm_ms, 0.95), 1),
+    }
+
+
+def case_cassette(path: str) -> Dict:
+    from cassette import Cassette
+    from g2b_client import G2BClient
+    from page_parser import parse_raw
+    from search_service import page_chunk
+
+    pages = [(entry['operation'], entry['body']) for entry in Cassette(path).interactions()]
+    types = {operation: operation[len('getBidPblancListInfo'):].lower() for operation, _ in pages}
+    client = G2BClient()
+    size = sum(len(body) for _, body in pages)
+    base = peak_rss_mb()
+
+    def decode():
+        return sum(len(page_chunk(types[operation], 1, client._decode_response(body.decode('utf-8', 'replace')))
+                       ['items']) for operation, body in pages)
+
+    items = decode()
+    decode_seconds = timed(decode)
+    columnar_seconds = timed(lambda: [parse_raw(body) for _, body in pages])
+    return {
+        'pages': len(pages),
+        'items': items,
+        'input_mb': round(size / 1e6, 1),
+        'decode_seconds': round(decode_seconds, 4),
+        'decode_items_per_second': round(items / decode_seconds),
+        'decode_mb_per_second': round(size / 1e6 / decode_seconds, 1),
+        'columnar_items_per_second': round(items / columnar_seconds),
+        'parse_rss_mb': round(peak_rss_mb() - base, 1),
+    }
+
+
+def case_names(full: bool = False) -> List[str]:
+    return (['curl']
+            + [f'parse_xml[{size}]' for size in (FULL_PARSE_SIZES if full else PARSE_SIZES)]
+            + [f'transform[{ROWS}]', f'filter[{ROWS}]']
+            + [f'export[{fmt}]' for fmt in EXPORT_FORMATS]
+            + ['api_search'])
+
+
+def run_case(name: str) -> Dict:
+    """이름[인자] 형식의 측정 항목 하나 실행"""
+    base, _, argument = name.partition('[')
+    argument = argument.rstrip(']')
+    if base == 'curl':
+        return case_curl()
+    if base == 'parse_xml':
+        return case_parse_xml(int(argument))
+    if base == 'transform':
+        return case_transform(int(argument or ROWS))
+    if base == 'filter':
+        return case_filter(int(argument or ROWS))
+    if base == 'export':
+        return case_export(argument)
+    if base == 'api_search':
+        return case_api_search()
+    if base == 'cassette':
+        return case_cassette(argument)
+    raise ValueError(f'알 수 없는 측정 항목입니다: {name}')
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names: List[str]) -> Dict:
+    results = {}
+    for name in names:
+        print(f'▶ {name}', file=sys.stderr, flush=True)
+        proc = subprocess.run([sys.executable, '-m', 'benchmarks.suite', '--case', name],
+                              capture_output=True, text=True, cwd=ROOT)
+        if proc.returncode != 0:
+            message = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f'exit {proc.returncode}'
+            print(f'  실패: {message}', file=sys.stderr)
+            results[name] = {'error': message}
+            continue
+        results[name] = json.loads(proc.stdout)
+        print('  ' + ', '.join(f'{key}={value}' for key, value in results[name].items()), file=sys.stderr)
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def metric_direction(metric: str) -> Optional[str]:
+    """'higher' / 'lower' (좋은 방향), 비교하지 않는 지표는 None (p95는 잡음이 커서 참고용)"""
+    if metric.endswith('_per_second'):
+        return 'higher'
+    if 'p95' in metric:
+        return None
+    if metric.endswith(('_ms', '_seconds', '_mb')) and metric not in ('input_mb', 'output_mb', 'peak_rss_mb'):
+        return 'lower'
+    return None
+
+
+def compare(before: Dict, after: Dict, threshold: float) -> List[Dict]:
+    """두 결과의 지표별 변화 (regression: 기준보다 나빠짐)"""
+    rows = []
+    for name, metrics in after['results'].items():
+        old = before['results'].get(name)
+        if not old or 'error' in old or 'error' in metrics:
+            continue
+        for metric, value in metrics.items():
+            direction = metric_direction(metric)
+            previous = old.get(metric)
+            if direction is None or not isinstance(previous, (int, float)) or not previous:
+                continue
+            change = (value - previous) / previous
+            worse = -change if direction == 'higher' else change
+            floor = next(floor for suffix, floor in NOISE_FLOOR.items() if metric.endswith(suffix))
+            rows.append({
+                'case': name,
+                'metric': metric,
+                'before': previous,
+                'after': value,
+                'change': change,
+                'regression': worse > threshold and abs(value - previous) > floor,
+                'improvement': -worse > threshold and abs(value - previous) > floor,
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict], before: Dict, after: Dict) -> None:
+    print(f"기준 {before['meta'].get('commit')} ({before['meta']['timestamp']}) → "
+          f"비교 {after['meta'].get('commit')} ({after['meta']['timestamp']})")
+    print(f"{'항목':<20} {'지표':<28} {'기준':>12} {'비교':>12} {'변화':>8}")
+    for row in rows:
+        mark = ' ❌ 저하' if row['regression'] else (' ✅ 개선' if row['improvement'] else '')
+        print(f"{row['case']:<20} {row['metric']:<28} {row['before']:>12} {row['after']:>12} "
+              f"{row['change'] * 100:>+7.1f}%{mark}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='핫패스 벤치마크')
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    subparsers = parser.add_subparsers(dest='command')
+
+    run = subparsers.add_parser('run', help='벤치마크 실행 후 JSON 저장')
+    run.add_argument('-o', '--output', default='benchmark-results.json', help='결과 파일')
+    run.add_argument('--only', help='실행할 항목 (쉼표 구분, 이름 앞부분 일치: parse_xml,curl)')
+    run.add_argument('--full', action='store_true', help='1,000,000건 XML 해석 포함 (메모리 수 GB 필요)')
+    run.add_argument('--cassette', action='append', default=[], metavar='PATH',
+                     help='기록한 실제 응답(cassette.py)의 해석 처리량도 측정')
+
+    diff = subparsers.add_parser('compare', help='두 결과 비교 (저하가 있으면 종료 코드 1)')
+    diff.add_argument('before')
+    diff.add_argument('after')
+    diff.add_argument('--threshold', type=float, default=0.10, help='저하로 볼 변화 비율 (기본 0.10)')
+
+    subparsers.add_parser('list', help='측정 항목 목록')
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case)))
+        return 0
+    if args.command == 'list':
+        print('\n'.join(case_names(full=True)))
+        return 0
+    if args.command == 'run':
+        names = case_names(args.full) + [f'cassette[{os.path.abspath(path)}]' for path in args.cassette]
+        if args.only:
+            prefixes = [prefix.strip() for prefix in args.only.split(',') if prefix.strip()]
+            names = [name for name in names if name.startswith(tuple(prefixes))]
+        report = run_suite(names)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'💾 {args.output}', file=sys.stderr)
+        return 1 if any('error' in result for result in report['results'].values()) else 0
+    if args.command == 'compare':
+        with open(args.before, encoding='utf-8') as f:
+            before = json.load(f)
+        with open(args.after, encoding='utf-8') as f:
+            after = json.load(f)
+        rows = compare(before, after, args.threshold)
+        print_comparison(rows, before, after)
+        regressions = [row for row in rows if row['regression']]
+        if regressions:
+            print(f'\n❌ {len(regressions)}개 지표가 {args.threshold:.0%} 넘게 나빠졌습니다.')
+            return 1
+        print(f'\n✅ {args.threshold:.0%} 넘게 나빠진 지표가 없습니다.')
+        return 0
+    parser.print_help()
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
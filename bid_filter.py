@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+입찰공고 다중 조건 필터
+Vectorized filter engine over a columnar result set
+
+조회한 결과를 한 번 열(column) 단위 배열로 바꿔 두고, 검색 조건을
+numpy 불리언 마스크로 컴파일해 한꺼번에 평가한다. 필터만 바뀐 재검색은
+이미 가져온 결과에 마스크만 다시 적용하므로 upstream 재조회가 없다.
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from metrics import estimate_bytes
+
+
+INSTITUTION_FIELDS = {
+    'demand': 'dminsttNm',   # 수요기관
+    'notice': 'ntceInsttNm',  # 공고기관
+}
+
+# 키워드별 마스크 캐시 크기
+KEYWORD_CACHE_SIZE = 32
+
+
+def _factorize(values: Sequence[str]):
+    """문자열 목록을 (고유값 목록, 코드 배열)로 변환"""
+    names: Dict[str, int] = {}
+    codes = np.fromiter((names.setdefault(value, len(names)) for value in values),
+                        dtype=np.int32, count=len(values))
+    return list(names), codes
+
+
+def _to_price(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_deadline(value) -> np.datetime64:
+    try:
+        return np.datetime64(str(value or 'NaT')[:16], 'm')
+    except (TypeError, ValueError):
+        return np.datetime64('NaT', 'm')
+
+
+def _deadlines(bids: List[Dict]) -> np.ndarray:
+    """마감일시 열 (형식이 잘못된 값은 NaT - 한 행 때문에 검색 전체가 실패하지 않도록)"""
+    values = [str(bid.get('bidClseDt') or 'NaT')[:16] for bid in bids]
+    try:
+        return np.array(values, dtype='datetime64[m]')
+    except (TypeError, ValueError):
+        return np.array([_to_deadline(value) for value in values], dtype='datetime64[m]')
+
+
+class BidColumns:
+    """
+    검색 결과의 열 지향 표현
+
+    - 기관명/입찰 구분: 고유값 코드 배열 (조건은 고유값에서만 평가 후 룩업)
+    - 예정가격: float64 (없으면 NaN)
+    - 마감일시: datetime64[m] (없거나 형식이 잘못되었으면 NaT)
+    - 공고명: 소문자로 이어 붙인 텍스트와 행 시작 오프셋 (키워드 검색용)
+
+    errors/truncated_types는 가져올 때의 조회 실패와 페이지 한도로 잘린 입찰
+    구분으로, 이 결과를 재사용하는 검색도 같은 경고를 돌려주도록 보관한다.
+    """
+
+    def __init__(self, bids: List[Dict], fetch_key=None,
+                 errors: Optional[List[Dict]] = None, truncated_types: Optional[List[str]] = None):
+        self.bids = bids
+        self.fetch_key = fetch_key
+        self.fetched_at = time.time()
+        self.errors = list(errors or [])
+        self.truncated_types = list(truncated_types or [])
+        size = len(bids)
+
+        self.alive = np.ones(size, dtype=bool)
+        self._row_of = {bid['id']: row for row, bid in enumerate(bids)}
+
+        self.type_names, self.type_codes = _factorize([bid['id'].split('_', 1)[0] for bid in bids])
+        self.institutions = {
+            key: _factorize([bid.get(field) or '' for bid in bids])
+            for key, field in INSTITUTION_FIELDS.items()
+        }
+        self.price = np.fromiter((_to_price(bid.get('presmptPrce')) for bid in bids),
+                                 dtype=np.float64, count=size)
+        self.deadline = _deadlines(bids)
+
+        titles = [(bid.get('bidNtceNm') or '').lower() for bid in bids]
+        self.text = '\n'.join(titles)
+        lengths = np.fromiter((len(title) + 1 for title in titles), dtype=np.int64, count=size)
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])) if size else np.zeros(0, np.int64)
+        self._keyword_masks: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.bids)
+
+    def memory_bytes(self) -> int:
+        """열 배열, 공고명 텍스트, 원본 항목의 대략적인 메모리 사용량"""
+        arrays = [self.alive, self.type_codes, self.price, self.deadline, self.offsets,
+                  *(codes for _, codes in self.institutions.values()), *self._keyword_masks.values()]
+        return sum(array.nbytes for array in arrays) + sys.getsizeof(self.text) + estimate_bytes(self.bids)
+
+    def remove(self, bid_ids: Iterable[str]) -> None:
+        """삭제된 항목은 이후 필터 결과에서 제외"""
+        for bid_id in bid_ids:
+            row = self._row_of.get(bid_id)
+            if row is not None:
+                self.alive[row] = False
+
+    def keyword_mask(self, keyword: str) -> np.ndarray:
+        """공고명에 키워드가 포함된 행 마스크 (대소문자 무시, LRU 캐시)"""
+        keyword = keyword.lower()
+        mask = self._keyword_masks.get(keyword)
+        if mask is not None:
+            self._keyword_masks.move_to_end(keyword)
+            return mask
+
+        # 이어 붙인 텍스트에서 일치 위치를 찾고, 위치를 행 번호로 변환
+        positions = []
+        find = self.text.find
+        pos = find(keyword)
+        while pos != -1:
+            positions.append(pos)
+            pos = find(keyword, pos + 1)
+
+        mask = np.zeros(len(self.bids), dtype=bool)
+        if positions:
+            rows = np.searchsorted(self.offsets, np.asarray(positions, dtype=np.int64), side='right') - 1
+            mask[rows] = True
+
+        self._keyword_masks[keyword] = mask
+        if len(self._keyword_masks) > KEYWORD_CACHE_SIZE:
+            self._keyword_masks.popitem(last=False)
+        return mask
+
+    def rows(self, mask: np.ndarray) -> List[Dict]:
+        """마스크에 해당하는 항목 목록"""
+        bids = self.bids
+        return [bids[row] for row in np.flatnonzero(mask)]
+
+
+class BidQuery:
+    """
+    검색 조건
+
+    Args:
+        agencies: 기관명 목록 (부분 일치, 하나라도 맞으면 통과)
+        institution: 기관명 비교 대상 ('demand' 수요기관 / 'notice' 공고기관)
+        bid_types: 입찰 구분 코드 목록 ('servc', 'cnstwk', 'thng')
+        keyword: 공고명 키워드 (부분 일치)
+        min_price, max_price: 예정가격 범위 (원)
+        deadline_from, deadline_to: 마감일 범위 ('YYYY-MM-DD', 종료일 포함)
+    """
+
+    def __init__(self,
+                 agencies: Optional[List[str]] = None,
+                 institution: str = 'demand',
+                 bid_types: Optional[List[str]] = None,
+                 keyword: str = '',
+                 min_price: Optional[float] = None,
+                 max_price: Optional[float] = None,
+                 deadline_from: Optional[str] = None,
+                 deadline_to: Optional[str] = None):
+        if institution not in INSTITUTION_FIELDS:
+            raise ValueError(f'기관 구분은 demand 또는 notice여야 합니다: {institution}')
+        self.agencies = [agency for agency in (agencies or []) if agency and agency != 'all']
+        self.institution = institution
+        self.bid_types = list(bid_types or [])
+        self.keyword = (keyword or '').strip()
+        self.min_price = min_price
+        self.max_price = max_price
+        self.deadline_from = np.datetime64(deadline_from, 'm') if deadline_from else None
+        self.deadline_to = (np.datetime64(deadline_to, 'D') + np.timedelta64(1, 'D')).astype('datetime64[m]') \
+            if deadline_to else None
+
+    @classmethod
+    def from_request(cls, data: Dict, bid_types: Optional[List[str]] = None) -> 'BidQuery':
+        """검색 요청 본문의 필터 조건 (단일 agency_filter도 지원)"""
+        agencies = data.get('agencies')
+        if agencies is None:
+            agencies = [data.get('agency_filter', '')]
+        elif isinstance(agencies, str):
+            agencies = [agency.strip() for agency in agencies.split(',')]
+
+        def price(name):
+            value = data.get(name)
+            return float(value) if value not in (None, '') else None
+
+        return cls(
+            agencies=agencies,
+            institution=data.get('institution') or 'demand',
+            bid_types=bid_types,
+            keyword=data.get('keyword', ''),
+            min_price=price('min_price'),
+            max_price=price('max_price'),
+            deadline_from=data.get('deadline_from') or None,
+            deadline_to=data.get('deadline_to') or None,
+        )
+
+    def mask(self, columns: BidColumns) -> np.ndarray:
+        """조건을 모두 만족하는 행 마스크"""
+        mask = columns.alive.copy()
+
+        if self.bid_types:
+            allowed = np.array([name in self.bid_types for name in columns.type_names], dtype=bool)
+            mask &= allowed[columns.type_codes]
+
+        if self.agencies:
+            names, codes = columns.institutions[self.institution]
+            allowed = np.array([any(agency in name for agency in self.agencies) for name in names],
+                               dtype=bool)
+            mask &= allowed[codes]
+
+        if self.min_price is not None:
+            mask &= columns.price >= self.min_price
+        if self.max_price is not None:
+            mask &= columns.price <= self.max_price
+
+        if self.deadline_from is not None:
+            mask &= columns.deadline >= self.deadline_from
+        if self.deadline_to is not None:
+            mask &= columns.deadline < self.deadline_to
+
+        if self.keyword:
+            mask &= columns.keyword_mask(self.keyword)
+
+        return mask
+
+    def apply(self, columns: BidColumns) -> List[Dict]:
+        """조건에 맞는 항목 목록"""
+        return columns.rows(self.mask(columns))
+
+    def filter(self, bids: List[Dict]) -> List[Dict]:
+        """열 변환 없이 갖고 있는 항목 목록에 바로 적용 (스트리밍 청크용)"""
+        if not bids:
+            return bids
+        return self.apply(BidColumns(bids))
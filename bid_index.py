@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+입찰공고 검색 결과 인덱스
+Keyset cursor pagination over an in-memory result set
+"""
+
+import base64
+import bisect
+import json
+import sys
+import uuid
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from metrics import estimate_bytes
+
+
+# 정렬 가능한 필드
+SORT_FIELDS = ('bidNtceDt', 'bidClseDt', 'presmptPrce', 'bidNtceNm', 'dminsttNm')
+DEFAULT_SORT = 'bidNtceDt'
+DEFAULT_ORDER = 'desc'
+
+
+class CursorError(ValueError):
+    """잘못되었거나 다른 검색 결과에서 발급된 커서"""
+
+
+def _sort_value(bid: Dict, field: str):
+    """정렬 키 값 (예정가격은 숫자로 비교)"""
+    value = bid.get(field) or ''
+    if field == 'presmptPrce':
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return -1
+    return value
+
+
+class BidIndex:
+    """
+    검색 결과 인덱스
+
+    정렬 필드별로 (정렬값, bidNtceNo, id) 키를 정렬해 두고,
+    커서에는 마지막으로 내려준 키를 담아 bisect로 다음 위치를 찾는다.
+    깊은 페이지도 offset 스캔 없이 O(log n + limit)으로 조회된다.
+    """
+
+    def __init__(self, bids: Iterable[Dict] = (), result_id: Optional[str] = None):
+        self.result_id = result_id or uuid.uuid4().hex[:12]
+        self._bids = {bid['id']: bid for bid in bids}
+        self._keys: Dict[str, List[Tuple]] = {}
+
+    def __len__(self) -> int:
+        return len(self._bids)
+
+    def memory_bytes(self) -> int:
+        """항목과 정렬 키의 대략적인 메모리 사용량"""
+        keys = sum(sys.getsizeof(keys) + sys.getsizeof(keys[0]) * len(keys) for keys in self._keys.values() if keys)
+        return estimate_bytes(list(self._bids.values())) + keys
+
+    def __contains__(self, bid_id: str) -> bool:
+        return bid_id in self._bids
+
+    def get(self, bid_id: str) -> Optional[Dict]:
+        return self._bids.get(bid_id)
+
+    def get_many(self, bid_ids: Iterable[str]) -> List[Dict]:
+        """id 목록에 해당하는 항목 (기본 정렬 순서)"""
+        return list(self.iter_many(bid_ids))
+
+    def iter_many(self, bid_ids: Iterable[str]) -> Iterator[Dict]:
+        """id 목록에 해당하는 항목을 기본 정렬 순서로 순회"""
+        wanted = set(bid_ids)
+        return (bid for bid in self.ordered() if bid['id'] in wanted)
+
+    def _key(self, bid: Dict, field: str) -> Tuple:
+        return (_sort_value(bid, field), bid.get('bidNtceNo', ''), bid['id'])
+
+    def _sorted_keys(self, field: str) -> List[Tuple]:
+        """필드별 정렬 키 (처음 요청될 때 한 번만 생성)"""
+        keys = self._keys.get(field)
+        if keys is None:
+            keys = sorted(self._key(bid, field) for bid in self._bids.values())
+            self._keys[field] = keys
+        return keys
+
+    def ordered(self, sort: str = DEFAULT_SORT, order: str = DEFAULT_ORDER) -> Iterator[Dict]:
+        """
+        정렬 순서대로 전체 항목 순회
+
+        순회 중 삭제가 일어나도 안전하도록 키 목록의 스냅샷을 순회하고,
+        이미 삭제된 항목은 건너뛴다.
+        """
+        _validate_sort(sort, order)
+        keys = list(self._sorted_keys(sort))
+        if order == 'desc':
+            keys.reverse()
+        for key in keys:
+            bid = self._bids.get(key[2])
+            if bid is not None:
+                yield bid
+
+    def page(self,
+             limit: int,
+             cursor: Optional[str] = None,
+             sort: str = DEFAULT_SORT,
+             order: str = DEFAULT_ORDER) -> Tuple[List[Dict], Optional[str]]:
+        """
+        커서 기반 페이지 조회
+
+        Returns:
+            (페이지 항목, 다음 페이지 커서 또는 None)
+        """
+        _validate_sort(sort, order)
+        keys = self._sorted_keys(sort)
+
+        if order == 'asc':
+            start = bisect.bisect_right(keys, self._decode_cursor(cursor, sort, order)) if cursor else 0
+            window = keys[start:start + limit]
+            has_more = start + limit < len(keys)
+        else:
+            end = bisect.bisect_left(keys, self._decode_cursor(cursor, sort, order)) if cursor else len(keys)
+            window = keys[max(0, end - limit):end][::-1]
+            has_more = end - limit > 0
+
+        items = [self._bids[key[2]] for key in window]
+        next_cursor = self._encode_cursor(window[-1], sort, order) if window and has_more else None
+        return items, next_cursor
+
+    def remove(self, bid_ids: Iterable[str]) -> int:
+        """항목 삭제 (정렬 키에서도 제거), 삭제된 개수 반환"""
+        removed = 0
+        for bid_id in set(bid_ids):
+            bid = self._bids.pop(bid_id, None)
+            if bid is None:
+                continue
+            removed += 1
+            for field, keys in self._keys.items():
+                key = self._key(bid, field)
+                pos = bisect.bisect_left(keys, key)
+                if pos < len(keys) and keys[pos] == key:
+                    del keys[pos]
+        return removed
+
+    def _encode_cursor(self, key: Tuple, sort: str, order: str) -> str:
+        payload = json.dumps([self.result_id, sort, order, list(key)],
+                             ensure_ascii=False, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _decode_cursor(self, cursor: str, sort: str, order: str) -> Tuple:
+        result_id, c_sort, c_order, key = _parse_cursor(cursor)
+
+        if result_id != self.result_id:
+            raise CursorError('검색 결과가 변경되었습니다. 다시 검색해주세요.')
+        if (c_sort, c_order) != (sort, order):
+            raise CursorError('커서의 정렬 조건이 요청과 다릅니다.')
+        # 키의 형식이 정렬 키와 다르면 bisect에서 비교할 수 없음 (변조된 커서)
+        value_type = int if sort == 'presmptPrce' else str
+        if (len(key) != 3 or type(key[0]) is not value_type
+                or not isinstance(key[1], str) or not isinstance(key[2], str)):
+            raise CursorError('잘못된 커서입니다.')
+        return key
+
+
+def _parse_cursor(cursor: str) -> Tuple:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        result_id, sort, order, key = json.loads(base64.urlsafe_b64decode(padded))
+        if not all(isinstance(value, str) for value in (result_id, sort, order)):
+            raise ValueError(cursor)
+        return result_id, sort, order, tuple(key)
+    except Exception:
+        raise CursorError('잘못된 커서입니다.')
+
+
+def cursor_result_id(cursor: str) -> str:
+    """커서를 발급한 검색 결과의 result_id"""
+    return _parse_cursor(cursor)[0]
+
+
+def _validate_sort(sort: str, order: str) -> None:
+    if sort not in SORT_FIELDS:
+        raise ValueError(f'정렬할 수 없는 필드입니다: {sort}')
+    if order not in ('asc', 'desc'):
+        raise ValueError(f'정렬 방향은 asc 또는 desc여야 합니다: {order}')
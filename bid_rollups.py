@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+입찰공고 집계
+Incrementally maintained rollups of bid counts and estimated prices by day, bid type and agency
+
+저장소(BidStore)의 리스너로 붙어 배치마다 (공고일, 입찰 구분, 수요기관) 단위 집계를
+갱신한다. /api/stats의 group-by 조회는 원본 공고가 아니라 이 집계 행만 읽으므로
+비용이 공고 수가 아니라 집계 행(그룹) 수에 비례한다.
+
+- 측정값: 공고 수, 예정가격이 있는 공고 수, 예정가격 합계/최소/최대
+- 새 공고는 그룹에 더하고, 정정 공고는 이전 내용을 빼고 이후 내용을 더한다.
+  빼기만으로는 최소/최대를 되돌릴 수 없으므로, 예정가격이 빠진 그룹은 저장소에 반영된
+  해당 그룹의 공고로 최소/최대를 다시 계산한다 (정정은 드물어 전체 비용은 작음).
+- 예정가격 해석은 파이썬 함수 하나(parse_price)를 SQLite 함수로도 등록해 함께 쓴다.
+"""
+
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bid_store import BidStore, IngestBatch, bid_type_of
+from config import STATS_DEFAULT_LIMIT, STATS_MAX_LIMIT
+from search_service import TYPE_NAMES, resolve_types
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bid_rollups (
+    day TEXT NOT NULL,
+    bid_type TEXT NOT NULL,
+    agency TEXT NOT NULL,
+    bid_count INTEGER NOT NULL,
+    price_count INTEGER NOT NULL,
+    price_sum REAL NOT NULL,
+    price_min REAL,
+    price_max REAL,
+    PRIMARY KEY (day, bid_type, agency)
+);
+CREATE TABLE IF NOT EXISTS bid_rollups_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    built_at REAL NOT NULL
+);
+"""
+
+DIMENSIONS = ('day', 'bid_type', 'agency')
+# 날짜 단위별 집계 키 (day는 YYYY-MM-DD, 주는 그 주 월요일)
+BUCKETS = {
+    'day': 'day',
+    'week': "date(day, '-6 days', 'weekday 1')",
+    'month': 'substr(day, 1, 7)',
+    'year': 'substr(day, 1, 4)',
+}
+SORTS = ('count', 'price_sum')
+
+Group = Tuple[str, str, str]
+
+
+def parse_price(value) -> Optional[float]:
+    """예정가격 문자열을 숫자로 (비었거나 숫자가 아니면 None)"""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if math.isfinite(price) else None
+
+
+def group_of(bid: Dict) -> Group:
+    """공고가 속한 집계 그룹 (공고일, 입찰 구분, 수요기관)"""
+    return (bid.get('bidNtceDt') or '')[:10], bid_type_of(bid), bid.get('dminsttNm') or ''
+
+
+def _number(value: Optional[float]):
+    """원 단위 금액은 정수로 (JSON에 .0이 붙지 않도록)"""
+    if value is not None and float(value).is_integer():
+        return int(value)
+    return value
+
+
+def stats_params(data) -> Dict:
+    """
+    /api/stats 요청 파라미터를 BidRollups.query 인자로 (잘못된 값이면 ValueError)
+
+    group_by(day,bid_type,agency 중 쉼표 구분), bucket(day/week/month/year),
+    start_date/end_date(YYYY-MM-DD), bid_type, agency(부분 일치, 쉼표로 여러 개), sort, limit
+    """
+    group_by = [name.strip() for name in (data.get('group_by') or 'day').split(',') if name.strip()]
+    for name in group_by:
+        if name not in DIMENSIONS:
+            raise ValueError(f'알 수 없는 집계 기준입니다: {name} (day, bid_type, agency)')
+    bucket = data.get('bucket') or 'day'
+    if bucket not in BUCKETS:
+        raise ValueError(f'날짜 단위는 {", ".join(BUCKETS)} 중 하나여야 합니다: {bucket}')
+    for name in ('start_date', 'end_date'):
+        if data.get(name):
+            datetime.strptime(data[name], '%Y-%m-%d')
+    sort = data.get('sort') or None
+    if sort is not None and sort not in SORTS:
+        raise ValueError(f'정렬 기준은 {" 또는 ".join(SORTS)}여야 합니다: {sort}')
+    limit = int(data.get('limit') or STATS_DEFAULT_LIMIT)
+    if not 1 <= limit <= STATS_MAX_LIMIT:
+        raise ValueError(f'limit은 1~{STATS_MAX_LIMIT} 사이여야 합니다.')
+    return {
+        'group_by': list(dict.fromkeys(group_by)),
+        'bucket': bucket,
+        'start_date': data.get('start_date') or None,
+        'end_date': data.get('end_date') or None,
+        'types': resolve_types(data.get('bid_type') or 'all'),
+        'agencies': [name.strip() for name in (data.get('agency') or '').split(',')
+                     if name.strip() and name.strip() != 'all'],
+        'sort': sort,
+        'limit': limit,
+    }
+
+
+class BidRollups:
+    """입찰공고 집계 (BidStore와 같은 SQLite DB 사용, store.add_listener로 등록)"""
+
+    transactional = True   # 공고 저장과 같은 트랜잭션에서 갱신 (실패하면 배치가 롤백됨)
+
+    def __init__(self, store: BidStore):
+        self._store = store
+        self._lock = store.lock
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+        with store.transaction():
+            if self._conn.execute('SELECT 1 FROM bid_rollups_meta').fetchone() is None:
+                self.rebuild()
+
+    @property
+    def _conn(self):
+        # 연결이 새로 열릴 수 있으므로(fork된 워커) 쓸 때마다 등록
+        connection = self._store.connection
+        connection.create_function('bid_price', 1, parse_price, deterministic=True)
+        return connection
+
+    def rebuild(self) -> None:
+        """저장된 공고 전체로 집계를 다시 만듦 (집계가 없던 저장소를 처음 열 때)"""
+        with self._store.transaction():
+            self._conn.execute('DELETE FROM bid_rollups')
+            self._conn.execute(
+                'INSERT INTO bid_rollups (day, bid_type, agency, bid_count, price_count, price_sum, price_min, price_max)'
+                ' SELECT day, bid_type, agency, COUNT(*), COUNT(price), COALESCE(SUM(price), 0), MIN(price), MAX(price)'
+                ' FROM (SELECT substr(bidNtceDt, 1, 10) AS day, bid_type, dminsttNm AS agency,'
+                '       bid_price(presmptPrce) AS price FROM bids)'
+                ' GROUP BY day, bid_type, agency'
+            )
+            self._conn.execute('INSERT OR REPLACE INTO bid_rollups_meta (id, built_at)'
+                               " VALUES (1, strftime('%s', 'now'))")
+
+    def __call__(self, batch: IngestBatch) -> None:
+        """배치 반영 (정정 공고는 이전 내용을 빼고 이후 내용을 더함)"""
+        # 그룹별 [공고 수, 예정가격 수, 합계, 최소, 최대] 변화량
+        deltas: Dict[Group, List] = defaultdict(lambda: [0, 0, 0.0, None, None])
+        shrunk = set()   # 예정가격이 빠져 최소/최대를 다시 계산할 그룹
+
+        def add(bid: Dict, sign: int) -> None:
+            group = group_of(bid)
+            delta = deltas[group]
+            delta[0] += sign
+            price = parse_price(bid.get('presmptPrce'))
+            if price is None:
+                return
+            delta[1] += sign
+            delta[2] += sign * price
+            if sign > 0:
+                delta[3] = price if delta[3] is None else min(delta[3], price)
+                delta[4] = price if delta[4] is None else max(delta[4], price)
+            else:
+                shrunk.add(group)
+
+        for bid in batch.new:
+            add(bid, 1)
+        for before, after in batch.updated:
+            add(before, -1)
+            add(after, 1)
+
+        rows = [(*group, *delta) for group, delta in deltas.items()
+                if delta[0] or delta[1] or delta[2] or delta[3] is not None]
+        if not rows and not shrunk:
+            return
+        with self._store.transaction():
+            self._conn.executemany(
+                'INSERT INTO bid_rollups (day, bid_type, agency, bid_count, price_count, price_sum, price_min, price_max)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT(day, bid_type, agency) DO UPDATE SET'
+                ' bid_count = bid_count + excluded.bid_count,'
+                ' price_count = price_count + excluded.price_count,'
+                ' price_sum = price_sum + excluded.price_sum,'
+                ' price_min = MIN(COALESCE(price_min, excluded.price_min), COALESCE(excluded.price_min, price_min)),'
+                ' price_max = MAX(COALESCE(price_max, excluded.price_max), COALESCE(excluded.price_max, price_max))',
+                rows
+            )
+            # 저장소에는 이미 배치가 반영되어 있으므로 그룹의 현재 공고로 최소/최대를 구함
+            for day, bid_type, agency in shrunk:
+                self._conn.execute(
+                    'UPDATE bid_rollups SET (price_min, price_max) = ('
+                    '  SELECT MIN(bid_price(presmptPrce)), MAX(bid_price(presmptPrce)) FROM bids'
+                    '  WHERE bid_type = ? AND bidNtceDt >= ? AND bidNtceDt < ? AND dminsttNm = ?)'
+                    ' WHERE day = ? AND bid_type = ? AND agency = ?',
+                    (bid_type, day, day + '\uffff', agency, day, bid_type, agency)
+                )
+            self._conn.execute('DELETE FROM bid_rollups WHERE bid_count <= 0')
+
+    def query(self,
+              group_by: List[str],
+              bucket: str = 'day',
+              start_date: Optional[str] = None,
+              end_date: Optional[str] = None,
+              types: Optional[List[str]] = None,
+              agencies: Optional[List[str]] = None,
+              sort: Optional[str] = None,
+              limit: int = STATS_DEFAULT_LIMIT) -> Dict:
+        """
+        집계 행을 group_by 기준으로 다시 묶어 반환
+
+        정렬은 sort(count/price_sum, 큰 순)가 없으면 날짜 기준이 있을 때 날짜 순, 아니면 공고 수 큰 순.
+
+        Returns:
+            {'rows': [...], 'totals': {...}, 'groups': 전체 그룹 수, 'truncated': bool}
+        """
+        columns = {'day': BUCKETS[bucket], 'bid_type': 'bid_type', 'agency': 'agency'}
+        keys = [f'{columns[name]} AS {name}' for name in group_by]
+        where, params = ['1 = 1'], []
+        if start_date:
+            where.append('day >= ?')
+            params.append(start_date)
+        if end_date:
+            where.append('day <= ?')
+            params.append(end_date)
+        if types:
+            where.append(f"bid_type IN ({','.join('?' * len(types))})")
+            params.extend(types)
+        if agencies:
+            where.append('(' + ' OR '.join('instr(agency, ?) > 0' for _ in agencies) + ')')
+            params.extend(agencies)
+
+        measures = ('SUM(bid_count) AS count, SUM(price_count) AS price_count, SUM(price_sum) AS price_sum,'
+                    ' MIN(price_min) AS price_min, MAX(price_max) AS price_max')
+        if sort:
+            order = f'{sort} DESC' + ''.join(f', {name}' for name in group_by)
+        elif 'day' in group_by:
+            order = ', '.join(group_by)
+        else:
+            order = 'count DESC' + ''.join(f', {name}' for name in group_by)
+        grouped = f"SELECT {', '.join(keys + [measures])} FROM bid_rollups WHERE {' AND '.join(where)}"
+        if group_by:
+            # GROUP BY의 이름은 별칭보다 원래 열(day)을 먼저 가리키므로 식으로 묶음
+            grouped += f" GROUP BY {', '.join(columns[name] for name in group_by)}"
+
+        with self._lock:
+            rows = self._conn.execute(f'{grouped} ORDER BY {order} LIMIT ?', (*params, limit + 1)).fetchall()
+            totals = self._conn.execute(
+                f"SELECT COUNT(*) AS groups, SUM(count) AS count, SUM(price_count) AS price_count,"
+                f" SUM(price_sum) AS price_sum, MIN(price_min) AS price_min, MAX(price_max) AS price_max"
+                f" FROM ({grouped})", params
+            ).fetchone()
+
+        def measure(row) -> Dict:
+            return {
+                'count': row['count'] or 0,
+                'price_count': row['price_count'] or 0,
+                'price_sum': _number(row['price_sum'] or 0),
+                'price_min': _number(row['price_min']),
+                'price_max': _number(row['price_max']),
+                'price_avg': round(row['price_sum'] / row['price_count']) if row['price_count'] else None,
+            }
+
+        result_rows = []
+        for row in rows[:limit]:
+            item = {name: row[name] for name in group_by}
+            if 'bid_type' in item:
+                item['bid_type_name'] = TYPE_NAMES.get(item['bid_type'], item['bid_type'])
+            item.update(measure(row))
+            result_rows.append(item)
+        return {'rows': result_rows, 'totals': measure(totals), 'groups': totals['groups'] or 0,
+                'truncated': len(rows) > limit}
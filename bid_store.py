@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+입찰공고 로컬 저장소
+SQLite store that ingests fetched bids and notifies listeners of changes
+
+조회(동기화)한 입찰공고를 id 기준으로 저장하고, 배치마다 새로 들어온 공고와
+내용이 바뀐(정정) 공고를 구분해 등록된 리스너에 알린다. 저장된 검색 알림,
+기관 색인, 집계 등은 리스너로 붙어 배치 단위로 갱신된다.
+
+새 공고/정정 공고의 구분과 저장, 같은 DB의 부가 테이블(기관 색인, 집계) 갱신은
+BEGIN IMMEDIATE 트랜잭션 하나에서 하므로, 여러 워커 프로세스나 CLI가 함께 써도
+같은 공고를 두 번 새 공고로 세지 않고, 리스너가 실패하면 배치 전체가 롤백된다.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import STORE_PATH
+from search_service import iter_search_chunks
+
+
+BID_FIELDS = ('bidNtceNo', 'bidNtceNm', 'dminsttNm', 'ntceInsttNm', 'bidNtceDt', 'bidClseDt', 'presmptPrce')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bids (
+    id TEXT PRIMARY KEY,
+    bid_type TEXT NOT NULL,
+    bidNtceNo TEXT,
+    bidNtceNm TEXT,
+    dminsttNm TEXT,
+    ntceInsttNm TEXT,
+    bidNtceDt TEXT,
+    bidClseDt TEXT,
+    presmptPrce TEXT,
+    data TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bids_ntce_dt ON bids (bid_type, bidNtceDt);
+"""
+
+
+class IngestBatch:
+    """
+    저장소에 반영된 배치 하나
+
+    Attributes:
+        new: 처음 저장된 공고 목록
+        updated: 내용이 바뀐 공고의 (이전, 이후) 목록
+    """
+
+    def __init__(self, new: List[Dict], updated: List[Tuple[Dict, Dict]]):
+        self.new = new
+        self.updated = updated
+
+    def __bool__(self) -> bool:
+        return bool(self.new or self.updated)
+
+    @property
+    def changed(self) -> List[Dict]:
+        """새 공고와 정정된 공고 (이후 내용)"""
+        return self.new + [after for _, after in self.updated]
+
+
+def bid_type_of(bid: Dict) -> str:
+    """항목 id의 입찰 구분 코드 (servc_... → servc)"""
+    return bid['id'].split('_', 1)[0]
+
+
+class BidStore:
+    """
+    SQLite 입찰공고 저장소
+
+    여러 스레드(웹 요청, 백그라운드 작업)에서 함께 쓰므로 프로세스마다
+    연결 하나를 잠금으로 보호해 사용한다. 운영 모드의 워커처럼 fork된
+    프로세스에서는 처음 사용할 때 연결을 새로 연다.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._lock = threading.RLock()
+        self._depth = 0   # 열려 있는 transaction() 중첩 수 (잠금을 가진 스레드만 바꿈)
+        self._listeners: List[Callable[[IngestBatch], None]] = []
+        self._tx_listeners: List[Callable[[IngestBatch], None]] = []
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._pid = os.getpid()
+        return self._connection
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """같은 DB를 쓰는 부가 테이블(저장된 검색 등)용 연결"""
+        return self._conn
+
+    @property
+    def lock(self) -> threading.RLock:
+        return self._lock
+
+    def add_listener(self, listener: Callable[[IngestBatch], None]) -> None:
+        """
+        배치가 반영될 때마다 호출할 함수 등록
+
+        listener.transactional이 참이면(기관 색인, 집계) 저장과 같은 트랜잭션 안에서
+        호출되어 예외가 나면 배치가 함께 롤백되고, 아니면(알림 전송) 커밋 뒤에 호출된다.
+        """
+        if getattr(listener, 'transactional', False):
+            self._tx_listeners.append(listener)
+        else:
+            self._listeners.append(listener)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        쓰기 트랜잭션 (BEGIN IMMEDIATE - 다른 프로세스의 쓰기와 겹치지 않음)
+
+        이미 열린 트랜잭션 안에서 부르면 그 트랜잭션에 합쳐진다 (ingest 중의 리스너).
+        """
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self._conn
+                finally:
+                    self._depth -= 1
+                return
+
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            self._depth = 1
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+            finally:
+                self._depth = 0
+
+    def ingest(self, bids: Iterable[Dict]) -> IngestBatch:
+        """
+        공고 목록을 저장하고 새 공고/정정 공고를 리스너에 알림
+
+        이미 저장된 공고는 내용이 같으면 건너뛰고, 다르면 갱신한다.
+        """
+        bids = {bid['id']: bid for bid in bids}
+        if not bids:
+            return IngestBatch([], [])
+
+        now = time.time()
+        new, updated = [], []
+        with self.transaction():
+            # 쓰기 잠금을 잡은 뒤 읽으므로 다른 프로세스가 사이에 같은 공고를 넣지 못함
+            existing = self._load(bids.keys())
+            rows = []
+            for bid_id, bid in bids.items():
+                before = existing.get(bid_id)
+                if before == bid:
+                    continue
+                if before is None:
+                    new.append(bid)
+                else:
+                    updated.append((before, bid))
+                rows.append((bid_id, bid_type_of(bid), *(bid.get(field) or '' for field in BID_FIELDS),
+                             json.dumps(bid, ensure_ascii=False), now, now))
+
+            self._conn.executemany(
+                'INSERT INTO bids (id, bid_type, bidNtceNo, bidNtceNm, dminsttNm, ntceInsttNm, bidNtceDt,'
+                ' bidClseDt, presmptPrce, data, first_seen, updated_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT(id) DO UPDATE SET'
+                ' bidNtceNm=excluded.bidNtceNm, dminsttNm=excluded.dminsttNm,'
+                ' ntceInsttNm=excluded.ntceInsttNm, bidNtceDt=excluded.bidNtceDt,'
+                ' bidClseDt=excluded.bidClseDt, presmptPrce=excluded.presmptPrce,'
+                ' data=excluded.data, updated_at=excluded.updated_at',
+                rows
+            )
+            batch = IngestBatch(new, updated)
+            if batch:
+                for listener in self._tx_listeners:
+                    listener(batch)
+
+        if batch:
+            for listener in self._listeners:
+                listener(batch)
+        return batch
+
+    def get(self, bid_id: str) -> Optional[Dict]:
+        return self._load([bid_id]).get(bid_id)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM bids').fetchone()[0]
+
+    def latest_notice_dt(self, bid_type: str) -> Optional[datetime]:
+        """입찰 구분별로 저장된 가장 최근 공고일시"""
+        with self._lock:
+            row = self._conn.execute('SELECT MAX(bidNtceDt) FROM bids WHERE bid_type = ?',
+                                     (bid_type,)).fetchone()
+        if not row or not row[0]:
+            return None
+        try:
+            return datetime.strptime(row[0][:16], '%Y-%m-%d %H:%M')
+        except ValueError:
+            return None
+
+    def iter_bids(self,
+                  types: List[str],
+                  start_dt: datetime,
+                  end_dt: datetime,
+                  batch_size: int = 1000) -> Iterator[Dict]:
+        """기간 내 저장된 공고를 공고일시 순으로 순회 (batch_size개씩 읽음)"""
+        placeholders = ','.join('?' * len(types))
+        last = (start_dt.strftime('%Y-%m-%d %H:%M'), '')
+        end = end_dt.strftime('%Y-%m-%d %H:%M') + '\uffff'
+        while True:
+            # 키셋 페이지네이션 - 배치 사이에 잠금을 풀어도 순회 위치가 유지됨
+            with self._lock:
+                rows = self._conn.execute(
+                    f'SELECT id, bidNtceDt, data FROM bids WHERE bid_type IN ({placeholders})'
+                    ' AND (bidNtceDt, id) > (?, ?) AND bidNtceDt <= ?'
+                    ' ORDER BY bidNtceDt, id LIMIT ?',
+                    (*types, *last, end, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row['data'])
+            last = (rows[-1]['bidNtceDt'], rows[-1]['id'])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _load(self, bid_ids: Iterable[str]) -> Dict[str, Dict]:
+        bid_ids = list(bid_ids)
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for start in range(0, len(bid_ids), 500):
+                part = bid_ids[start:start + 500]
+                placeholders = ','.join('?' * len(part))
+                for row in self._conn.execute(f'SELECT id, data FROM bids WHERE id IN ({placeholders})', part):
+                    found[row['id']] = json.loads(row['data'])
+        return found
+
+
+def sync_bids(client,
+              store: BidStore,
+              types: List[str],
+              start_dt: datetime,
+              end_dt: datetime,
+              max_pages: Optional[int] = None) -> Dict:
+    """
+    기간 내 공고를 조회해 저장소에 반영 (페이지 청크마다 한 배치)
+
+    Returns:
+        {'fetched', 'new', 'updated', 'errors'}
+    """
+    result = {'fetched': 0, 'new': 0, 'updated': 0, 'errors': []}
+    for chunk in iter_search_chunks(client, types, start_dt, end_dt, max_pages=max_pages):
+        if chunk['error']:
+            result['errors'].append({'bid_type': chunk['bid_type'], 'page': chunk['page'],
+                                     'error': chunk['error']})
+        batch = store.ingest(chunk['items'])
+        result['fetched'] += len(chunk['items'])
+        result['new'] += len(batch.new)
+        result['updated'] += len(batch.updated)
+    return result
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+upstream 응답 기록/재생
+Record and replay raw upstream responses (service keys scrubbed) in a compressed cassette
+
+실제 응답(긴 공고명, 빈 필드, 큰 페이지)을 그대로 벤치마크에 쓰기 위해
+G2BClient가 받은 응답 본문을 카세트 파일에 기록하고, 나중에 네트워크 없이
+같은 요청에 같은 본문을 돌려준다.
+
+- 파일: 요청 하나가 JSON 한 줄이고, 줄마다 별도의 gzip 멤버로 덧붙인다
+  (gzip으로 그대로 읽히며, 여러 워커 프로세스가 한 파일에 함께 기록해도 섞이지 않음)
+- 서비스 키는 요청 파라미터에서 빼고 응답 본문에서도 지운다.
+- 재생: (오퍼레이션, 서비스 키를 뺀 파라미터)가 같은 기록을 기록한 순서대로 돌려주고
+  (같은 요청이 더 오면 마지막 기록 반복), 기록된 응답 시간을 speed 배 빠르게 기다린다.
+  speed=0이면 기다리지 않는다.
+
+사용:
+    G2B_CASSETTE=real.jsonl.gz G2B_CASSETTE_MODE=record python main.py fetch --start 2025-01-01 --end 2025-01-31
+    G2B_CASSETTE=real.jsonl.gz G2B_CASSETTE_SPEED=0 python main.py fetch --start 2025-01-01 --end 2025-01-31
+    G2BClient(cassette=Cassette('real.jsonl.gz', speed=10))
+    python cassette.py real.jsonl.gz
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import CASSETTE_MODE, CASSETTE_PATH, CASSETTE_SPEED, SERVICE_KEY
+
+
+MODES = ('record', 'replay')
+SCRUBBED = b'SERVICE_KEY_SCRUBBED'
+
+
+class CassetteMissError(LookupError):
+    """재생할 기록이 없는 요청"""
+    pass
+
+
+def request_key(operation: str, params: Dict) -> Tuple:
+    """기록을 찾는 키 (서비스 키 제외)"""
+    return (operation, tuple(sorted((key, str(value)) for key, value in params.items() if key != 'serviceKey')))
+
+
+class Cassette:
+    """
+    응답 기록/재생 파일
+
+    Args:
+        path: 카세트 파일 (.jsonl.gz)
+        mode: 'record'(받은 응답을 덧붙여 기록) 또는 'replay'(기록으로 응답)
+        speed: 재생 시 기록된 응답 시간을 나눌 배율 (1이면 기록된 그대로, 0이면 기다리지 않음)
+    """
+
+    def __init__(self, path: str, mode: str = 'replay', speed: float = 1.0, service_key: str = SERVICE_KEY):
+        if mode not in MODES:
+            raise ValueError(f'카세트 모드는 {" 또는 ".join(MODES)}여야 합니다: {mode}')
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._secrets = [secret.encode('utf-8') for secret in
+                         {service_key, urllib.parse.quote(service_key, safe='')} if secret]
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[Tuple, List[Dict]]] = None
+        self._played: Dict[Tuple, int] = defaultdict(int)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def record(self, operation: str, params: Dict, body: bytes, elapsed: float) -> None:
+        """응답 하나를 파일 끝에 덧붙임 (gzip 멤버 하나를 한 번에 기록)"""
+        for secret in self._secrets:
+            body = body.replace(secret, SCRUBBED)
+        entry = {
+            'operation': operation,
+            'params': {key: value for key, value in params.items() if key != 'serviceKey'},
+            'recorded_at': time.time(),
+            'elapsed': round(elapsed, 4),
+        }
+        try:
+            entry['body'] = body.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body_base64'] = base64.b64encode(body).decode('ascii')
+        member = gzip.compress((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, member)
+        finally:
+            os.close(fd)
+
+    def interactions(self) -> Iterator[Dict]:
+        """기록된 응답을 기록한 순서대로 ('body'는 bytes)"""
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield _decode_entry(json.loads(line))
+
+    def lookup(self, operation: str, params: Dict) -> Dict:
+        """요청에 돌려줄 기록 (없으면 CassetteMissError)"""
+        key = request_key(operation, params)
+        with self._lock:
+            if self._entries is None:
+                self._entries = defaultdict(list)
+                for entry in self.interactions():
+                    self._entries[request_key(entry['operation'], entry['params'])].append(entry)
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(f'카세트에 없는 요청입니다: {operation} {dict(key[1])}')
+            index = min(self._played[key], len(entries) - 1)
+            self._played[key] += 1
+        return entries[index]
+
+    def delay(self, entry: Dict) -> float:
+        """재생 시 기다릴 시간 (초)"""
+        return entry['elapsed'] / self.speed if self.speed > 0 else 0.0
+
+    def play(self, operation: str, params: Dict) -> bytes:
+        """기록된 응답 시간만큼 기다린 뒤 응답 본문 반환"""
+        entry = self.lookup(operation, params)
+        time.sleep(self.delay(entry))
+        return entry['body']
+
+
+def _decode_entry(entry: Dict) -> Dict:
+    if 'body_base64' in entry:
+        entry['body'] = base64.b64decode(entry.pop('body_base64'))
+    else:
+        entry['body'] = entry['body'].encode('utf-8')
+    return entry
+
+
+_default: Optional[Cassette] = None
+_default_lock = threading.Lock()
+
+
+def default_cassette() -> Optional[Cassette]:
+    """설정(G2B_CASSETTE)의 카세트 - 프로세스에서 하나를 함께 씀 (설정이 없으면 None)"""
+    global _default
+    if not CASSETTE_PATH:
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = Cassette(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_SPEED)
+        return _default
+
+
+def main():
+    parser = argparse.ArgumentParser(description='카세트 파일 요약')
+    parser.add_argument('path', help='카세트 파일 (.jsonl.gz)')
+    args = parser.parse_args()
+
+    summary: Dict[str, Dict] = defaultdict(lambda: {'responses': 0, 'bytes': 0, 'seconds': 0.0})
+    for entry in Cassette(args.path).interactions():
+        row = summary[entry['operation']]
+        row['responses'] += 1
+        row['bytes'] += len(entry['body'])
+        row['seconds'] += entry['elapsed']
+    print(f"{'오퍼레이션':<32} {'응답':>6} {'본문(MB)':>9} {'평균 응답(ms)':>13}")
+    for operation, row in sorted(summary.items()):
+        print(f"{operation:<32} {row['responses']:>6} {row['bytes'] / 1e6:>9.1f} "
+              f"{row['seconds'] / row['responses'] * 1000:>13.0f}")
+    print(f"압축 파일 {os.path.getsize(args.path) / 1e6:.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+명령행 대량 조회
+Non-interactive subcommands for main.py (fetch, today, export, watch, backfill, snapshot)
+
+결과는 한 청크(페이지)씩 받아 바로 출력 스트림에 기록하므로 기간이
+길어도 메모리 사용량이 일정하다. 진행 상황은 stderr에 표시하므로
+stdout은 다른 프로그램에 그대로 파이프할 수 있다.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from agency_index import AgencyIndex
+from backfill import Backfill
+from bid_rollups import BidRollups
+from bid_store import BidStore
+from config import (
+    BACKFILL_WINDOW_DAYS, BACKFILL_WORKERS, FETCH_WINDOW_DAYS, FETCH_WORKERS, UPSTREAM_RATE_BURST,
+    PARSE_WORKERS, SNAPSHOT_DAYS, SNAPSHOT_DIR, SNAPSHOT_REFRESH_DAYS, UPSTREAM_RATE_LIMIT, WATCH_STATE_PATH
+)
+from exporters import EXPORT_FORMATS, check_format, format_price, stream_export
+from g2b_client import G2BClient
+from page_parser import ParserPool
+from saved_searches import AlertDispatcher, SavedSearchStore
+from search_service import date_windows, iter_range_chunks, search_params
+from shared_cache import RateLimiter, SharedCache
+from snapshot import SnapshotBuilder
+from watcher import BidWatcher
+
+
+FILTER_ARGUMENTS = ('agencies', 'keyword', 'min_price', 'max_price', 'deadline_from', 'deadline_to')
+
+
+def add_range_arguments(parser: argparse.ArgumentParser, dates: bool = True) -> None:
+    """조회 기간, 입찰 구분, 필터 옵션"""
+    if dates:
+        parser.add_argument('--start', help='시작일 (YYYY-MM-DD, 기본: 7일 전)')
+        parser.add_argument('--end', help='종료일 (YYYY-MM-DD, 포함, 기본: 오늘)')
+    parser.add_argument('--type', default='all', help='입찰 구분: all, servc, cnstwk, thng (쉼표로 여러 개)')
+    parser.add_argument('--agency', dest='agencies', help='기관명 (부분 일치, 쉼표로 여러 개)')
+    parser.add_argument('--institution', default='demand', choices=('demand', 'notice'),
+                        help='기관명 비교 대상: demand(수요기관) / notice(공고기관)')
+    parser.add_argument('--keyword', help='공고명 키워드')
+    parser.add_argument('--min-price', type=float, help='최소 예정가격 (원)')
+    parser.add_argument('--max-price', type=float, help='최대 예정가격 (원)')
+    parser.add_argument('--deadline-from', help='마감일 시작 (YYYY-MM-DD)')
+    parser.add_argument('--deadline-to', help='마감일 끝 (YYYY-MM-DD, 포함)')
+
+
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    """출력 형식/위치 옵션"""
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS),
+                        help='출력 형식 (기본: 출력 파일 확장자, 없으면 jsonl)')
+    parser.add_argument('-o', '--output', default='-', help='출력 파일 (기본: - 표준 출력)')
+    parser.add_argument('--no-progress', action='store_true', help='진행 표시 끄기')
+
+
+def add_fetch_arguments(parser: argparse.ArgumentParser) -> None:
+    """upstream 조회 옵션"""
+    parser.add_argument('--workers', type=int, default=FETCH_WORKERS, help='동시 조회 작업 수')
+    parser.add_argument('--window-days', type=int, default=FETCH_WINDOW_DAYS, help='조회 구간 단위 (일)')
+    parser.add_argument('--max-pages', type=int, help='구간/입찰 구분별 최대 페이지 수 (기본: 전체)')
+    parser.add_argument('--store', action='store_true', help='조회한 공고를 로컬 저장소에도 반영 (저장된 검색 알림 포함)')
+    add_parse_argument(parser)
+
+
+def add_parse_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--parse-workers', type=int, default=PARSE_WORKERS,
+                        help='응답 해석 프로세스 수 (0이면 조회 스레드에서 해석)')
+
+
+def register(subparsers) -> None:
+    """main.py의 하위 명령 등록"""
+    fetch = subparsers.add_parser('fetch', help='기간 내 입찰공고 전체 조회')
+    add_range_arguments(fetch)
+    add_fetch_arguments(fetch)
+    add_output_arguments(fetch)
+    fetch.set_defaults(handler=run_fetch)
+
+    today = subparsers.add_parser('today', help='오늘 공고된 입찰공고 조회')
+    add_range_arguments(today, dates=False)
+    add_fetch_arguments(today)
+    add_output_arguments(today)
+    today.set_defaults(handler=run_today)
+
+    export = subparsers.add_parser('export', help='로컬 저장소의 입찰공고 내보내기')
+    add_range_arguments(export)
+    add_output_arguments(export)
+    export.set_defaults(handler=run_export)
+
+    watch = subparsers.add_parser('watch', help='새 입찰공고만 계속 조회해 출력')
+    add_range_arguments(watch, dates=False)
+    watch.add_argument('--since', help='처음 조회할 시작 시각 (YYYY-MM-DD 또는 "YYYY-MM-DD HH:MM", 기본: 오늘 0시)')
+    watch.add_argument('--skip-existing', action='store_true',
+                       help='시작 시점까지의 공고는 출력하지 않음 (--state로 이어서 감시할 때는 무시)')
+    watch.add_argument('--state', nargs='?', const=WATCH_STATE_PATH,
+                       help=f'감시 상태 파일 - 다시 시작해도 이어서 감시 (경로 생략 시 {WATCH_STATE_PATH})')
+    watch.add_argument('--interval', type=float, help='조회 간격 고정 (초, 기본: 시간대와 결과에 따라 자동)')
+    watch.add_argument('--once', action='store_true', help='한 번만 조회하고 종료')
+    watch.add_argument('--format', choices=('text', 'jsonl'), default='text', help='출력 형식')
+    watch.add_argument('--store', action='store_true',
+                       help='조회한 공고를 필터와 관계없이 로컬 저장소에도 반영 (저장된 검색 알림 포함)')
+    watch.set_defaults(handler=run_watch)
+
+    backfill = subparsers.add_parser('backfill', help='과거 입찰공고 일괄 수집 (중단되면 다시 실행해 이어서)')
+    backfill.add_argument('--start', required=True, help='시작일 (YYYY-MM-DD)')
+    backfill.add_argument('--end', required=True, help='종료일 (YYYY-MM-DD, 포함)')
+    backfill.add_argument('--type', default='all', help='입찰 구분: all, servc, cnstwk, thng (쉼표로 여러 개)')
+    backfill.add_argument('--workers', type=int, default=BACKFILL_WORKERS, help='동시 수집 작업 수')
+    backfill.add_argument('--window-days', type=int, default=BACKFILL_WINDOW_DAYS, help='수집 구간 단위 (일)')
+    backfill.add_argument('--archive', help='구간별 JSON Lines 파일을 저장할 디렉터리')
+    backfill.add_argument('--no-store', action='store_true', help='로컬 저장소에 반영하지 않음 (--archive 필요)')
+    backfill.add_argument('--job', help='작업 이름 (기본: 기간과 입찰 구분으로 자동)')
+    add_parse_argument(backfill)
+    backfill.add_argument('--no-progress', action='store_true', help='진행 표시 끄기')
+    backfill.set_defaults(handler=run_backfill)
+
+    snapshot = subparsers.add_parser('snapshot', help='GitHub Pages용 정적 데이터 스냅샷 생성')
+    snapshot.add_argument('--days', type=int, default=SNAPSHOT_DAYS, help='담을 기간 (종료일까지, 일)')
+    snapshot.add_argument('--end', help='종료일 (YYYY-MM-DD, 기본: 오늘)')
+    snapshot.add_argument('--type', default='all', help='입찰 구분: all, servc, cnstwk, thng (쉼표로 여러 개)')
+    snapshot.add_argument('--refresh-days', type=int, default=SNAPSHOT_REFRESH_DAYS,
+                          help='파일이 있어도 다시 조회할 최근 일수')
+    snapshot.add_argument('--workers', type=int, default=FETCH_WORKERS, help='동시 조회 작업 수')
+    snapshot.add_argument('-o', '--output', default=SNAPSHOT_DIR, help=f'스냅샷 디렉터리 (기본: {SNAPSHOT_DIR})')
+    snapshot.set_defaults(handler=run_snapshot)
+
+
+def request_data(args: argparse.Namespace) -> Dict:
+    """명령행 옵션을 웹 검색 요청과 같은 형식으로 (search_params 재사용)"""
+    data = {
+        'start_date': getattr(args, 'start', None),
+        'end_date': getattr(args, 'end', None),
+        'bid_type': args.type,
+        'agencies': args.agencies or [],
+        'institution': args.institution,
+    }
+    for name in FILTER_ARGUMENTS[1:]:
+        data[name] = getattr(args, name)
+    return data
+
+
+def has_filters(args: argparse.Namespace) -> bool:
+    return any(getattr(args, name) not in (None, '') for name in FILTER_ARGUMENTS)
+
+
+def output_format(args: argparse.Namespace) -> str:
+    if args.format:
+        return args.format
+    extension = os.path.splitext(args.output)[1].lstrip('.').lower()
+    return extension if extension in EXPORT_FORMATS else 'jsonl'
+
+
+def upstream_client() -> G2BClient:
+    """속도 제한을 웹 서버와 공유하는 클라이언트 (대량 조회라 응답은 캐시하지 않음)"""
+    limiter = RateLimiter(SharedCache(), 'upstream', UPSTREAM_RATE_LIMIT, UPSTREAM_RATE_BURST)
+    return G2BClient(rate_limiter=limiter)
+
+
+def open_store(alerts: bool = True) -> BidStore:
+    """기관 색인과 집계(alerts면 저장된 검색 알림도)를 함께 갱신하는 저장소"""
+    store = BidStore()
+    if alerts:
+        store.add_listener(AlertDispatcher(SavedSearchStore(store)))
+    store.add_listener(AgencyIndex(store))
+    store.add_listener(BidRollups(store))
+    return store
+
+
+class Progress:
+    """stderr 진행 표시 (조회한 페이지/예상 페이지, 기록한 건수, 처리 속도)"""
+
+    def __init__(self, tasks: int, enabled: bool):
+        self.tasks = tasks
+        self.enabled = enabled
+        self.pages = 0
+        self.rows = 0
+        self.errors = 0
+        self._expected: Dict = {}
+        self._started = time.monotonic()
+        self._drawn_at = 0.0
+
+    def chunk(self, chunk: Dict) -> None:
+        self.pages += 1
+        self.errors += bool(chunk['error'])
+        if chunk['page'] == 1:
+            self._expected[(chunk.get('window'), chunk['bid_type'])] = max(1, -(-chunk['total'] // 100))
+
+    def row(self) -> None:
+        self.rows += 1
+
+    def draw(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not self.enabled or (not force and now - self._drawn_at < 0.2):
+            return
+        self._drawn_at = now
+        # 아직 첫 페이지를 받지 못한 작업은 한 페이지로 계산
+        expected = sum(self._expected.values()) + self.tasks - len(self._expected)
+        elapsed = max(now - self._started, 1e-6)
+        if not self.tasks:
+            sys.stderr.write(f'\r{self.rows:,}건 · {self.rows / elapsed:,.0f}건/s')
+            sys.stderr.flush()
+            return
+        percent = min(100, self.pages * 100 // max(expected, 1))
+        filled = percent // 5
+        line = (f'\r[{"#" * filled}{"." * (20 - filled)}] {percent:3d}% '
+                f'페이지 {self.pages:,}/{expected:,} · {self.rows:,}건 · {self.rows / elapsed:,.0f}건/s')
+        if self.errors:
+            line += f' · 오류 {self.errors}'
+        sys.stderr.write(line)
+        sys.stderr.flush()
+
+    def close(self) -> None:
+        if self.enabled:
+            self.draw(force=True)
+            sys.stderr.write('\n')
+            sys.stderr.flush()
+
+
+def write_output(bids: Iterable[Dict], fmt: str, path: str) -> None:
+    """항목을 형식에 맞춰 파일이나 표준 출력에 스트리밍 기록"""
+    check_format(fmt)
+    output: BinaryIO = sys.stdout.buffer if path == '-' else open(path, 'wb')
+    try:
+        for data in stream_export(bids, fmt):
+            output.write(data)
+        output.flush()
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+
+def fetch_to_output(args: argparse.Namespace, types: List[str], start_dt: datetime, end_dt: datetime,
+                    query) -> int:
+    """upstream 조회 결과를 출력에 기록 (오류가 있었으면 1 반환)"""
+    fmt = output_format(args)
+    check_format(fmt)
+    store = None
+    if args.store:
+        # 웹의 /api/sync와 같이 새 공고/정정 공고는 저장된 검색 알림으로 이어짐
+        store = open_store()
+    tasks = len(list(date_windows(start_dt, end_dt, args.window_days))) * len(types)
+    progress = Progress(tasks, enabled=not args.no_progress and sys.stderr.isatty())
+    errors: List[Dict] = []
+    parser = ParserPool(args.parse_workers)
+
+    def bids() -> Iterator[Dict]:
+        for chunk in iter_range_chunks(upstream_client(), types, start_dt, end_dt, None,
+                                       window_days=args.window_days, workers=args.workers,
+                                       max_pages=args.max_pages, parser=parser if args.parse_workers else None):
+            progress.chunk(chunk)
+            if chunk['error']:
+                errors.append(chunk)
+            if store is not None:
+                store.ingest(chunk['items'])
+            items = query.filter(chunk['items']) if query is not None else chunk['items']
+            for bid in items:
+                progress.row()
+                yield bid
+            progress.draw()
+
+    try:
+        write_output(bids(), fmt, args.output)
+    finally:
+        progress.close()
+        parser.close()
+        if store is not None:
+            store.close()
+
+    for chunk in errors:
+        print(f"⚠️  {chunk.get('window', '')} {chunk['bid_type']} {chunk['page']}페이지: {chunk['error']}",
+              file=sys.stderr)
+    return 1 if errors else 0
+
+
+def run_fetch(args: argparse.Namespace) -> int:
+    types, start_dt, end_dt, query = search_params(request_data(args))
+    return fetch_to_output(args, types, start_dt, end_dt, query if has_filters(args) else None)
+
+
+def run_today(args: argparse.Namespace) -> int:
+    types, _, _, query = search_params(request_data(args))
+    now = datetime.now()
+    start_dt = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_dt = now.replace(hour=23, minute=59, second=0, microsecond=0)
+    return fetch_to_output(args, types, start_dt, end_dt, query if has_filters(args) else None)
+
+
+def run_export(args: argparse.Namespace) -> int:
+    types, start_dt, end_dt, query = search_params(request_data(args))
+    store = BidStore()
+    progress = Progress(0, enabled=not args.no_progress and sys.stderr.isatty())
+
+    def bids() -> Iterator[Dict]:
+        batch: List[Dict] = []
+        for bid in store.iter_bids(types, start_dt, end_dt):
+            batch.append(bid)
+            if len(batch) == 1000:
+                yield from filtered(batch)
+                batch = []
+        yield from filtered(batch)
+
+    def filtered(batch: List[Dict]) -> Iterator[Dict]:
+        for bid in (query.filter(batch) if has_filters(args) else batch):
+            progress.row()
+            yield bid
+        progress.draw()
+
+    try:
+        write_output(bids(), output_format(args), args.output)
+    finally:
+        progress.close()
+        store.close()
+    return 0
+
+
+def parse_since(value: Optional[str]) -> datetime:
+    if not value:
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for fmt in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f'시작 시각 형식이 올바르지 않습니다: {value}')
+
+
+def bid_line(bid: Dict) -> str:
+    """터미널 출력용 한 줄 요약"""
+    price = format_price(bid['presmptPrce'])
+    return (f"{bid['bidNtceDt'][:16]} [{bid['bidType']}] {bid['bidNtceNm']} · {bid['dminsttNm']}"
+            f"{f' · {price}' if price else ''} · 마감 {bid['bidClseDt'][:16]}")
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    types, _, _, query = search_params(request_data(args))
+    store = None
+    if args.store:
+        store = open_store()
+    watcher = BidWatcher(upstream_client(), types, parse_since(args.since),
+                         query=query if has_filters(args) else None, state_path=args.state, store=store)
+    # 이어서 감시하면 처음 조회도 새 공고이므로 건너뛰지 않음
+    skip_first = args.skip_existing and not watcher.resumed
+    first = True
+
+    try:
+        while True:
+            new_bids, errors = watcher.poll()
+            if not (first and skip_first):
+                emit_bids(new_bids, args.format)
+            for chunk in errors:
+                print(f"⚠️  {chunk['bid_type']} {chunk['page']}페이지: {chunk['error']}", file=sys.stderr)
+            if args.once:
+                return 1 if errors else 0
+            first = False
+            interval = args.interval or watcher.next_interval()
+            if sys.stderr.isatty():
+                next_poll = datetime.now() + timedelta(seconds=interval)
+                sys.stderr.write(f"\r다음 조회 {next_poll:%H:%M:%S} (새 공고 {len(new_bids)}건)")
+                sys.stderr.flush()
+            time.sleep(interval)
+            if sys.stderr.isatty():
+                sys.stderr.write('\r\033[K')
+    finally:
+        if store is not None:
+            store.close()
+
+
+def emit_bids(bids: List[Dict], fmt: str) -> None:
+    """새 공고를 바로 표준 출력에 기록 (파이프로 받는 쪽이 기다리지 않도록 flush)"""
+    if not bids:
+        return
+    bids = sorted(bids, key=lambda bid: bid['bidNtceDt'])
+    if fmt == 'jsonl':
+        for data in stream_export(bids, 'jsonl'):
+            sys.stdout.buffer.write(data)
+    else:
+        sys.stdout.buffer.write(''.join(f'{bid_line(bid)}\n' for bid in bids).encode('utf-8'))
+    sys.stdout.buffer.flush()
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '--:--:--'
+    seconds = int(seconds)
+    return f'{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}'
+
+
+def backfill_line(status: Dict) -> str:
+    percent = status['pages_done'] * 100 // max(status['pages_total'], 1)
+    return (f"구간 {status['done']:,}/{status['windows']:,} · 페이지 {status['pages_done']:,}/{status['pages_total']:,}"
+            f" ({percent}%) · {status['rows']:,}건 · {status['rows_per_second']:,.0f}건/s"
+            f" · 남은 시간 {format_duration(status['eta_seconds'])}")
+
+
+def run_backfill(args: argparse.Namespace) -> int:
+    if args.no_store and not args.archive:
+        raise ValueError('--no-store에는 --archive가 필요합니다.')
+    types, start_dt, end_dt, _ = search_params({'start_date': args.start, 'end_date': args.end,
+                                               'bid_type': args.type})
+    # 과거 공고는 알림을 보내지 않고 기관 색인과 집계만 갱신
+    store = open_store(alerts=False)
+    parser = ParserPool(args.parse_workers)
+    job = Backfill(upstream_client(), store, types, start_dt, end_dt, job=args.job,
+                   window_days=args.window_days, workers=args.workers, archive_dir=args.archive,
+                   ingest=not args.no_store, parser=parser if args.parse_workers else None)
+    interactive = sys.stderr.isatty()
+    # 터미널이면 한 줄을 계속 갱신하고, 아니면(로그 파일 등) 30초마다 한 줄씩
+    draw_every = 0.5 if interactive else 30
+    drawn_at = [time.monotonic()]
+
+    def progress() -> None:
+        now = time.monotonic()
+        if args.no_progress or now - drawn_at[0] < draw_every:
+            return
+        drawn_at[0] = now
+        line = backfill_line(job.status())
+        sys.stderr.write(f'\r\033[K{line}' if interactive else f'{line}\n')
+        sys.stderr.flush()
+
+    print(f'작업 {job.job}: {backfill_line(job.status())}', file=sys.stderr)
+    try:
+        status = job.run(on_progress=progress)
+    finally:
+        if interactive and not args.no_progress:
+            sys.stderr.write('\n')
+        parser.close()
+        store.close()
+
+    print(backfill_line(status), file=sys.stderr)
+    for error in status['errors']:
+        print(f'⚠️  {error}', file=sys.stderr)
+    if status['quota_exceeded']:
+        print('⏸️  요청 한도를 초과해 멈췄습니다. 같은 명령을 다시 실행하면 이어서 수집합니다.', file=sys.stderr)
+    return 0 if status['done'] == status['windows'] else 1
+
+
+def run_snapshot(args: argparse.Namespace) -> int:
+    types, _, end_dt, _ = search_params({'bid_type': args.type, 'start_date': args.end, 'end_date': args.end})
+    builder = SnapshotBuilder(upstream_client(), types, args.output, days=args.days,
+                              end_day=end_dt.date() if args.end else None,
+                              refresh_days=args.refresh_days, workers=args.workers)
+    manifest = builder.build()
+    total = sum(entry['count'] for types_by_day in manifest['days'].values() for entry in types_by_day.values())
+    size = sum(entry['bytes'] for types_by_day in manifest['days'].values() for entry in types_by_day.values())
+    print(f"📦 스냅샷 {manifest['start']}~{manifest['end']}: {total:,}건, {size / 1e6:.1f}MB"
+          f" (조회 {builder.fetched}개, 재사용 {builder.reused}개) → {args.output}", file=sys.stderr)
+    for error in builder.errors:
+        print(f'⚠️  {error}', file=sys.stderr)
+    return 1 if builder.errors else 0
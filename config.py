@@ -3,12 +3,120 @@
 Configuration for 나라장터 API
 """
 
+import os
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # 공공데이터포털 서비스 키
 SERVICE_KEY = "xXw4gHFIYeAF02lry3V2aAO+cBMUlGCCuEE4k5OMX4qAycWqmL4EfrzLl+akDZM85sDGNhI4kcks3ioy+qY/pA=="
 
-# API Base URL
-BASE_URL = "https://apis.data.go.kr/1230000/ad/BidPublicInfoService"
+# API Base URL (G2B_BASE_URL로 바꾸면 로컬 대역 서버 mock_upstream.py 등을 사용)
+BASE_URL = os.environ.get('G2B_BASE_URL', "https://apis.data.go.kr/1230000/ad/BidPublicInfoService")
 
 # Request timeout settings
 CONNECT_TIMEOUT = 30
-MAX_TIMEOUT = 60
\ No newline at end of file
+MAX_TIMEOUT = 60
+
+# 검색 결과 페이지 크기
+SEARCH_PAGE_SIZE = 100
+SEARCH_MAX_PAGE_SIZE = 1000
+
+# 검색 시 입찰 구분별 최대 조회 페이지 수 (페이지당 100건)
+SEARCH_MAX_PAGES = 10
+
+# 가져온 검색 결과를 필터 재적용에 재사용하는 시간 (초)
+SEARCH_RESULT_TTL = 300
+
+# since(마지막 조회 시각) 이후만 다시 조회할 때 앞으로 겹쳐 조회할 시간 (늦게 올라오는 공고 대비, 분)
+SEARCH_SINCE_OVERLAP_MINUTES = 10
+
+# 비동기(ASGI) 서버 동시성 제한
+ASYNC_UPSTREAM_CONCURRENCY = int(os.environ.get('G2B_ASYNC_UPSTREAM_CONCURRENCY', 10))  # 동시에 실행할 upstream 요청 수
+ASYNC_MAX_SEARCHES = int(os.environ.get('G2B_ASYNC_MAX_SEARCHES', 50))                  # 동시에 처리할 검색 요청 수 (초과 시 503)
+
+# 로컬 입찰공고 저장소 (동기화한 공고, 저장된 검색)
+DATA_DIR = os.environ.get('G2B_DATA_DIR', os.path.join(PROJECT_DIR, 'data'))
+STORE_PATH = os.path.join(DATA_DIR, 'bids.db')
+
+# upstream 응답 기록/재생 (cassette.py) - 경로가 비어 있으면 사용 안 함
+CASSETTE_PATH = os.environ.get('G2B_CASSETTE', '')
+CASSETTE_MODE = os.environ.get('G2B_CASSETTE_MODE', 'replay')       # record / replay
+CASSETTE_SPEED = float(os.environ.get('G2B_CASSETTE_SPEED', 1))     # 재생 배속 (1: 기록된 응답 시간, 0: 기다리지 않음)
+
+# 공유 캐시 (운영 모드에서 워커 프로세스끼리 공유)
+CACHE_PATH = os.path.join(DATA_DIR, 'cache.db')
+# 부하 테스트 등에서 설정별로 비교할 수 있도록 환경 변수로도 지정 가능
+UPSTREAM_CACHE_TTL = int(os.environ.get('G2B_UPSTREAM_CACHE_TTL', 300))     # upstream 응답 캐시 시간 (초, 0이면 사용 안 함)
+UPSTREAM_RATE_LIMIT = float(os.environ.get('G2B_UPSTREAM_RATE_LIMIT', 10))  # 전체 워커 합산 upstream 초당 요청 수 (0이면 제한 없음)
+UPSTREAM_RATE_BURST = int(os.environ.get('G2B_UPSTREAM_RATE_BURST', 20))    # 순간 허용 요청 수
+RESULT_SET_TTL = 1800             # 검색 결과(result_id) 보관 시간 (초)
+RESULT_SET_LOCAL_SIZE = 8         # 워커마다 메모리에 둘 검색 결과 수
+RESULT_SET_SHARED_MAX_ROWS = 50000  # 공유 캐시에 저장할 검색 결과 최대 건수 (넘으면 받은 워커에만 보관)
+RESULT_SET_SHARED_WAIT = 5        # 다른 워커가 결과를 기록 중일 때 기다리는 시간 (초)
+CACHE_PURGE_INTERVAL = 300        # 만료된 공유 캐시 항목을 지우는 주기 (초, 워커마다 저장할 때 확인)
+
+# 운영 서버 모드 (python run_web.py --prod)
+SERVER_WORKERS = int(os.environ.get('G2B_WORKERS', min(4, os.cpu_count() or 1)))
+SERVER_THREADS = int(os.environ.get('G2B_THREADS', 8))   # 워커당 스레드 수 (WSGI)
+
+# 성능 지표 (/metrics)
+METRICS_PUBLISH_INTERVAL = 15     # 워커별 지표를 공유 캐시에 게시하는 주기 (초)
+
+# 요청 로그 (단계별 처리 시간, JSON 한 줄)
+REQUEST_LOG_SAMPLE_RATE = 0.05    # 기록할 요청 비율
+REQUEST_LOG_SLOW_MS = 2000        # 이보다 오래 걸린 요청은 항상 기록 (밀리초)
+
+# 관리자 기능 (/api/admin/*, X-Admin-Token 헤더) - 토큰이 없으면 꺼짐
+ADMIN_TOKEN = os.environ.get('G2B_ADMIN_TOKEN', '')
+PROFILE_INTERVAL = 0.005          # 샘플링 프로파일러 샘플 간격 (초)
+PROFILE_MAX_SECONDS = 60          # 한 번에 프로파일링할 수 있는 최대 시간 (초)
+
+# 기관 목록 API (/api/agencies, 저장소에 반영된 공고로 만든 기관 색인)
+AGENCY_LIST_LIMIT = 50            # 기본 반환 기관 수
+AGENCY_LIST_MAX = 1000            # limit 상한
+
+# 집계 API (/api/stats, 저장소에 반영된 공고의 일별·입찰 구분별·기관별 집계)
+STATS_DEFAULT_LIMIT = 1000        # 기본 반환 그룹 수
+STATS_MAX_LIMIT = 10000           # limit 상한
+
+# 저장된 검색 알림
+ALERT_FILE = os.path.join(DATA_DIR, 'alerts.jsonl')   # 알림 기록 파일 (빈 값이면 사용 안 함)
+ALERT_WEBHOOK_URL = os.environ.get('G2B_ALERT_WEBHOOK_URL', '')   # 알림 POST 대상
+ALERT_WEBHOOK_TIMEOUT = 10        # 웹훅 요청 제한 시간 (초)
+ALERT_BATCH_SIZE = 100            # 한 번에 전송할 알림 수
+ALERT_QUEUE_SIZE = 1000           # 웹 서버에서 전송을 기다리는 배치 수 (넘으면 버리고 로그에 남김)
+
+# CLI 대량 조회 (main.py fetch/today)
+FETCH_WORKERS = 4                 # 동시에 조회할 (구간, 입찰 구분) 작업 수
+FETCH_WINDOW_DAYS = 7             # 조회 구간 단위 (일)
+FETCH_BUFFER_CHUNKS = 16          # 기록을 기다리는 페이지 수 상한 (메모리 일정 유지)
+PARSE_WORKERS = 0                 # 응답 해석 프로세스 수 (0이면 조회 스레드에서 해석, --parse-workers)
+
+# 과거 공고 일괄 수집 (main.py backfill)
+BACKFILL_WORKERS = 4              # 동시에 수집할 (구간, 입찰 구분) 작업 수
+BACKFILL_WINDOW_DAYS = 7          # 수집 구간 단위 (일)
+BACKFILL_RETRIES = 3              # 페이지 조회 실패 시 재시도 횟수
+BACKFILL_QUOTA_CODES = ('22',)    # 일일 요청 한도 초과 결과 코드 (받으면 전체 중단, 다음 실행에서 이어서)
+
+# 신규 공고 감시 (main.py watch)
+WATCH_INTERVAL = 60               # 업무 시간 조회 간격 (초)
+WATCH_OFF_HOURS_INTERVAL = 600    # 평일 업무 시간 외 조회 간격 (초)
+WATCH_WEEKEND_INTERVAL = 1800     # 주말 조회 간격 (초)
+WATCH_MAX_INTERVAL = 900          # 새 공고 없는 조회가 이어질 때 늘어나는 간격 상한 (초)
+WATCH_BUSINESS_HOURS = (8, 19)    # 업무 시간 (시작 시, 끝 시)
+WATCH_OVERLAP_MINUTES = 10        # 늦게 반영되는 공고를 위해 지난 조회 구간과 겹쳐 조회할 시간 (분)
+WATCH_STATE_PATH = os.path.join(DATA_DIR, 'watch_state.json')   # 감시 상태 파일 (--state 기본값)
+
+# GitHub Pages 정적 데이터 스냅샷 (main.py snapshot)
+SNAPSHOT_DIR = os.path.join(PROJECT_DIR, 'snapshots')   # index.html이 읽는 위치
+SNAPSHOT_DAYS = 31                # 스냅샷에 담을 기간 (오늘까지, 일)
+SNAPSHOT_REFRESH_DAYS = 3         # 파일이 있어도 다시 조회할 최근 일수 (늦게 올라오는 공고 대비)
+
+# 백그라운드 내보내기 작업
+EXPORT_JOB_DIR = os.path.join(PROJECT_DIR, 'exports')   # 작업 결과 파일 위치
+EXPORT_JOB_WORKERS = 2            # 동시에 실행할 작업 수
+EXPORT_JOB_MAX_PER_USER = 2       # 사용자별 진행 중 작업 수 제한
+EXPORT_JOB_TTL = 3600             # 완료된 파일 보관 시간 (초)
+EXPORT_JOB_WINDOW_DAYS = 7        # upstream 조회 구간 단위 (일)
+EXPORT_JOB_HEARTBEAT = 30         # 진행 중인 작업 상태를 공유 캐시에 다시 기록하는 주기 (초)
+EXPORT_JOB_STALE_AFTER = 120      # 이 시간 동안 기록이 없는 진행 중 작업은 중단된 워커의 작업으로 보고 세지 않음 (초)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+백그라운드 내보내기 작업
+Export jobs that run in a worker pool and write to files on disk
+
+긴 기간의 내보내기는 HTTP 요청 하나로 끝낼 수 없으므로 작업으로 등록하고,
+진행 상황(기록한 행 수, 조회한 페이지 수)을 상태 API로 확인한 뒤
+완성된 파일을 내려받는다. 파일은 완료 후 EXPORT_JOB_TTL초가 지나면 삭제된다.
+
+공유 캐시를 주면 작업 상태를 캐시에도 기록하므로, 운영 모드에서 작업을
+실행하지 않는 다른 워커도 상태 조회/취소/다운로드 요청을 처리할 수 있다.
+사용자별 동시 작업 수도 캐시에 기록된 작업 전체(모든 워커)로 센다. 진행 중인
+작업은 실행하는 워커의 pid와 마지막 기록 시각을 함께 남겨, 워커가 중단되어
+더 이상 갱신되지 않는 작업은 세지 않는다.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from config import (
+    EXPORT_JOB_DIR, EXPORT_JOB_WORKERS, EXPORT_JOB_MAX_PER_USER,
+    EXPORT_JOB_TTL, EXPORT_JOB_WINDOW_DAYS, EXPORT_JOB_HEARTBEAT, EXPORT_JOB_STALE_AFTER
+)
+from bid_filter import BidQuery
+from exporters import ROW_BATCH, check_format, export_filename, stream_export
+from search_service import date_windows, iter_search_chunks
+
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+logger = logging.getLogger('g2b.exports')
+
+
+def _process_alive(pid: int) -> bool:
+    """같은 서버의 프로세스가 살아 있는지 (워커는 공유 캐시 파일이 있는 같은 서버에서 실행됨)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _stale(snapshot: Dict) -> bool:
+    """실행하던 워커가 없어졌거나 EXPORT_JOB_STALE_AFTER초 동안 기록되지 않은 작업 상태 (pid가 없으면 이전 버전의 기록)"""
+    pid = snapshot.get('pid')
+    return (pid is None or time.time() - snapshot['heartbeat_ts'] > EXPORT_JOB_STALE_AFTER
+            or not _process_alive(pid))
+
+
+class JobLimitError(Exception):
+    """사용자별 동시 작업 수 초과"""
+
+
+class JobCancelled(Exception):
+    """작업 취소 요청으로 중단됨"""
+
+
+class ExportJob:
+    """내보내기 작업 하나의 상태"""
+
+    def __init__(self, owner: str, fmt: str, description: str):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.fmt = fmt
+        self.description = description
+        self.status = 'queued'
+        self.rows_written = 0
+        self.pages_fetched = 0
+        self.errors: List[Dict] = []
+        self.error: Optional[str] = None
+        self.path: Optional[str] = None
+        self.filename = export_filename(fmt)
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.pid = os.getpid()
+        self.cancel_event = threading.Event()
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        return self.finished_at + EXPORT_JOB_TTL if self.finished_at else None
+
+    def snapshot(self) -> Dict:
+        """다른 워커와 공유하는 작업 상태"""
+        return {**self.to_dict(), 'owner': self.owner, 'path': self.path,
+                'created_ts': self.created_at, 'finished_ts': self.finished_at,
+                'pid': self.pid, 'heartbeat_ts': time.time()}
+
+    @classmethod
+    def from_snapshot(cls, data: Dict) -> 'ExportJob':
+        """다른 워커가 실행 중인 작업의 상태 사본"""
+        job = cls(data['owner'], data['format'], data['description'])
+        job.id = data['job_id']
+        job.status = data['status']
+        job.rows_written = data['rows_written']
+        job.pages_fetched = data['pages_fetched']
+        job.errors = data['errors']
+        job.error = data['error']
+        job.path = data['path']
+        job.filename = data['filename'] or job.filename
+        job.created_at = data['created_ts']
+        job.finished_at = data['finished_ts']
+        job.pid = data.get('pid')
+        if job.status in ACTIVE_STATUSES and _stale(data):
+            # 실행하던 워커가 중단되어 더 이상 진행되지 않는 작업
+            job.status = 'failed'
+            job.error = '작업을 실행하던 서버 프로세스가 중단되었습니다.'
+        return job
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'format': self.fmt,
+            'description': self.description,
+            'rows_written': self.rows_written,
+            'pages_fetched': self.pages_fetched,
+            'errors': self.errors,
+            'error': self.error,
+            'filename': self.filename if self.status == 'done' else None,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(timespec='seconds'),
+            'expires_at': (datetime.fromtimestamp(self.expires_at).isoformat(timespec='seconds')
+                           if self.expires_at else None),
+        }
+
+
+class ExportJobManager:
+    """내보내기 작업 등록/조회/취소와 만료 파일 정리"""
+
+    def __init__(self,
+                 directory: str = EXPORT_JOB_DIR,
+                 max_workers: int = EXPORT_JOB_WORKERS,
+                 max_per_user: int = EXPORT_JOB_MAX_PER_USER,
+                 cache=None,
+                 heartbeat: float = EXPORT_JOB_HEARTBEAT):
+        self.directory = directory
+        self.max_per_user = max_per_user
+        self.cache = cache
+        self.heartbeat = heartbeat
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+        # 상태 기록 순서를 지키기 위한 잠금 (주기적 기록이 완료 상태를 이전 상태로 덮어쓰지 않도록)
+        self._publish_lock = threading.Lock()
+        # 대기 중이거나 행이 늦게 나오는 작업도 기록 시각을 갱신 (fork 뒤 첫 작업 등록 때 시작)
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export-job')
+        os.makedirs(directory, exist_ok=True)
+        self._sweep_directory()
+
+    def submit_results(self, owner: str, fmt: str, bids: Iterable[Dict]) -> ExportJob:
+        """검색 결과(지연 순회 가능한 항목)를 파일로 내보내는 작업 등록"""
+        return self._submit(owner, fmt, '현재 검색 결과', lambda job: bids)
+
+    def submit_upstream(self,
+                        owner: str,
+                        fmt: str,
+                        client,
+                        types: List[str],
+                        start_dt: datetime,
+                        end_dt: datetime,
+                        query: Optional[BidQuery] = None) -> ExportJob:
+        """API에서 기간 전체를 구간별로 조회하며 파일로 내보내는 작업 등록"""
+        description = f"{start_dt:%Y-%m-%d} ~ {end_dt:%Y-%m-%d} ({', '.join(types)})"
+
+        def source(job: ExportJob) -> Iterator[Dict]:
+            for window_start, window_end in date_windows(start_dt, end_dt, EXPORT_JOB_WINDOW_DAYS):
+                for chunk in iter_search_chunks(client, types, window_start, window_end,
+                                                query, max_pages=None):
+                    job.pages_fetched += 1
+                    if chunk['error']:
+                        job.errors.append({'bid_type': chunk['bid_type'], 'page': chunk['page'],
+                                           'window': f'{window_start:%Y-%m-%d}', 'error': chunk['error']})
+                    yield from chunk['items']
+
+        return self._submit(owner, fmt, description, source)
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        self.cleanup_expired()
+        job = self._jobs.get(job_id)
+        if job is None and self.cache is not None:
+            data = self.cache.get(f'export-job:{job_id}')
+            if data is not None:
+                job = ExportJob.from_snapshot(json.loads(data))
+        return job
+
+    def cancel(self, job_id: str) -> Optional[ExportJob]:
+        """작업 취소 (진행 중이면 다음 행에서 중단, 완료된 파일은 삭제)"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            # 다른 워커의 작업: 취소 요청만 기록하고 실행 중인 워커가 확인
+            job = self.get(job_id)
+            if job is not None and self.cache is not None:
+                self.cache.set(f'export-cancel:{job_id}', b'1', EXPORT_JOB_TTL)
+                if job.status == 'done':
+                    self._remove_file(job)
+                    job.status = 'cancelled'
+                    self._publish(job)
+            return job
+        job.cancel_event.set()
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            job.finished_at = time.time()
+        elif job.status == 'done':
+            self._remove_file(job)
+            job.status = 'cancelled'
+        self._publish(job)
+        return job
+
+    def cleanup_expired(self) -> int:
+        """만료된 작업과 파일 정리, 정리한 작업 수 반환"""
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job.expires_at is not None and job.expires_at <= now]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            self._remove_file(job)
+            if self.cache is not None:
+                self.cache.delete(f'export-job:{job.id}')
+        return len(expired)
+
+    def _submit(self, owner: str, fmt: str, description: str, source) -> ExportJob:
+        check_format(fmt)
+        self.cleanup_expired()
+
+        with self._lock:
+            if self.cache is None:
+                job = self._new_job(owner, fmt, description, self._local_active(owner))
+            else:
+                # 세기와 등록을 한 트랜잭션에서 해 다른 워커가 사이에 등록하지 못하게 함
+                with self.cache.transaction():
+                    job = self._new_job(owner, fmt, description, self._shared_active(owner))
+                    # 아직 다른 스레드가 모르는 작업이므로 잠금 없이 기록 (트랜잭션 중에 잠금을 기다리지 않도록)
+                    self._write_snapshot(job)
+                self._start_heartbeat()
+            self._jobs[job.id] = job
+
+        self._pool.submit(self._run, job, source)
+        return job
+
+    def _new_job(self, owner: str, fmt: str, description: str, active: int) -> ExportJob:
+        if active >= self.max_per_user:
+            raise JobLimitError(f'진행 중인 내보내기 작업은 최대 {self.max_per_user}개까지 가능합니다.')
+        return ExportJob(owner, fmt, description)
+
+    def _local_active(self, owner: str) -> int:
+        return sum(1 for job in self._jobs.values() if job.owner == owner and job.status in ACTIVE_STATUSES)
+
+    def _shared_active(self, owner: str) -> int:
+        """모든 워커가 캐시에 기록한 작업 중 owner의 진행 중인 작업 수 (중단된 워커의 작업 제외)"""
+        active = 0
+        for data in self.cache.scan('export-job:').values():
+            snapshot = json.loads(data)
+            if snapshot['owner'] == owner and snapshot['status'] in ACTIVE_STATUSES and not _stale(snapshot):
+                active += 1
+        return active
+
+    def _start_heartbeat(self) -> None:
+        if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+            self._heartbeat_thread = threading.Thread(target=self._beat, name='export-job-heartbeat', daemon=True)
+            self._heartbeat_thread.start()
+
+    def _beat(self) -> None:
+        """heartbeat초마다 이 워커의 진행 중인 작업 상태를 다시 기록"""
+        while True:
+            time.sleep(self.heartbeat)
+            with self._lock:
+                jobs = [job for job in self._jobs.values() if job.status in ACTIVE_STATUSES]
+            for job in jobs:
+                try:
+                    self._publish(job)
+                except Exception:
+                    # 다음 주기에 다시 기록
+                    logger.warning('내보내기 작업 %s 상태 기록 실패', job.id, exc_info=True)
+
+    def _run(self, job: ExportJob, source) -> None:
+        if job.cancel_event.is_set():
+            return
+        job.status = 'running'
+        self._publish(job)
+        part_path = os.path.join(self.directory, f'{job.id}.{job.fmt}.part')
+
+        def counted(bids: Iterable[Dict]) -> Iterator[Dict]:
+            for bid in bids:
+                if job.cancel_event.is_set():
+                    raise JobCancelled()
+                job.rows_written += 1
+                if job.rows_written % ROW_BATCH == 0:
+                    self._publish(job)
+                    if self._cancel_requested(job):
+                        raise JobCancelled()
+                yield bid
+
+        try:
+            with open(part_path, 'wb') as output:
+                for chunk in stream_export(counted(source(job)), job.fmt):
+                    output.write(chunk)
+            job.path = os.path.join(self.directory, f'{job.id}.{job.fmt}')
+            os.replace(part_path, job.path)
+            job.status = 'done'
+        except JobCancelled:
+            job.status = 'cancelled'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            self._publish(job)
+
+    def _publish(self, job: ExportJob) -> None:
+        """작업 상태를 공유 캐시에 기록"""
+        if self.cache is not None:
+            with self._publish_lock:
+                self._write_snapshot(job)
+
+    def _write_snapshot(self, job: ExportJob) -> None:
+        self.cache.set(f'export-job:{job.id}', json.dumps(job.snapshot(), ensure_ascii=False).encode('utf-8'),
+                       EXPORT_JOB_TTL * 2)
+
+    def _cancel_requested(self, job: ExportJob) -> bool:
+        """다른 워커에서 받은 취소 요청 확인"""
+        if self.cache is not None and self.cache.get(f'export-cancel:{job.id}') is not None:
+            job.cancel_event.set()
+        return job.cancel_event.is_set()
+
+    def _sweep_directory(self) -> None:
+        """이전 실행에서 남은 임시 파일과 만료된 파일 삭제"""
+        cutoff = time.time() - EXPORT_JOB_TTL
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.part') or os.path.getmtime(path) < cutoff:
+                os.remove(path)
+
+    def _remove_file(self, job: ExportJob) -> None:
+        if job.path and os.path.exists(job.path):
+            os.remove(job.path)
+        job.path = None
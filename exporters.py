@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+입찰공고 내보내기
+Streaming xlsx/CSV/Parquet/JSONL export shared by the web apps and the CLI
+
+모든 형식은 입찰공고 iterable을 한 행씩 소비하며 바이트 청크를 yield 하므로,
+중간 DataFrame이나 전체 파일 버퍼 없이 응답으로 바로 흘려보낼 수 있다.
+"""
+
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+from urllib.parse import quote
+
+from openpyxl import Workbook
+
+
+EXPORT_COLUMNS = ['구분', '공고번호', '공고명', '발주기관', '공고일시', '마감일시', '예정가격', '공고기관']
+
+EXPORT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+    'jsonl': 'application/x-ndjson',
+}
+EXCEL_MIMETYPE = EXPORT_FORMATS['xlsx']
+
+# 한 번에 내보내는 바이트/행 단위
+CHUNK_SIZE = 64 * 1024
+ROW_BATCH = 1000
+
+
+def format_price(price: str) -> str:
+    """예정가격 표시 형식 (억원/천만원/원)"""
+    if price and price != 'N/A':
+        try:
+            price_num = int(price)
+            if price_num >= 100000000:
+                return f"{price_num/100000000:.1f}억원"
+            elif price_num >= 10000000:
+                return f"{price_num/10000000:.0f}천만원"
+            else:
+                return f"{price_num:,}원"
+        except (TypeError, ValueError):
+            return price
+    return ''
+
+
+def export_row(bid: Dict) -> Tuple:
+    """내보내기용 행 (EXPORT_COLUMNS 순서)"""
+    return (
+        bid.get('bidType', ''),
+        bid.get('bidNtceNo', ''),
+        bid.get('bidNtceNm', ''),
+        bid.get('dminsttNm', ''),
+        bid.get('bidNtceDt', ''),
+        bid.get('bidClseDt', ''),
+        format_price(bid.get('presmptPrce', '')),
+        bid.get('ntceInsttNm', ''),
+    )
+
+
+def check_format(fmt: str) -> None:
+    """내보내기 형식 확인 (응답을 시작하기 전에 호출)"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'지원하지 않는 내보내기 형식입니다: {fmt}')
+    if fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError('Parquet 내보내기에는 pyarrow 패키지가 필요합니다.')
+
+
+def stream_export(bids: Iterable[Dict], fmt: str) -> Iterator[bytes]:
+    """지정한 형식으로 내보내기 스트림 생성"""
+    if fmt == 'xlsx':
+        return stream_xlsx(bids)
+    if fmt == 'csv':
+        return stream_csv(bids)
+    if fmt == 'parquet':
+        return stream_parquet(bids)
+    if fmt == 'jsonl':
+        return stream_jsonl(bids)
+    raise ValueError(f'지원하지 않는 내보내기 형식입니다: {fmt}')
+
+
+def stream_csv(bids: Iterable[Dict]) -> Iterator[bytes]:
+    """CSV 스트림 (Excel에서 한글이 깨지지 않도록 UTF-8 BOM 포함)"""
+    buffer = io.StringIO()
+    buffer.write('\ufeff')
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+
+    rows = 0
+    for bid in bids:
+        writer.writerow(export_row(bid))
+        rows += 1
+        if rows == ROW_BATCH:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+
+    yield buffer.getvalue().encode('utf-8')
+
+
+def stream_jsonl(bids: Iterable[Dict]) -> Iterator[bytes]:
+    """JSON Lines 스트림 (가공 전 필드 전체, 한 줄에 항목 하나)"""
+    lines = []
+    for bid in bids:
+        lines.append(json.dumps(bid, ensure_ascii=False))
+        if len(lines) == ROW_BATCH:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def stream_xlsx(bids: Iterable[Dict]) -> Iterator[bytes]:
+    """
+    xlsx 스트림 (openpyxl write-only 모드)
+
+    write-only 워크시트는 행을 디스크 임시 파일에 바로 기록한다.
+    xlsx는 zip 형식이라 저장이 끝나야 완성되므로, 임시 파일에 저장한 뒤
+    CHUNK_SIZE 단위로 읽어 내보낸다.
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('입찰공고')
+    worksheet.append(EXPORT_COLUMNS)
+    try:
+        for bid in bids:
+            worksheet.append(export_row(bid))
+    except BaseException:
+        # 중단 시 write-only 워크시트의 임시 파일을 정리
+        worksheet.close()
+        raise
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+class _ChunkSink(io.RawIOBase):
+    """쓰인 바이트를 모아 두었다가 꺼내 가는 쓰기 전용 스트림"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_parquet(bids: Iterable[Dict]) -> Iterator[bytes]:
+    """
+    Parquet 스트림 (pyarrow 필요)
+
+    ROW_BATCH 행마다 row group 하나를 기록하고, 그때까지 만들어진
+    바이트를 바로 내보낸다.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError('Parquet 내보내기에는 pyarrow 패키지가 필요합니다.')
+
+    schema = pa.schema([(name, pa.string()) for name in EXPORT_COLUMNS])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+
+    def write_batch(rows):
+        columns = list(zip(*rows))
+        writer.write_table(pa.Table.from_arrays([pa.array(col, pa.string()) for col in columns], schema=schema))
+
+    rows = []
+    for bid in bids:
+        rows.append(export_row(bid))
+        if len(rows) == ROW_BATCH:
+            write_batch(rows)
+            rows = []
+            yield sink.drain()
+
+    if rows:
+        write_batch(rows)
+    writer.close()
+    yield sink.drain()
+
+
+def export_filename(extension: str = 'xlsx') -> str:
+    """내보내기 파일명"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f'나라장터_입찰공고_{timestamp}.{extension}'
+
+
+def content_disposition(filename: str) -> str:
+    """한글 파일명을 위한 Content-Disposition 값 (RFC 5987)"""
+    extension = filename.rsplit('.', 1)[-1]
+    return f"attachment; filename=\"export.{extension}\"; filename*=UTF-8''{quote(filename)}"
@@ -4,22 +4,64 @@
 Consolidated and cleaned version using curl subprocess approach
 """
 
+import asyncio
 import subprocess
 import json
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 import urllib.parse
 import xml.etree.ElementTree as ET
-from config import SERVICE_KEY, BASE_URL, CONNECT_TIMEOUT, MAX_TIMEOUT
+from config import (
+    SERVICE_KEY, BASE_URL, CONNECT_TIMEOUT, MAX_TIMEOUT, ASYNC_UPSTREAM_CONCURRENCY, UPSTREAM_CACHE_TTL
+)
+import metrics
+from cassette import default_cassette
+from request_timing import span
+from shared_cache import cache_key
+
+
+def is_success(result: Dict) -> bool:
+    """정상 응답 여부 (resultCode 00) - 정상 응답만 캐시한다"""
+    return bool(result) and result.get('response', {}).get('header', {}).get('resultCode') == '00'
+
+
+def operation_name(endpoint: str) -> str:
+    """엔드포인트의 오퍼레이션 이름 (getBidPblancListInfoServc 등)"""
+    return endpoint.rsplit('/', 1)[-1]
+
+
+def record_result(operation: str, result: Dict) -> Dict:
+    """응답 결과 코드와 항목 수 지표 기록"""
+    if 'error' in result:
+        metrics.UPSTREAM_RESULTS.inc(operation, 'error')
+        return result
+    response = result.get('response', {})
+    metrics.UPSTREAM_RESULTS.inc(operation, response.get('header', {}).get('resultCode') or 'unknown')
+    items = response.get('body', {}).get('items')
+    metrics.UPSTREAM_ITEMS.observe(len(items) if isinstance(items, list) else 0, operation)
+    return result
 
 
 class G2BClient:
     """나라장터 API 통합 클라이언트"""
     
-    def __init__(self, service_key: str = SERVICE_KEY):
+    def __init__(self, service_key: str = SERVICE_KEY, cache=None, rate_limiter=None,
+                 base_url: Optional[str] = None, cassette=None):
+        """
+        Args:
+            service_key: 공공데이터포털 서비스 키
+            cache: upstream 응답 공유 캐시 (shared_cache.SharedCache, 선택)
+            rate_limiter: upstream 요청 속도 제한 (shared_cache.RateLimiter, 선택)
+            base_url: API 주소 (기본: config.BASE_URL)
+            cassette: 응답 기록/재생 (cassette.Cassette, 기본: 설정 G2B_CASSETTE)
+        """
         self.service_key = service_key
         self.service_key_encoded = urllib.parse.quote(service_key, safe='')
-        self.base_url = BASE_URL
+        self.base_url = base_url or BASE_URL
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.cassette = cassette if cassette is not None else default_cassette()
         
     def get_bid_list(self,
                      bid_type: str = "servc",
@@ -39,6 +81,38 @@ class G2BClient:
             num_of_rows: 한 페이지 결과 수
             inqry_div: 조회구분 (1: 입찰공고)
         """
+        return self._request(
+            *self._bid_list_request(bid_type, start_date, end_date, page_no, num_of_rows, inqry_div)
+        )
+
+    def _request(self, endpoint: str, params: Dict) -> Dict:
+        """API 요청 (캐시가 있으면 같은 요청은 워커 전체에서 한 번만 upstream으로 보냄)"""
+        with span('upstream'):
+            if self.cache is None or not UPSTREAM_CACHE_TTL:
+                return self._fetch(endpoint, params)
+            return self.cache.single_flight(self._cache_key(endpoint, params),
+                                            lambda: self._fetch(endpoint, params),
+                                            UPSTREAM_CACHE_TTL, cacheable=is_success)
+
+    def _fetch(self, endpoint: str, params: Dict) -> Dict:
+        """속도 제한을 지켜 upstream 요청"""
+        if self.rate_limiter is not None:
+            with span('ratelimit'):
+                self.rate_limiter.acquire()
+        return self._make_curl_request(endpoint, params)
+
+    def _cache_key(self, endpoint: str, params: Dict) -> str:
+        """캐시 키 (서비스 키 제외)"""
+        return cache_key(endpoint, {k: v for k, v in params.items() if k != 'serviceKey'})
+
+    def _bid_list_request(self,
+                          bid_type: str,
+                          start_date: Optional[datetime],
+                          end_date: Optional[datetime],
+                          page_no: int,
+                          num_of_rows: int,
+                          inqry_div: str) -> Tuple[str, Dict]:
+        """입찰공고 목록 조회 요청의 엔드포인트와 파라미터"""
         if not end_date:
             end_date = datetime.now()
         if not start_date:
@@ -62,8 +136,62 @@ class G2BClient:
             'inqryEndDt': end_date.strftime('%Y%m%d%H%M')
         }
         
-        return self._make_curl_request(endpoint, params)
-    
+        return endpoint, params
+
+    def iter_bid_pages(self,
+                       bid_type: str = "servc",
+                       start_date: Optional[datetime] = None,
+                       end_date: Optional[datetime] = None,
+                       num_of_rows: int = 100,
+                       max_pages: Optional[int] = None) -> Iterator[Dict]:
+        """
+        입찰공고 목록을 페이지 단위로 끝까지 조회
+
+        각 페이지 응답을 받는 즉시 yield 하며, 오류 응답을 만나면
+        해당 응답을 yield 한 뒤 중단한다.
+
+        Args:
+            max_pages: 최대 조회 페이지 수 (None이면 totalCount까지)
+        """
+        page_no = 1
+        while True:
+            result = self.get_bid_list(
+                bid_type=bid_type,
+                start_date=start_date,
+                end_date=end_date,
+                page_no=page_no,
+                num_of_rows=num_of_rows
+            )
+            yield result
+
+            if not self._has_next_page(result, page_no, num_of_rows, max_pages):
+                return
+            page_no += 1
+
+    def _has_next_page(self,
+                       result: Dict,
+                       page_no: int,
+                       num_of_rows: int,
+                       max_pages: Optional[int]) -> bool:
+        """다음 페이지 조회 여부 (오류 응답이나 마지막 페이지면 False)"""
+        if not result or 'response' not in result:
+            return False
+        header = result['response'].get('header', {})
+        if header.get('resultCode') != '00':
+            return False
+
+        body = result['response'].get('body', {})
+        try:
+            total_count = int(body.get('totalCount', 0))
+        except (TypeError, ValueError):
+            total_count = 0
+
+        if not body.get('items') or page_no * num_of_rows >= total_count:
+            return False
+        if max_pages and page_no >= max_pages:
+            return False
+        return True
+
     def get_today_bids(self, bid_type: str = "all") -> List[Dict]:
         """
         오늘 공고된 입찰 조회
@@ -111,38 +239,95 @@ class G2BClient:
         }
         return type_names.get(type_code, type_code)
     
+    def get_bid_list_raw(self,
+                         bid_type: str = "servc",
+                         start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None,
+                         page_no: int = 1,
+                         num_of_rows: int = 100,
+                         inqry_div: str = "1") -> Dict:
+        """
+        입찰공고 목록 응답 본문을 해석하지 않고 조회 (대량 수집용, 캐시 사용 안 함)
+
+        해석은 호출하는 쪽(page_parser.ParserPool 등)에서 한다.
+
+        Returns:
+            {'raw': 응답 본문 bytes} 또는 {'error': 메시지}
+        """
+        endpoint, params = self._bid_list_request(bid_type, start_date, end_date, page_no, num_of_rows, inqry_div)
+        with span('upstream'):
+            if self.rate_limiter is not None:
+                with span('ratelimit'):
+                    self.rate_limiter.acquire()
+            operation = operation_name(endpoint)
+            try:
+                return {'raw': self._curl_output(endpoint, params, operation)}
+            except Exception as e:
+                return record_result(operation, {'error': str(e)})
+
     def _make_curl_request(self, endpoint: str, params: Dict) -> Dict:
         """curl을 사용한 API 요청"""
+        operation = operation_name(endpoint)
+        try:
+            stdout = self._curl_output(endpoint, params, operation)
+            return record_result(operation, self._decode_response(stdout.decode('utf-8', 'replace'), operation))
+        except Exception as e:
+            return record_result(operation, {'error': str(e)})
+
+    def _curl_output(self, endpoint: str, params: Dict, operation: str) -> bytes:
+        """curl 실행 결과 본문 (실패하면 예외, 카세트 재생 중이면 기록된 본문)"""
+        if self.cassette is not None and self.cassette.replaying:
+            with span('network'):
+                return self.cassette.play(operation, params)
+        started = time.perf_counter()
+        # 프로세스 생성과 응답 대기를 나눠 측정
+        with span('spawn'):
+            proc = subprocess.Popen(
+                self._curl_command(endpoint, params),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        with span('network'):
+            try:
+                stdout, stderr = proc.communicate(timeout=MAX_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise RuntimeError(f'curl timed out after {MAX_TIMEOUT}s')
+            finally:
+                metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, operation)
+
+        if proc.returncode != 0:
+            raise RuntimeError(f'curl failed: {stderr.decode("utf-8", "replace")}')
+
+        metrics.UPSTREAM_RESPONSE_BYTES.observe(len(stdout), operation)
+        if self.cassette is not None:
+            self.cassette.record(operation, params, stdout, time.perf_counter() - started)
+        return stdout
+
+    def _curl_command(self, endpoint: str, params: Dict) -> List[str]:
+        """API 요청용 curl 명령"""
         query_string = "&".join([f"{k}={v}" for k, v in params.items()])
         full_url = f"{endpoint}?{query_string}"
         
-        curl_command = [
+        return [
             'curl', '-X', 'GET', full_url,
             '-H', 'accept: */*',
             '--silent',
             '--connect-timeout', str(CONNECT_TIMEOUT),
             '--max-time', str(MAX_TIMEOUT)
         ]
-        
-        try:
-            result = subprocess.run(
-                curl_command,
-                capture_output=True,
-                text=True,
-                timeout=MAX_TIMEOUT
-            )
-            
-            if result.returncode != 0:
-                return {'error': f'curl failed: {result.stderr}'}
-            
-            # Try JSON first, then XML
+
+    def _decode_response(self, text: str, operation: str = '') -> Dict:
+        """응답 본문 해석 (JSON 우선, 실패 시 XML)"""
+        started = time.perf_counter()
+        with span('parse'):
             try:
-                return json.loads(result.stdout)
+                result, fmt = json.loads(text), 'json'
             except json.JSONDecodeError:
-                return self._parse_xml_response(result.stdout)
-                
-        except Exception as e:
-            return {'error': str(e)}
+                result, fmt = self._parse_xml_response(text), 'xml'
+        metrics.UPSTREAM_PARSE_SECONDS.observe(time.perf_counter() - started, operation, fmt)
+        return result
     
     def _parse_xml_response(self, xml_string: str) -> Dict:
         """XML 응답 파싱"""
@@ -156,6 +341,13 @@ class G2BClient:
                     'resultCode': header.findtext('resultCode', ''),
                     'resultMsg': header.findtext('resultMsg', '')
                 }
+            elif root.find('cmmMsgHeader') is not None:
+                # 공공데이터포털 게이트웨이 오류 (인증 실패, 요청 한도 초과 등)
+                header = root.find('cmmMsgHeader')
+                header_data = {
+                    'resultCode': header.findtext('returnReasonCode', ''),
+                    'resultMsg': header.findtext('returnAuthMsg', '') or header.findtext('errMsg', '')
+                }
             
             body = root.find('body')
             body_data = {}
@@ -246,6 +438,142 @@ class G2BClient:
                 pass
 
 
+class AsyncG2BClient(G2BClient):
+    """
+    asyncio용 나라장터 API 클라이언트
+
+    curl 하위 프로세스를 await 하므로 응답을 기다리는 동안 스레드를
+    점유하지 않는다. 동시에 실행되는 upstream 요청 수는 세마포어로 제한한다.
+    """
+
+    def __init__(self,
+                 service_key: str = SERVICE_KEY,
+                 max_concurrency: int = ASYNC_UPSTREAM_CONCURRENCY,
+                 cache=None,
+                 rate_limiter=None,
+                 base_url: Optional[str] = None,
+                 cassette=None):
+        super().__init__(service_key, cache=cache, rate_limiter=rate_limiter, base_url=base_url, cassette=cassette)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def get_bid_list(self,
+                           bid_type: str = "servc",
+                           start_date: Optional[datetime] = None,
+                           end_date: Optional[datetime] = None,
+                           page_no: int = 1,
+                           num_of_rows: int = 10,
+                           inqry_div: str = "1") -> Dict:
+        """입찰공고 목록 조회 (G2BClient.get_bid_list 참고)"""
+        return await self._request(
+            *self._bid_list_request(bid_type, start_date, end_date, page_no, num_of_rows, inqry_div)
+        )
+
+    async def _request(self, endpoint: str, params: Dict) -> Dict:
+        """API 요청 (G2BClient._request 참고)"""
+        with span('upstream'):
+            if self.cache is None or not UPSTREAM_CACHE_TTL:
+                return await self._fetch(endpoint, params)
+            return await self.cache.async_single_flight(self._cache_key(endpoint, params),
+                                                        lambda: self._fetch(endpoint, params),
+                                                        UPSTREAM_CACHE_TTL, cacheable=is_success)
+
+    async def _fetch(self, endpoint: str, params: Dict) -> Dict:
+        if self.rate_limiter is not None:
+            with span('ratelimit'):
+                await self.rate_limiter.async_acquire()
+        return await self._make_curl_request(endpoint, params)
+
+    async def iter_bid_pages(self,
+                             bid_type: str = "servc",
+                             start_date: Optional[datetime] = None,
+                             end_date: Optional[datetime] = None,
+                             num_of_rows: int = 100,
+                             max_pages: Optional[int] = None) -> AsyncIterator[Dict]:
+        """입찰공고 목록을 페이지 단위로 끝까지 조회 (G2BClient.iter_bid_pages 참고)"""
+        page_no = 1
+        while True:
+            result = await self.get_bid_list(
+                bid_type=bid_type,
+                start_date=start_date,
+                end_date=end_date,
+                page_no=page_no,
+                num_of_rows=num_of_rows
+            )
+            yield result
+
+            if not self._has_next_page(result, page_no, num_of_rows, max_pages):
+                return
+            page_no += 1
+
+    async def get_today_bids(self, bid_type: str = "all") -> List[Dict]:
+        """오늘 공고된 입찰 조회 (입찰 구분별 동시 조회)"""
+        today = datetime.now()
+        start = today.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = today.replace(hour=23, minute=59, second=0, microsecond=0)
+        types = [bid_type] if bid_type != "all" else ["servc", "cnstwk", "thng"]
+
+        results = await asyncio.gather(*[
+            self.get_bid_list(bid_type=type_name, start_date=start, end_date=end, num_of_rows=100)
+            for type_name in types
+        ])
+
+        all_bids = []
+        for type_name, result in zip(types, results):
+            if result and 'response' in result:
+                header = result['response'].get('header', {})
+                if header.get('resultCode') == '00':
+                    items = result['response'].get('body', {}).get('items', [])
+                    for item in items:
+                        item['bidType'] = self._get_type_name(type_name)
+                    all_bids.extend(items)
+        return all_bids
+
+    async def _make_curl_request(self, endpoint: str, params: Dict) -> Dict:
+        """curl 하위 프로세스를 await 하는 API 요청"""
+        operation = operation_name(endpoint)
+        if self.cassette is not None and self.cassette.replaying:
+            try:
+                entry = self.cassette.lookup(operation, params)
+            except LookupError as e:
+                return record_result(operation, {'error': str(e)})
+            with span('network'):
+                await asyncio.sleep(self.cassette.delay(entry))
+            return record_result(operation, self._decode_response(entry['body'].decode('utf-8', 'replace'),
+                                                                  operation))
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                with span('spawn'):
+                    proc = await asyncio.create_subprocess_exec(
+                        *self._curl_command(endpoint, params),
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE
+                    )
+            except Exception as e:
+                return record_result(operation, {'error': str(e)})
+
+            try:
+                with span('network'):
+                    stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=MAX_TIMEOUT)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                return record_result(operation, {'error': f'curl timed out after {MAX_TIMEOUT}s'})
+            except asyncio.CancelledError:
+                proc.kill()
+                raise
+            finally:
+                metrics.UPSTREAM_SECONDS.observe(time.perf_counter() - started, operation)
+
+            if proc.returncode != 0:
+                return record_result(operation, {'error': f'curl failed: {stderr.decode("utf-8", "replace")}'})
+
+            metrics.UPSTREAM_RESPONSE_BYTES.observe(len(stdout), operation)
+            if self.cassette is not None:
+                self.cassette.record(operation, params, stdout, time.perf_counter() - started)
+            return record_result(operation, self._decode_response(stdout.decode('utf-8', 'replace'), operation))
+
+
 def main():
     """메인 실행"""
     client = G2BClient()
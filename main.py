@@ -3,9 +3,12 @@
 나라장터 입찰공고 조회 메인 애플리케이션
 """
 
+import argparse
 import sys
 from datetime import datetime
+import cli
 from g2b_client import G2BClient
+from profiling import SamplingProfiler, folded
 
 
 def show_menu():
@@ -83,9 +86,44 @@ def main():
         input("\n계속하려면 Enter를 누르세요...")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='나라장터 입찰공고 조회 (하위 명령 없이 실행하면 대화형 메뉴)',
+        epilog='예: python3 main.py fetch --start 2025-01-01 --end 2025-03-31 --type servc -o servc.csv'
+    )
+    parser.add_argument('--profile', type=float, metavar='SECONDS',
+                        help='실행 중 최대 SECONDS초 동안 샘플링 프로파일 기록 (flamegraph용 folded 형식)')
+    parser.add_argument('--profile-out', default='profile.folded', metavar='PATH',
+                        help='프로파일 저장 경로 (기본: profile.folded)')
+    cli.register(parser.add_subparsers(dest='command', metavar='command'))
+    return parser.parse_args()
+
+
+def write_profile(profiler: SamplingProfiler, path: str) -> None:
+    """프로파일 결과 저장"""
+    stacks = profiler.stop()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(folded(stacks))
+    print(f"📊 프로파일 저장: {path} (샘플 {profiler.samples}회)", file=sys.stderr)
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    profiler = None
+    if args.profile:
+        profiler = SamplingProfiler()
+        profiler.start(args.profile)
     try:
+        if args.command:
+            sys.exit(args.handler(args))
         main()
     except KeyboardInterrupt:
-        print("\n\n프로그램을 종료합니다.")
-        sys.exit(0)
\ No newline at end of file
+        print("\n\n프로그램을 종료합니다.", file=sys.stderr if args.command else sys.stdout)
+        sys.exit(130 if args.command else 0)
+    except ValueError as e:
+        # 잘못된 날짜/입찰 구분 등 명령행 옵션 오류
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+    finally:
+        if profiler is not None:
+            write_profile(profiler, args.profile_out)
\ No newline at end of file
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+성능 지표 수집
+Minimal Prometheus-style counters, gauges and histograms with a text exporter
+
+기록은 프로세스 메모리의 dict 갱신뿐이고, 텍스트 변환과 콜백 계산은
+/metrics 조회(또는 워커 스냅샷 게시) 때만 한다. 운영 모드처럼 워커가
+여럿이면 각 워커가 METRICS_PUBLISH_INTERVAL초마다 스냅샷을 공유 캐시에
+올리고, /metrics는 살아 있는 워커의 스냅샷을 합쳐서 내보낸다.
+"""
+
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import METRICS_PUBLISH_INTERVAL
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000)
+
+SNAPSHOT_PREFIX = 'metrics:worker:'
+
+
+class Metric:
+    """지표 하나 (레이블 값 튜플별 값 보관)"""
+
+    kind = ''
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 fn: Optional[Callable[[], object]] = None):
+        """
+        Args:
+            fn: 조회 시점에 값을 계산하는 함수 (레이블이 없으면 숫자,
+                있으면 {레이블 튜플: 값})
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def samples(self) -> Dict[Tuple[str, ...], object]:
+        if self.fn is None:
+            with self._lock:
+                return {labels: self._copy(value) for labels, value in self._values.items()}
+        value = self.fn()
+        return value if isinstance(value, dict) else {(): value}
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """누적 버킷 히스토그램 (버킷별 개수, 합계, 개수)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+
+class Registry:
+    """지표 목록과 텍스트 형식 변환"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self.cache = None
+        self._published_at = 0.0
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=(), fn=None) -> Counter:
+        return self.register(Counter(name, help, labelnames, fn))
+
+    def gauge(self, name, help, labelnames=(), fn=None) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, List]:
+        """현재 값 ({지표 이름: [[레이블 값 목록, 값], ...]})"""
+        snapshot = {}
+        for metric in self._metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception:
+                # 콜백 오류가 다른 지표 수집을 막지 않도록 건너뜀
+                continue
+            snapshot[metric.name] = [[list(labels), value] for labels, value in samples.items()]
+        return snapshot
+
+    def share(self, cache) -> None:
+        """워커 스냅샷을 게시할 공유 캐시 지정 (shared_cache.SharedCache)"""
+        self.cache = cache
+
+    def maybe_publish(self) -> None:
+        """게시 주기가 지났으면 이 워커의 스냅샷을 공유 캐시에 게시 (요청 종료 시 호출)"""
+        if self.cache is None or time.monotonic() - self._published_at < METRICS_PUBLISH_INTERVAL:
+            return
+        self.publish()
+
+    def publish(self) -> None:
+        self._published_at = time.monotonic()
+        payload = json.dumps(self.snapshot()).encode('utf-8')
+        # 게시가 끊긴 워커(종료됨)의 스냅샷은 몇 주기 뒤 만료
+        self.cache.set(f'{SNAPSHOT_PREFIX}{os.getpid()}', payload, METRICS_PUBLISH_INTERVAL * 4)
+
+    def collect(self) -> Dict[str, List]:
+        """모든 워커의 값을 합친 스냅샷 (공유 캐시가 없으면 이 프로세스 값)"""
+        if self.cache is None:
+            return self.snapshot()
+        self.publish()
+        merged: Dict[str, Dict[Tuple[str, ...], object]] = {}
+        for payload in self.cache.scan(SNAPSHOT_PREFIX).values():
+            for name, samples in json.loads(payload).items():
+                target = merged.setdefault(name, {})
+                for labels, value in samples:
+                    labels = tuple(labels)
+                    target[labels] = _merge(target.get(labels), value)
+        return {name: [[list(labels), value] for labels, value in samples.items()]
+                for name, samples in merged.items()}
+
+    def render(self, snapshot: Optional[Dict[str, List]] = None) -> str:
+        """Prometheus 텍스트 형식"""
+        if snapshot is None:
+            snapshot = self.collect()
+        lines = []
+        for name, metric in self._metrics.items():
+            samples = snapshot.get(name)
+            if not samples:
+                continue
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, value in sorted(samples, key=lambda sample: sample[0]):
+                pairs = list(zip(metric.labelnames, labels))
+                if metric.kind == 'histogram':
+                    lines.extend(_histogram_lines(name, pairs, metric.buckets, value))
+                else:
+                    lines.append(f'{name}{_label_text(pairs)} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _merge(current, value):
+    if current is None:
+        return value
+    if isinstance(value, list):
+        return [[a + b for a, b in zip(current[0], value[0])], current[1] + value[1], current[2] + value[2]]
+    return current + value
+
+
+def _histogram_lines(name: str, pairs: List[Tuple[str, str]], buckets: Iterable[float], value) -> List[str]:
+    counts, total, count = value
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+        cumulative += bucket_count
+        le = bound if bound == '+Inf' else _number(bound)
+        lines.append(f'{name}_bucket{_label_text(pairs + [("le", le)])} {cumulative}')
+    lines.append(f'{name}_sum{_label_text(pairs)} {_number(total)}')
+    lines.append(f'{name}_count{_label_text(pairs)} {count}')
+    return lines
+
+
+def _label_text(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+REGISTRY = Registry()
+
+# upstream (G2BClient)
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    'g2b_upstream_request_seconds', 'upstream API 요청 시간 (curl 실행 포함)', ('operation',))
+UPSTREAM_PARSE_SECONDS = REGISTRY.histogram(
+    'g2b_upstream_parse_seconds', 'upstream 응답 해석 시간', ('operation', 'format'))
+UPSTREAM_RESPONSE_BYTES = REGISTRY.histogram(
+    'g2b_upstream_response_bytes', 'upstream 응답 크기', ('operation',), SIZE_BUCKETS)
+UPSTREAM_ITEMS = REGISTRY.histogram(
+    'g2b_upstream_items', '응답 하나의 항목 수', ('operation',), COUNT_BUCKETS)
+UPSTREAM_RESULTS = REGISTRY.counter(
+    'g2b_upstream_results_total', 'upstream 응답 결과 코드 (요청 실패는 error)', ('operation', 'result_code'))
+
+# 캐시
+RESULT_STORE_LOOKUPS = REGISTRY.counter(
+    'g2b_result_store_lookups_total', 'result_id 조회 (local 메모리, shared 공유 캐시에서 복원, expired 만료)',
+    ('result',))
+SEARCH_FETCHES = REGISTRY.counter(
+    'g2b_search_fetches_total', '검색 요청의 upstream 재조회 여부 (false면 가져온 결과에 필터만 적용, delta면 since 이후만 조회)',
+    ('refetched',))
+
+# 웹 요청
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'g2b_http_request_seconds', '라우트별 요청 처리 시간 (스트리밍 응답은 응답 시작까지)', ('method', 'route'))
+HTTP_REQUESTS = REGISTRY.counter(
+    'g2b_http_requests_total', '라우트별 요청 수', ('method', 'route', 'status'))
+
+
+def track_cache(cache) -> None:
+    """공유 캐시의 조회 결과 통계를 지표로 노출 (SharedCache.stats)"""
+    REGISTRY.counter('g2b_upstream_cache_requests_total',
+                     'upstream 캐시 조회 (hits 캐시, coalesced 다른 요청의 조회 결과를 기다려 사용, misses 직접 조회)',
+                     ('result',), fn=lambda: {(name,): value for name, value in cache.stats.items()})
+
+
+def track_results(results, columns: Callable[[], object]) -> None:
+    """검색 결과 메모리 사용량 지표 (ResultStore와 현재 BidColumns)"""
+    REGISTRY.gauge('g2b_result_sets', '메모리에 보관 중인 검색 결과 수', fn=lambda: len(results))
+    REGISTRY.gauge('g2b_result_set_bytes', '검색 결과 메모리 사용량 추정치', ('kind',),
+                   fn=lambda: {('results',): results.memory_bytes(),
+                               ('columns',): columns().memory_bytes() if columns() is not None else 0})
+
+
+def estimate_bytes(rows: Sequence[Dict], sample: int = 100) -> int:
+    """항목 목록의 대략적인 메모리 사용량 (앞쪽 일부 항목 크기로 추정)"""
+    if not rows:
+        return 0
+    sampled = rows[:sample]
+    size = sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values()) for row in sampled)
+    return sys.getsizeof(rows) + size * len(rows) // len(sampled)
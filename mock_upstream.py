@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+로컬 BidPublicInfoService 대역 서버
+Offline stand-in for the data.go.kr bid notice API (benchmarks, regression tests)
+
+getBidPblancListInfoServc/Cnstwk/Thng 세 오퍼레이션을 합성 데이터로 흉내 낸다.
+같은 seed면 같은 날짜·입찰 구분에 항상 같은 공고가 만들어지므로 결과를
+비교하는 회귀 테스트에도 쓸 수 있다.
+
+- pageNo/numOfRows/totalCount 페이지 나누기, inqryBgnDt~inqryEndDt 기간 조회
+- XML(기본), JSON(type=json) 응답
+- 응답 지연 분포 (--latency), 오류 주입 (--error-rate), 요청 한도 초과 (--quota)
+
+실행:
+    python mock_upstream.py --port 8800 --latency lognormal:150,0.6 --error-rate 0.01 --quota 1000
+    G2B_BASE_URL=http://127.0.0.1:8800 python main.py fetch --start 2025-01-01 --end 2025-01-31
+
+GET /_mock/stats 는 요청 수를, /_mock/reset 은 요청 수와 한도를 초기화한다.
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+
+OPERATIONS = {
+    'getBidPblancListInfoServc': 'servc',
+    'getBidPblancListInfoCnstwk': 'cnstwk',
+    'getBidPblancListInfoThng': 'thng',
+}
+
+# 평일 하루 공고 수 (주말은 1/10)
+DAILY_BIDS = {'servc': 120, 'cnstwk': 80, 'thng': 200}
+
+TYPE_CODES = {'servc': 'R', 'cnstwk': 'C', 'thng': 'T'}
+TITLES = {
+    'servc': ('정보시스템 유지관리 용역', '홈페이지 구축 용역', '청사 시설관리 용역', '학술연구 용역', '교육 운영 용역'),
+    'cnstwk': ('도로 포장 공사', '하수관로 정비공사', '청사 리모델링 공사', '교량 보수보강 공사', '체육시설 조성공사'),
+    'thng': ('사무용 PC 구매', '복합기 임차', '소방 장비 구매', '급식 식자재 구매', '전산 서버 도입'),
+}
+AGENCIES = ('서울특별시', '부산광역시', '경기도', '한국도로공사', '한국전력공사', '국토교통부', '교육부',
+            '한국수자원공사', '강원특별자치도', '제주특별자치도', '국방부', '조달청')
+DISTRICTS = ('본청', '북부지사', '남부지사', '시설관리사업소', '교육청', '연구원')
+
+# 게이트웨이 오류 (요청 한도 초과) - G2BClient._parse_xml_response가 읽는 형식
+QUOTA_ERROR = ('<OpenAPI_ServiceResponse><cmmMsgHeader><errMsg>SERVICE ERROR</errMsg>'
+               '<returnAuthMsg>LIMITED_NUMBER_OF_SERVICE_REQUESTS_EXCEEDS_ERROR</returnAuthMsg>'
+               '<returnReasonCode>22</returnReasonCode></cmmMsgHeader></OpenAPI_ServiceResponse>')
+
+ERROR_KINDS = ('http', 'app', 'malformed', 'hang')
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    지연 분포 (밀리초) → 지연 시간(초) 생성 함수
+
+    none, fixed:MS, uniform:LO,HI, lognormal:MEDIAN,SIGMA
+    """
+    kind, _, values = spec.partition(':')
+    numbers = [float(value) for value in values.split(',') if value]
+    if kind == 'none':
+        return lambda rng: 0.0
+    if kind == 'fixed' and len(numbers) == 1:
+        return lambda rng: numbers[0] / 1000
+    if kind == 'uniform' and len(numbers) == 2:
+        return lambda rng: rng.uniform(*numbers) / 1000
+    if kind == 'lognormal' and len(numbers) == 2:
+        mu = math.log(numbers[0])
+        return lambda rng: rng.lognormvariate(mu, numbers[1]) / 1000
+    raise ValueError(f'지연 분포 형식이 올바르지 않습니다: {spec}')
+
+
+class Dataset:
+    """날짜·입찰 구분별로 항상 같은 합성 공고를 만드는 생성기"""
+
+    def __init__(self, seed: int = 0, scale: float = 1.0):
+        self.seed = seed
+        self.scale = scale
+        self._day = lru_cache(maxsize=4096)(self._generate_day)
+
+    def query(self, bid_type: str, start: datetime, end: datetime) -> List[Dict]:
+        """공고일시가 start~end(분 단위, 포함)인 공고 (공고일시 순)"""
+        bids: List[Dict] = []
+        day = start.date()
+        while day <= end.date():
+            bids.extend(bid for bid in self._day(bid_type, day) if start <= bid['_dt'] <= end)
+            day += timedelta(days=1)
+        return bids
+
+    def sample(self, bid_type: str, count: int, start: date = date(2025, 1, 1)) -> Iterator[Dict]:
+        """start일부터 날짜순으로 count건 (벤치마크 입력용, 캐시하지 않음)"""
+        day = start
+        while count > 0:
+            bids = self._generate_day(bid_type, day)[:count]
+            count -= len(bids)
+            yield from bids
+            day += timedelta(days=1)
+
+    def _generate_day(self, bid_type: str, day: date) -> List[Dict]:
+        rng = random.Random(f'{self.seed}:{bid_type}:{day.isoformat()}')
+        count = DAILY_BIDS[bid_type] * self.scale * (1 if day.weekday() < 5 else 0.1)
+        count = int(count) + (rng.random() < count % 1)
+        minutes = sorted(rng.randint(8 * 60, 19 * 60) for _ in range(count))
+        bids = []
+        for index, minute in enumerate(minutes):
+            notice_dt = datetime.combine(day, datetime.min.time()) + timedelta(minutes=minute)
+            close_dt = notice_dt + timedelta(days=rng.randint(7, 21), hours=rng.randint(0, 6))
+            agency = rng.choice(AGENCIES)
+            demand = f'{agency} {rng.choice(DISTRICTS)}'
+            number = f'{TYPE_CODES[bid_type]}{day:%y}BK{day:%m%d}{index:05d}'
+            bids.append({
+                '_dt': notice_dt,
+                'bidNtceNo': number,
+                'bidNtceOrd': '000',
+                'reNtceYn': 'N',
+                'bidNtceNm': f'{demand} {rng.choice(TITLES[bid_type])} ({day:%Y}-{index + 1})',
+                'ntceInsttCd': f'{AGENCIES.index(agency) + 1:07d}',
+                'ntceInsttNm': agency,
+                'dminsttCd': f'{rng.randint(1, 9999999):07d}',
+                'dminsttNm': demand,
+                'bidMethdNm': rng.choice(('전자입찰', '전자시담')),
+                'cntrctCnclsMthdNm': rng.choice(('제한경쟁', '일반경쟁', '수의계약')),
+                'bidNtceDt': f'{notice_dt:%Y-%m-%d %H:%M:%S}',
+                'bidBeginDt': f'{notice_dt + timedelta(days=1):%Y-%m-%d %H:%M:%S}',
+                'bidClseDt': f'{close_dt:%Y-%m-%d %H:%M:%S}',
+                'opengDt': f'{close_dt + timedelta(hours=1):%Y-%m-%d %H:%M:%S}',
+                'presmptPrce': str(rng.randrange(10, 50000) * 100000),
+                'bidNtceDtlUrl': f'https://www.g2b.go.kr/link/{number}',
+                'bidNtceUrl': f'https://www.g2b.go.kr/link/{number}',
+                'rgstDt': f'{notice_dt:%Y-%m-%d %H:%M:%S}',
+            })
+        return bids
+
+
+def _public(item: Dict) -> Dict:
+    return {key: value for key, value in item.items() if not key.startswith('_')}
+
+
+def render_xml(code: str, message: str, items: Iterable[Dict], total: int, page_no: int = 1, rows: int = 10) -> str:
+    """실제 API와 같은 형식의 XML 응답 본문"""
+    parts = [f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><response><header>'
+             f'<resultCode>{code}</resultCode><resultMsg>{message}</resultMsg></header><body><items>']
+    for item in items:
+        parts.append('<item>' + ''.join(f'<{key}>{escape(value)}</{key}>' for key, value in _public(item).items())
+                     + '</item>')
+    parts.append(f'</items><numOfRows>{rows}</numOfRows><pageNo>{page_no}</pageNo>'
+                 f'<totalCount>{total}</totalCount></body></response>')
+    return ''.join(parts)
+
+
+def render_json(code: str, message: str, items: List[Dict], total: int, page_no: int = 1, rows: int = 10) -> str:
+    """JSON(type=json) 응답 본문"""
+    return json.dumps({'response': {
+        'header': {'resultCode': code, 'resultMsg': message},
+        'body': {'items': [_public(item) for item in items], 'numOfRows': rows, 'pageNo': page_no,
+                 'totalCount': total},
+    }}, ensure_ascii=False)
+
+
+class MockState:
+    """요청 수, 한도, 지연/오류 설정 (요청 처리 스레드끼리 공유)"""
+
+    def __init__(self,
+                 dataset: Dataset,
+                 latency: str = 'none',
+                 error_rate: float = 0.0,
+                 error_kinds: Tuple[str, ...] = ERROR_KINDS,
+                 quota: Optional[int] = None,
+                 hang_seconds: float = 65.0,
+                 seed: int = 0):
+        self.dataset = dataset
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.error_kinds = error_kinds
+        self.quota = quota
+        self.hang_seconds = hang_seconds
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+    def count(self, name: str) -> int:
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+            return self.stats[name]
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats = {}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = 'MockBidPublicInfoService/1.0'
+    state: MockState
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/_mock/stats':
+            with self.state.lock:
+                return self._send(200, json.dumps(self.state.stats), 'application/json')
+        if url.path == '/_mock/reset':
+            self.state.reset()
+            return self._send(200, '{"reset": true}', 'application/json')
+
+        bid_type = OPERATIONS.get(url.path.rstrip('/').rsplit('/', 1)[-1])
+        if bid_type is None:
+            return self._send(404, '<OpenAPI_ServiceResponse><cmmMsgHeader><errMsg>SERVICE ERROR</errMsg>'
+                                   '<returnAuthMsg>NO_OPENAPI_SERVICE_ERROR</returnAuthMsg><returnReasonCode>12'
+                                   '</returnReasonCode></cmmMsgHeader></OpenAPI_ServiceResponse>', 'text/xml')
+
+        state = self.state
+        requests = state.count('requests')
+        with state.lock:
+            delay = state.latency(state.rng)
+            error = None
+            if state.error_kinds and state.rng.random() < state.error_rate:
+                error = state.rng.choice(state.error_kinds)
+        time.sleep(delay)
+
+        if state.quota is not None and requests > state.quota:
+            state.count('quota_errors')
+            return self._send(200, QUOTA_ERROR, 'text/xml')
+        if error:
+            state.count(f'injected_{error}')
+            return self._inject(error)
+
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            page_no = max(1, int(params.get('pageNo', 1)))
+            rows = max(1, min(999, int(params.get('numOfRows', 10))))
+            end = datetime.strptime(params['inqryEndDt'], '%Y%m%d%H%M') if 'inqryEndDt' in params \
+                else datetime.now()
+            start = datetime.strptime(params['inqryBgnDt'], '%Y%m%d%H%M') if 'inqryBgnDt' in params \
+                else end - timedelta(days=7)
+        except ValueError:
+            return self._respond(params, '10', 'INVALID_REQUEST_PARAMETER_ERROR', [], 0, 1, 10)
+
+        bids = state.dataset.query(bid_type, start, end)
+        items = bids[(page_no - 1) * rows:page_no * rows]
+        self._respond(params, '00', '정상', items, len(bids), page_no, rows)
+
+    def _respond(self, params, code, message, items, total, page_no, rows):
+        if params.get('type') == 'json':
+            return self._send(200, render_json(code, message, items, total, page_no, rows),
+                              'application/json;charset=UTF-8')
+        self._send(200, render_xml(code, message, items, total, page_no, rows), 'text/xml;charset=UTF-8')
+
+    def _inject(self, kind: str):
+        if kind == 'http':
+            return self._send(500, 'Internal Server Error', 'text/plain')
+        if kind == 'app':
+            return self._respond({}, '01', 'APPLICATION_ERROR', [], 0, 1, 10)
+        if kind == 'malformed':
+            return self._send(200, '<response><header><resultCode>00</resultCode><resultMsg>', 'text/xml')
+        # hang: 클라이언트 제한 시간(MAX_TIMEOUT)보다 오래 응답하지 않음
+        time.sleep(self.state.hang_seconds)
+        return self._send(504, 'Gateway Timeout', 'text/plain')
+
+    def _send(self, status: int, body: str, content_type: str):
+        data = body.encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockUpstream:
+    """
+    대역 서버를 백그라운드 스레드로 실행 (벤치마크, 테스트용)
+
+        with MockUpstream(latency='fixed:50') as upstream:
+            client = G2BClient(base_url=upstream.url)
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **options):
+        seed = options.pop('seed', 0)
+        self.state = MockState(Dataset(seed=seed, scale=options.pop('scale', 1.0)), seed=seed, **options)
+        handler = type('Handler', (MockHandler,), {'state': self.state})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'MockUpstream':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='mock-upstream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'MockUpstream':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 BidPublicInfoService 대역 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--seed', type=int, default=0, help='합성 데이터 seed')
+    parser.add_argument('--scale', type=float, default=1.0, help='하루 공고 수 배율')
+    parser.add_argument('--latency', default='none',
+                        help='응답 지연 (밀리초): none, fixed:MS, uniform:LO,HI, lognormal:MEDIAN,SIGMA')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='오류 응답 비율 (0~1)')
+    parser.add_argument('--error-kinds', default=','.join(ERROR_KINDS),
+                        help=f"주입할 오류 종류 (쉼표 구분: {', '.join(ERROR_KINDS)})")
+    parser.add_argument('--hang-seconds', type=float, default=65.0, help='hang 오류의 응답 지연 (초)')
+    parser.add_argument('--quota', type=int, help='이 수를 넘는 요청은 한도 초과 오류 (/_mock/reset으로 초기화)')
+    args = parser.parse_args()
+
+    kinds = tuple(kind.strip() for kind in args.error_kinds.split(',') if kind.strip())
+    for kind in kinds:
+        if kind not in ERROR_KINDS:
+            parser.error(f'알 수 없는 오류 종류입니다: {kind}')
+    try:
+        parse_latency(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+
+    upstream = MockUpstream(args.host, args.port, seed=args.seed, scale=args.scale, latency=args.latency,
+                            error_rate=args.error_rate, error_kinds=kinds, quota=args.quota,
+                            hang_seconds=args.hang_seconds)
+    print(f'🧪 대역 서버: {upstream.url} (G2B_BASE_URL={upstream.url})')
+    try:
+        upstream.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        upstream.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+응답 페이지 병렬 해석
+Process-pool parsing of raw upstream pages into compact columnar buffers
+
+대량 수집(backfill, fetch)에서는 XML 해석과 항목 dict 생성이 GIL에 묶여
+네트워크보다 먼저 병목이 된다. ParserPool은 응답 본문(bytes)을 작업 프로세스로
+보내 해석하고, 필요한 필드만 뽑아 필드별 UTF-8 버퍼 하나와 오프셋 배열로
+돌려받는다. 프로세스 사이에는 dict 목록 대신 bytes 몇 개만 오가므로 직렬화
+비용이 작고, 본 프로세스는 버퍼를 잘라 항목을 만들기만 한다.
+
+실행: G2BClient.get_bid_list_raw 응답 → ParserPool.parse → search_service.page_chunk와 같은 청크
+"""
+
+import json
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import metrics
+from config import PARSE_WORKERS
+from request_timing import span
+from search_service import TYPE_NAMES
+
+
+# search_service.normalize_bid가 쓰는 응답 필드
+FIELDS = ('bidNtceNo', 'bidNtceNm', 'dminsttNm', 'bidNtceDt', 'bidClseDt', 'presmptPrce', 'bidNtceUrl',
+          'ntceInsttNm')
+
+PAGE_SIZE = 100
+
+# (헤더, 항목 수, 필드별 (오프셋 bytes, UTF-8 bytes))
+ParsedPage = Tuple[Dict, int, List[Tuple[bytes, bytes]]]
+
+
+def parse_raw(raw: bytes) -> ParsedPage:
+    """
+    응답 본문을 열 단위 버퍼로 해석 (작업 프로세스에서 실행)
+
+    헤더는 {'resultCode', 'resultMsg', 'totalCount', 'format'} 이고, 해석에
+    실패하면 {'error': 메시지}.
+    """
+    text = raw.decode('utf-8', 'replace')
+    try:
+        try:
+            header, items = _json_page(json.loads(text))
+        except json.JSONDecodeError:
+            header, items = _xml_page(ET.fromstring(text))
+    except Exception as e:
+        return {'error': f'parsing failed: {e}'}, 0, []
+    return header, len(items), [_encode([item[index] for item in items]) for index in range(len(FIELDS))]
+
+
+def _json_page(data: Dict) -> Tuple[Dict, List[Tuple[str, ...]]]:
+    response = data.get('response', {})
+    header = response.get('header', {})
+    body = response.get('body') or {}
+    items = body.get('items') or []
+    if isinstance(items, dict):
+        items = items.get('item') or []
+        items = [items] if isinstance(items, dict) else items
+    return ({'resultCode': header.get('resultCode', ''), 'resultMsg': header.get('resultMsg', ''),
+             'totalCount': body.get('totalCount', 0), 'format': 'json'},
+            [tuple(str(item.get(field) or '') for field in FIELDS) for item in items])
+
+
+def _xml_page(root: ET.Element) -> Tuple[Dict, List[Tuple[str, ...]]]:
+    header = root.find('header')
+    if header is not None:
+        code, message = header.findtext('resultCode', ''), header.findtext('resultMsg', '')
+    elif root.find('cmmMsgHeader') is not None:
+        # 공공데이터포털 게이트웨이 오류 (G2BClient._parse_xml_response 참고)
+        header = root.find('cmmMsgHeader')
+        code = header.findtext('returnReasonCode', '')
+        message = header.findtext('returnAuthMsg', '') or header.findtext('errMsg', '')
+    else:
+        code, message = '', ''
+    body = root.find('body')
+    items = [] if body is None else body.findall('items/item')
+    return ({'resultCode': code, 'resultMsg': message,
+             'totalCount': body.findtext('totalCount', '0') if body is not None else 0, 'format': 'xml'},
+            [tuple(item.findtext(field) or '' for field in FIELDS) for item in items])
+
+
+def _encode(values: List[str]) -> Tuple[bytes, bytes]:
+    """문자열 목록 → (문자 단위 끝 위치 배열, 이어 붙인 UTF-8)"""
+    return array('I', accumulate(map(len, values))).tobytes(), ''.join(values).encode('utf-8')
+
+
+def _decode(buffer: Tuple[bytes, bytes]) -> List[str]:
+    offsets, data = array('I'), buffer[1].decode('utf-8')
+    offsets.frombytes(buffer[0])
+    starts = [0, *offsets[:-1]] if offsets else []
+    return [data[start:end] for start, end in zip(starts, offsets)]
+
+
+def decode_items(type_name: str, rows: int, buffers: List[Tuple[bytes, bytes]]) -> List[Dict]:
+    """열 버퍼 → search_service.normalize_bid와 같은 항목 목록"""
+    if not rows:
+        return []
+    bid_type = TYPE_NAMES.get(type_name, type_name)
+    columns = dict(zip(FIELDS, (_decode(buffer) for buffer in buffers)))
+    return [{
+        'id': f'{type_name}_{no}',
+        'bidType': bid_type,
+        'bidNtceNo': no,
+        'bidNtceNm': name,
+        'dminsttNm': demand,
+        'bidNtceDt': notice_dt,
+        'bidClseDt': close_dt,
+        'presmptPrce': price,
+        'bidNtceUrl': url,
+        'ntceInsttNm': notice_inst,
+    } for no, name, demand, notice_dt, close_dt, price, url, notice_inst in zip(*(columns[f] for f in FIELDS))]
+
+
+class ParserPool:
+    """
+    응답 해석 프로세스 풀 (workers가 0이면 호출한 스레드에서 해석)
+
+    여러 조회 스레드가 함께 써도 되며, with 문이나 close()로 정리한다.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS):
+        self.workers = max(0, workers)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers else None
+
+    def __enter__(self) -> 'ParserPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def parse(self, type_name: str, page_no: int, response: Dict) -> Dict:
+        """
+        get_bid_list_raw 응답 → 청크
+
+        Returns:
+            {'bid_type', 'page', 'items', 'total', 'error', 'result_code'}
+        """
+        chunk = {'bid_type': type_name, 'page': page_no, 'items': [], 'total': 0, 'error': None,
+                 'result_code': None}
+        operation = f'getBidPblancListInfo{type_name.capitalize()}'
+        if 'raw' not in response:
+            chunk['error'] = response.get('error', '응답이 없습니다.')
+            return chunk
+
+        started = time.perf_counter()
+        with span('parse'):
+            if self._pool is None:
+                header, rows, buffers = parse_raw(response['raw'])
+            else:
+                header, rows, buffers = self._pool.submit(parse_raw, response['raw']).result()
+        if 'error' in header:
+            metrics.UPSTREAM_RESULTS.inc(operation, 'error')
+            chunk['error'] = header['error']
+            return chunk
+        metrics.UPSTREAM_PARSE_SECONDS.observe(time.perf_counter() - started, operation, header['format'])
+        metrics.UPSTREAM_RESULTS.inc(operation, header['resultCode'] or 'unknown')
+
+        chunk['result_code'] = header['resultCode']
+        if header['resultCode'] != '00':
+            chunk['error'] = header['resultMsg'] or f"resultCode {header['resultCode']}"
+            return chunk
+        try:
+            chunk['total'] = int(header['totalCount'])
+        except (TypeError, ValueError):
+            pass
+        metrics.UPSTREAM_ITEMS.observe(rows, operation)
+        with span('reshape'):
+            chunk['items'] = decode_items(type_name, rows, buffers)
+        return chunk
+
+    def iter_pages(self,
+                   client,
+                   type_name: str,
+                   start_date,
+                   end_date,
+                   max_pages: Optional[int] = None) -> Iterator[Dict]:
+        """G2BClient.iter_bid_pages처럼 끝 페이지(또는 오류)까지 조회하며 청크를 yield"""
+        page_no = 1
+        while True:
+            chunk = self.parse(type_name, page_no, client.get_bid_list_raw(
+                bid_type=type_name, start_date=start_date, end_date=end_date, page_no=page_no,
+                num_of_rows=PAGE_SIZE))
+            yield chunk
+            if chunk['error'] or not chunk['items'] or page_no * PAGE_SIZE >= chunk['total']:
+                return
+            if max_pages and page_no >= max_pages:
+                return
+            page_no += 1
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+실행 중 프로파일링
+On-demand sampling profiler and tracemalloc allocation tracker
+
+운영 중에만 재현되는 지연을 조사하기 위한 도구. 둘 다 요청을 받았을 때만
+동작하고, 꺼져 있을 때는 스레드도 추적 훅도 없으므로 비용이 없다.
+
+- SamplingProfiler: 정해진 시간 동안 별도 스레드가 주기적으로 모든 스레드의
+  호출 스택(sys._current_frames)을 읽어 folded 형식(flamegraph.pl, speedscope)으로 집계
+- AllocationTracker: tracemalloc 스냅샷의 할당 위치 상위 목록과 기준 스냅샷 대비 증감
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+from config import PROFILE_INTERVAL, PROFILE_MAX_SECONDS
+
+
+# 호출 스택 맨 끝이 이 파일들이면 대기 중인 스레드로 보고 제외 (idle=False)
+IDLE_FILES = ('threading.py', 'selectors.py', 'queue.py', 'socket.py', 'socketserver.py')
+
+# 할당 위치를 볼 프로젝트 모듈 (응답 해석, 결과 구성)
+DEFAULT_TRACE_FILES = ('g2b_client.py', 'search_service.py', 'bid_index.py', 'bid_filter.py',
+                       'bid_store.py', 'exporters.py')
+
+
+class ProfilerBusyError(Exception):
+    """이미 프로파일링이 진행 중"""
+    pass
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """
+    샘플링 프로파일러 (프로세스당 한 번에 하나)
+
+    start()로 시작하면 seconds가 지나거나 stop()을 부를 때까지 샘플링한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: Counter = Counter()
+        self.samples = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self,
+              seconds: float,
+              interval: float = PROFILE_INTERVAL,
+              thread_ids: Optional[Sequence[int]] = None,
+              idle: bool = False) -> None:
+        """
+        Args:
+            seconds: 최대 샘플링 시간 (PROFILE_MAX_SECONDS로 제한)
+            interval: 샘플 간격 (초)
+            thread_ids: 샘플링할 스레드 (None이면 전체)
+            idle: 대기 중인 스레드의 스택도 포함
+        """
+        with self._lock:
+            if self.running:
+                raise ProfilerBusyError('이미 프로파일링이 진행 중입니다.')
+            self._stop.clear()
+            self._stacks = Counter()
+            self.samples = 0
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(min(seconds, PROFILE_MAX_SECONDS), interval, thread_ids, idle),
+                name='sampling-profiler',
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        """샘플링을 멈추고 folded 스택별 샘플 수 반환"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        return dict(self._stacks)
+
+    def profile(self, seconds: float, **options) -> Dict[str, int]:
+        """seconds 동안 샘플링한 결과 (호출한 스레드는 기다림)"""
+        self.start(seconds, **options)
+        self._thread.join()
+        return self.stop()
+
+    def _run(self, seconds, interval, thread_ids, idle) -> None:
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (thread_ids is not None and thread_id not in thread_ids):
+                    continue
+                if not idle and os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self._stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+            self._stop.wait(interval)
+
+
+def folded(stacks: Dict[str, int]) -> str:
+    """folded 형식 텍스트 ('바깥;...;안쪽 샘플수' 한 줄씩, 많은 순)"""
+    return ''.join(f'{stack} {count}\n' for stack, count in sorted(stacks.items(), key=lambda item: -item[1]))
+
+
+class AllocationTracker:
+    """
+    tracemalloc 할당 추적
+
+    start() 전에는 tracemalloc이 꺼져 있어 할당 비용이 늘지 않는다.
+    start() 시점의 스냅샷을 기준으로 두고 diff()로 그 뒤의 증감을 본다.
+    """
+
+    def __init__(self):
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def running(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 10) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._baseline = self._snapshot()
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._baseline = None
+
+    def reset(self) -> None:
+        """현재 상태를 새 기준 스냅샷으로"""
+        self._require_running()
+        self._baseline = self._snapshot()
+
+    def top(self, limit: int = 20, key_type: str = 'lineno',
+            files: Optional[Sequence[str]] = DEFAULT_TRACE_FILES) -> List[Dict]:
+        """현재 살아 있는 할당의 위치별 상위 목록"""
+        self._require_running()
+        stats = self._filter(self._snapshot(), files).statistics(key_type)
+        return [self._stat_dict(stat) for stat in stats[:limit]]
+
+    def diff(self, limit: int = 20, key_type: str = 'lineno',
+             files: Optional[Sequence[str]] = DEFAULT_TRACE_FILES) -> List[Dict]:
+        """기준 스냅샷 대비 할당 증감 상위 목록"""
+        self._require_running()
+        current = self._filter(self._snapshot(), files)
+        stats = current.compare_to(self._filter(self._baseline, files), key_type)
+        return [{**self._stat_dict(stat), 'size_diff': stat.size_diff, 'count_diff': stat.count_diff}
+                for stat in stats[:limit]]
+
+    def _require_running(self) -> None:
+        if not tracemalloc.is_tracing() or self._baseline is None:
+            raise ValueError('할당 추적이 시작되지 않았습니다.')
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        # 추적 자체의 할당은 제외
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ])
+
+    def _filter(self, snapshot: tracemalloc.Snapshot, files: Optional[Sequence[str]]) -> tracemalloc.Snapshot:
+        if not files:
+            return snapshot
+        return snapshot.filter_traces([tracemalloc.Filter(True, f'*{os.sep}{name}', all_frames=True)
+                                       for name in files])
+
+    @staticmethod
+    def _stat_dict(stat) -> Dict:
+        return {
+            'traceback': [f'{os.path.basename(frame.filename)}:{frame.lineno}' for frame in stat.traceback],
+            'size': stat.size,
+            'count': stat.count,
+        }
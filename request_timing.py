@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+요청 단계별 처리 시간
+Lightweight per-request spans exported as Server-Timing headers and JSON log lines
+
+웹 요청마다 RequestTiming 하나를 contextvar에 두고, 코드 곳곳에서
+`with span('parse'):`처럼 단계 시간을 더한다. 요청 밖(CLI, 백그라운드 작업)
+에서는 span이 아무것도 하지 않는다. 끝난 요청은 Server-Timing 헤더로
+브라우저 개발자 도구에 표시되고, 일부(표본 또는 느린 요청)는 JSON 한 줄로
+로그에 남는다.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from config import REQUEST_LOG_SAMPLE_RATE, REQUEST_LOG_SLOW_MS
+
+
+logger = logging.getLogger('g2b.requests')
+
+_current: 'contextvars.ContextVar[Optional[RequestTiming]]' = contextvars.ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """요청 하나의 단계별 누적 시간 (병렬 조회 스레드에서도 함께 기록)"""
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.started = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            total = self.spans.get(name)
+            if total is None:
+                self.spans[name] = [seconds, 1]
+            else:
+                total[0] += seconds
+                total[1] += 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (병렬로 실행된 단계는 합계이므로 total보다 클 수 있음, 헤더라 ASCII만 사용)"""
+        with self._lock:
+            spans = list(self.spans.items())
+        parts = [f'{name};dur={seconds * 1000:.1f}' + (f';desc="{count} calls"' if count > 1 else '')
+                 for name, (seconds, count) in spans]
+        parts.append(f'total;dur={self.elapsed() * 1000:.1f}')
+        return ', '.join(parts)
+
+    def log(self, status: int) -> None:
+        """표본이거나 느린 요청이면 JSON 한 줄 로그"""
+        duration_ms = self.elapsed() * 1000
+        if duration_ms < REQUEST_LOG_SLOW_MS and random.random() >= REQUEST_LOG_SAMPLE_RATE:
+            return
+        with self._lock:
+            spans = {name: {'ms': round(seconds * 1000, 1), 'count': count}
+                     for name, (seconds, count) in self.spans.items()}
+        logger.info(json.dumps({
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'pid': os.getpid(),
+            'method': self.method,
+            'route': self.route,
+            'status': status,
+            'duration_ms': round(duration_ms, 1),
+            'spans': spans,
+        }, ensure_ascii=False))
+
+
+def start(method: str, route: str) -> RequestTiming:
+    """현재 요청의 시간 측정 시작"""
+    timing = RequestTiming(method, route)
+    _current.set(timing)
+    return timing
+
+
+def current() -> Optional[RequestTiming]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """블록 실행 시간을 현재 요청의 name 단계에 더함"""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - started)
+
+
+def configure_logging() -> None:
+    """요청 로그를 표준 오류로 출력 (이미 핸들러가 있으면 그대로 사용)"""
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
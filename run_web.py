@@ -5,15 +5,23 @@
 
 import os
 import sys
+import argparse
 import subprocess
 
-def check_dependencies():
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import SERVER_THREADS, SERVER_WORKERS
+
+def check_dependencies(async_mode=False, prod=False):
     """필요한 의존성 확인"""
     try:
         import flask
         import flask_cors
-        import pandas
         import openpyxl
+        if async_mode:
+            import starlette
+            import uvicorn
+        if prod:
+            import gunicorn
         return True
     except ImportError as e:
         print(f"❌ 필요한 패키지가 설치되지 않았습니다: {e}")
@@ -21,14 +29,44 @@ def check_dependencies():
         print("pip install -r requirements.txt")
         return False
 
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="나라장터 입찰공고 검색 웹 애플리케이션")
+    parser.add_argument('--async', dest='async_mode', action='store_true',
+                        help="ASGI(비동기) 서버로 실행 (uvicorn + asgi_app.py)")
+    parser.add_argument('--port', type=int, default=5000, help="접속 포트 (기본 5000)")
+    parser.add_argument('--prod', action='store_true',
+                        help="운영 모드: gunicorn 멀티 워커로 실행 (앱을 미리 로드한 뒤 fork)")
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS,
+                        help=f"운영 모드 워커 프로세스 수 (기본 {SERVER_WORKERS})")
+    return parser.parse_args()
+
+def server_command(args):
+    """실행할 서버 명령"""
+    if args.prod:
+        # --preload: 앱을 마스터에서 한 번 로드한 뒤 fork 하므로 읽기 전용 메모리를 워커끼리 공유
+        command = [sys.executable, '-m', 'gunicorn', '--preload',
+                   '--workers', str(args.workers),
+                   '--bind', f'0.0.0.0:{args.port}',
+                   '--timeout', '120']
+        if args.async_mode:
+            return command + ['--worker-class', 'uvicorn.workers.UvicornWorker', 'asgi_app:app']
+        return command + ['--worker-class', 'gthread', '--threads', str(SERVER_THREADS), 'app:app']
+    
+    if args.async_mode:
+        return [sys.executable, '-m', 'uvicorn', 'asgi_app:app', '--host', '0.0.0.0', '--port', str(args.port)]
+    return [sys.executable, 'app.py', '--port', str(args.port)]
+
 def main():
     """메인 실행 함수"""
+    args = parse_args()
+    
     print("=" * 60)
     print("🚀 나라장터 입찰공고 검색 웹 애플리케이션")
     print("=" * 60)
     
     # 의존성 확인
-    if not check_dependencies():
+    if not check_dependencies(args.async_mode, args.prod):
         return
     
     # 웹 디렉토리로 이동
@@ -41,12 +79,15 @@ def main():
     
     print("\n✅ 의존성 확인 완료")
     print("🌐 웹 서버를 시작합니다...")
-    print("\n접속 주소: http://localhost:5000")
+    if args.async_mode:
+        print("⚡ 비동기(ASGI) 모드")
+    if args.prod:
+        print(f"🏭 운영 모드 (워커 {args.workers}개)")
+    print(f"\n접속 주소: http://localhost:{args.port}")
     print("종료하려면 Ctrl+C를 누르세요.\n")
     
     try:
-        # Flask 애플리케이션 실행
-        subprocess.run([sys.executable, 'app.py'])
+        subprocess.run(server_command(args))
     except KeyboardInterrupt:
         print("\n\n👋 웹 서버가 종료되었습니다.")
 
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+저장된 검색과 알림
+Saved searches matched incrementally against each ingested batch
+
+저장된 검색 전체를 하나의 색인으로 컴파일해 두고, 저장소에 새로 들어온
+공고 배치를 한 번에 대조한다. 검색마다 비트 하나를 배정하고 조건별로
+"통과하는 검색" 비트마스크를 구해 AND 하므로, 공고 하나를 대조하는 비용은
+저장된 검색 수가 아니라 공고명/기관명 길이에 비례한다.
+
+- 키워드, 기관명: Aho-Corasick 오토마톤 (한 번 훑어서 모든 패턴 검사)
+- 입찰 구분: 구분별 비트마스크
+- 예정가격 범위: 경계값으로 나눈 구간별 비트마스크 (bisect)
+"""
+
+import bisect
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bid_filter import INSTITUTION_FIELDS
+from bid_store import BidStore, IngestBatch, bid_type_of
+from config import ALERT_BATCH_SIZE, ALERT_FILE, ALERT_QUEUE_SIZE, ALERT_WEBHOOK_URL, ALERT_WEBHOOK_TIMEOUT
+from search_service import BID_TYPES
+
+
+logger = logging.getLogger('g2b.alerts')
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    criteria TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+ALERT_LOG = """
+CREATE TABLE IF NOT EXISTS alert_log (
+    search_id INTEGER NOT NULL,
+    bid_id TEXT NOT NULL,
+    sink TEXT NOT NULL,
+    sent_at REAL NOT NULL,
+    PRIMARY KEY (search_id, bid_id, sink)
+)
+"""
+
+# 전송 대상 구분 없이 기록하던 이전 알림 기록 (모든 대상에 보낸 것으로 봄)
+ALL_SINKS = '*'
+
+
+def normalize_criteria(data: Dict) -> Dict:
+    """저장할 검색 조건 정리 (잘못된 값이면 ValueError)"""
+    def as_list(value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            value = value.split(',')
+        return [item.strip() for item in value if item and item.strip() and item.strip() != 'all']
+
+    def price(name):
+        value = data.get(name)
+        return float(value) if value not in (None, '') else None
+
+    criteria = {
+        'keywords': [keyword.lower() for keyword in as_list(data.get('keywords') or data.get('keyword'))],
+        'agencies': as_list(data.get('agencies') or data.get('agency_filter')),
+        'institution': data.get('institution') or 'demand',
+        'bid_types': as_list(data.get('bid_types') or data.get('bid_type')),
+        'min_price': price('min_price'),
+        'max_price': price('max_price'),
+    }
+
+    if criteria['institution'] not in INSTITUTION_FIELDS:
+        raise ValueError(f"기관 구분은 demand 또는 notice여야 합니다: {criteria['institution']}")
+    for bid_type in criteria['bid_types']:
+        if bid_type not in BID_TYPES:
+            raise ValueError(f'알 수 없는 입찰 구분입니다: {bid_type}')
+    if criteria['min_price'] is not None and criteria['max_price'] is not None \
+            and criteria['min_price'] > criteria['max_price']:
+        raise ValueError('최소 예정가격이 최대 예정가격보다 큽니다.')
+    if not any(criteria[key] for key in ('keywords', 'agencies', 'bid_types')) \
+            and criteria['min_price'] is None and criteria['max_price'] is None:
+        raise ValueError('검색 조건을 하나 이상 지정해주세요.')
+    return criteria
+
+
+class AhoCorasick:
+    """
+    다중 패턴 문자열 검색 오토마톤
+
+    패턴마다 비트마스크를 붙여 두고, scan()은 텍스트를 한 번 훑으며
+    등장한 모든 패턴의 마스크를 OR 해서 반환한다.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [0]
+
+    def add(self, pattern: str, mask: int) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+            node = next_node
+        self._out[node] |= mask
+
+    def build(self) -> None:
+        """실패 링크 생성 (패턴을 모두 추가한 뒤 한 번 호출)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] |= self._out[self._fail[child]]
+                queue.append(child)
+
+    def scan(self, text: str) -> int:
+        goto, fail, out = self._goto, self._fail, self._out
+        node, mask = 0, 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                mask |= out[node]
+        return mask
+
+
+class SearchMatcher:
+    """저장된 검색 목록을 컴파일한 색인"""
+
+    def __init__(self, searches: List[Dict]):
+        self.searches = searches
+
+        self.keywords = AhoCorasick()
+        self.keyword_free = 0
+        self.agencies = {institution: AhoCorasick() for institution in INSTITUTION_FIELDS}
+        self.agency_free = 0
+        self.type_masks = {bid_type: 0 for bid_type in BID_TYPES}
+        ranges: List[Tuple[int, float, float]] = []
+        self.price_free = 0
+
+        for position, search in enumerate(searches):
+            bit = 1 << position
+            criteria = search['criteria']
+
+            if criteria['keywords']:
+                for keyword in criteria['keywords']:
+                    self.keywords.add(keyword, bit)
+            else:
+                self.keyword_free |= bit
+
+            if criteria['agencies']:
+                for agency in criteria['agencies']:
+                    self.agencies[criteria['institution']].add(agency, bit)
+            else:
+                self.agency_free |= bit
+
+            for bid_type in criteria['bid_types'] or BID_TYPES:
+                self.type_masks[bid_type] |= bit
+
+            if criteria['min_price'] is None and criteria['max_price'] is None:
+                self.price_free |= bit
+            else:
+                low = criteria['min_price'] if criteria['min_price'] is not None else float('-inf')
+                high = criteria['max_price'] if criteria['max_price'] is not None else float('inf')
+                ranges.append((bit, low, high))
+
+        self.keywords.build()
+        for automaton in self.agencies.values():
+            automaton.build()
+        self._build_price_slots(ranges)
+
+    def _build_price_slots(self, ranges: List[Tuple[int, float, float]]) -> None:
+        """
+        경계값으로 가격 축을 나누고 구간별로 통과하는 검색 마스크 계산
+
+        경계값 k개에 대해 슬롯은 2k+1개: 짝수 슬롯은 경계 사이 구간,
+        홀수 슬롯은 경계값 자체 (범위는 양 끝 포함).
+        """
+        self.price_bounds = sorted({value for _, low, high in ranges for value in (low, high)})
+        slot_count = 2 * len(self.price_bounds) + 1
+        starts = [0] * slot_count
+        ends = [0] * slot_count
+        for bit, low, high in ranges:
+            starts[self._price_slot(low)] |= bit
+            ends[self._price_slot(high)] |= bit
+
+        self.price_slots = []
+        active = 0
+        for slot in range(slot_count):
+            active |= starts[slot]
+            self.price_slots.append(active)
+            active &= ~ends[slot]
+
+    def _price_slot(self, price: float) -> int:
+        position = bisect.bisect_left(self.price_bounds, price)
+        if position < len(self.price_bounds) and self.price_bounds[position] == price:
+            return 2 * position + 1
+        return 2 * position
+
+    def match_mask(self, bid: Dict) -> int:
+        """공고 하나에 대해 조건을 모두 통과하는 검색의 비트마스크"""
+        mask = self.type_masks.get(bid_type_of(bid), 0)
+        if not mask:
+            return 0
+
+        try:
+            price = float(bid.get('presmptPrce'))
+        except (TypeError, ValueError):
+            price = None
+        mask &= self.price_free | (self.price_slots[self._price_slot(price)] if price is not None else 0)
+        if not mask:
+            return 0
+
+        agency_mask = self.agency_free
+        for institution, field in INSTITUTION_FIELDS.items():
+            agency_mask |= self.agencies[institution].scan(bid.get(field) or '')
+        mask &= agency_mask
+        if not mask:
+            return 0
+
+        return mask & (self.keyword_free | self.keywords.scan((bid.get('bidNtceNm') or '').lower()))
+
+    def match(self, bids: Iterable[Dict]) -> List[Tuple[Dict, Dict]]:
+        """배치 전체를 대조해 (저장된 검색, 공고) 목록 반환"""
+        matches = []
+        for bid in bids:
+            mask = self.match_mask(bid)
+            while mask:
+                low_bit = mask & -mask
+                matches.append((self.searches[low_bit.bit_length() - 1], bid))
+                mask ^= low_bit
+        return matches
+
+
+class SavedSearchStore:
+    """저장된 검색 (BidStore와 같은 SQLite DB 사용)"""
+
+    def __init__(self, store: BidStore):
+        self._store = store
+        self._lock = store.lock
+        with self._lock:
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+            self._conn.execute(ALERT_LOG)
+
+    def _migrate(self) -> None:
+        """전송 대상(sink) 열이 없던 alert_log를 옮김"""
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(alert_log)')]
+        if not columns or 'sink' in columns:
+            return
+        with self._store.transaction():
+            self._conn.execute('ALTER TABLE alert_log RENAME TO alert_log_old')
+            self._conn.execute(ALERT_LOG)
+            self._conn.execute('INSERT INTO alert_log (search_id, bid_id, sink, sent_at)'
+                               ' SELECT search_id, bid_id, ?, sent_at FROM alert_log_old', (ALL_SINKS,))
+            self._conn.execute('DROP TABLE alert_log_old')
+
+    @property
+    def _conn(self):
+        return self._store.connection
+
+    @property
+    def version(self) -> Tuple:
+        """저장된 검색 목록이 바뀌면 달라지는 값 (다른 워커 프로세스의 변경 포함)"""
+        with self._lock:
+            return tuple(self._conn.execute('SELECT COUNT(*), MAX(id) FROM saved_searches').fetchone())
+
+    def list(self, owner: Optional[str] = None) -> List[Dict]:
+        query = 'SELECT id, owner, name, criteria, created_at FROM saved_searches'
+        params: Tuple = ()
+        if owner is not None:
+            query += ' WHERE owner = ?'
+            params = (owner,)
+        with self._lock:
+            rows = self._conn.execute(query + ' ORDER BY id', params).fetchall()
+        return [{'id': row['id'], 'owner': row['owner'], 'name': row['name'],
+                 'criteria': json.loads(row['criteria']), 'created_at': row['created_at']} for row in rows]
+
+    def create(self, owner: str, name: str, criteria: Dict) -> Dict:
+        created_at = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT INTO saved_searches (owner, name, criteria, created_at) VALUES (?, ?, ?, ?)',
+                (owner, name, json.dumps(criteria, ensure_ascii=False), created_at)
+            )
+        return {'id': cursor.lastrowid, 'owner': owner, 'name': name, 'criteria': criteria,
+                'created_at': created_at}
+
+    def delete(self, owner: str, search_id: int) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute('DELETE FROM saved_searches WHERE id = ? AND owner = ?',
+                                        (search_id, owner))
+            if cursor.rowcount:
+                self._conn.execute('DELETE FROM alert_log WHERE search_id = ?', (search_id,))
+        return bool(cursor.rowcount)
+
+    def mark_sent(self, pairs: List[Tuple[int, str]], sink: str) -> List[Tuple[int, str]]:
+        """전송 대상 sink에 대한 알림 기록을 남기고, 처음 기록된 (검색 id, 공고 id)만 반환 (중복 제거)"""
+        fresh = []
+        now = time.time()
+        with self._lock, self._conn:
+            for search_id, bid_id in pairs:
+                cursor = self._conn.execute(
+                    'INSERT INTO alert_log (search_id, bid_id, sink, sent_at) SELECT ?, ?, ?, ?'
+                    ' WHERE NOT EXISTS (SELECT 1 FROM alert_log'
+                    '                   WHERE search_id = ? AND bid_id = ? AND sink IN (?, ?))',
+                    (search_id, bid_id, sink, now, search_id, bid_id, sink, ALL_SINKS)
+                )
+                if cursor.rowcount:
+                    fresh.append((search_id, bid_id))
+        return fresh
+
+    def unmark(self, pairs: List[Tuple[int, str]], sink: str) -> None:
+        """sink로 전송에 실패한 알림 기록 취소 (같은 공고가 다시 대조되면 그 대상에만 재전송)"""
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM alert_log WHERE search_id = ? AND bid_id = ? AND sink = ?',
+                                   [(search_id, bid_id, sink) for search_id, bid_id in pairs])
+
+
+class FileSink:
+    """알림을 JSONL 파일에 한 줄씩 추가"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f'file:{path}'
+
+    def send(self, alerts: List[Dict]) -> None:
+        with open(self.path, 'a', encoding='utf-8') as output:
+            for alert in alerts:
+                output.write(json.dumps(alert, ensure_ascii=False) + '\n')
+
+
+class WebhookSink:
+    """알림 묶음을 웹훅 URL로 POST ({"alerts": [...]})"""
+
+    def __init__(self, url: str, timeout: float = ALERT_WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self.name = f'webhook:{url}'
+
+    def send(self, alerts: List[Dict]) -> None:
+        body = json.dumps({'alerts': alerts}, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json; charset=utf-8'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def default_sinks() -> List:
+    """설정(ALERT_FILE, ALERT_WEBHOOK_URL)에 따른 알림 전송 대상"""
+    sinks = []
+    if ALERT_FILE:
+        sinks.append(FileSink(ALERT_FILE))
+    if ALERT_WEBHOOK_URL:
+        sinks.append(WebhookSink(ALERT_WEBHOOK_URL))
+    return sinks
+
+
+class AlertDispatcher:
+    """
+    저장소 리스너: 배치를 저장된 검색과 대조해 알림 전송
+
+    같은 (검색, 공고) 알림은 전송 대상마다 한 번만 보내며(정정 공고 포함), 알림은
+    batch_size개씩 묶어 보낸다. 전송 기록은 대상(sink.name)별로 남기므로 한 대상이
+    실패해도 성공한 대상에는 다시 보내지 않는다.
+    """
+
+    def __init__(self, searches: SavedSearchStore, sinks: Optional[List] = None,
+                 batch_size: int = ALERT_BATCH_SIZE):
+        self.searches = searches
+        self.sinks = default_sinks() if sinks is None else sinks
+        self.batch_size = batch_size
+        self.sent = 0
+        self._matcher: Optional[SearchMatcher] = None
+        self._matcher_version = None
+        self._lock = threading.Lock()
+
+    def matcher(self) -> SearchMatcher:
+        """저장된 검색이 바뀌었을 때만 색인을 다시 컴파일"""
+        with self._lock:
+            version = self.searches.version
+            if self._matcher_version != version or self._matcher is None:
+                self._matcher_version = version
+                self._matcher = SearchMatcher(self.searches.list())
+            return self._matcher
+
+    def __call__(self, batch: IngestBatch) -> int:
+        return self.dispatch(batch.changed)
+
+    def dispatch(self, bids: List[Dict]) -> int:
+        """공고 목록을 대조해 알림 전송, 한 곳 이상에 전송한 알림 수 반환"""
+        matches = self.matcher().match(bids)
+        if not matches or not self.sinks:
+            return 0
+
+        pairs = [(search['id'], bid['id']) for search, bid in matches]
+        delivered = set()
+        for sink in self.sinks:
+            name = getattr(sink, 'name', type(sink).__name__)
+            fresh = set(self.searches.mark_sent(pairs, name))
+            alerts = [
+                {'search_id': search['id'], 'search_name': search['name'], 'owner': search['owner'], 'bid': bid}
+                for search, bid in matches if (search['id'], bid['id']) in fresh
+            ]
+            for start in range(0, len(alerts), self.batch_size):
+                part = alerts[start:start + self.batch_size]
+                keys = [(alert['search_id'], alert['bid']['id']) for alert in part]
+                try:
+                    sink.send(part)
+                    delivered.update(keys)
+                except Exception as e:
+                    logger.warning('알림 전송 실패 (%s): %s', name, e)
+                    self.searches.unmark(keys, name)
+        self.sent += len(delivered)
+        return len(delivered)
+
+
+class AlertQueue:
+    """
+    저장소 리스너: 배치를 큐에 넣고 백그라운드 스레드에서 AlertDispatcher로 전송
+
+    웹 서버의 검색 요청이 저장소에 반영할 때 알림 대조와 웹훅 전송을 기다리지
+    않도록 한다. 스레드는 첫 배치가 들어올 때 시작하므로 워커 프로세스를 fork한
+    뒤에 만들어진다. 큐가 가득 차면 배치를 버리고 로그에 남긴다.
+    """
+
+    def __init__(self, dispatcher: AlertDispatcher, max_pending: int = ALERT_QUEUE_SIZE):
+        self.dispatcher = dispatcher
+        self._queue: 'queue.Queue[List[Dict]]' = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, batch: IngestBatch) -> None:
+        bids = batch.changed
+        if not bids:
+            return
+        self._start()
+        try:
+            self._queue.put_nowait(bids)
+        except queue.Full:
+            logger.warning('알림 대기열이 가득 차 공고 %d건의 알림을 보내지 않음', len(bids))
+
+    def join(self) -> None:
+        """대기 중인 배치를 모두 전송할 때까지 대기"""
+        self._queue.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='alert-queue', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            bids = self._queue.get()
+            try:
+                self.dispatcher.dispatch(bids)
+            except Exception:
+                logger.exception('알림 전송 실패')
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+입찰공고 검색 서비스
+Shared fetch/normalize logic for the web search routes
+"""
+
+import asyncio
+import contextvars
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from bid_filter import BidColumns, BidQuery
+from bid_index import BidIndex, DEFAULT_SORT, DEFAULT_ORDER
+from config import (
+    FETCH_BUFFER_CHUNKS, FETCH_WINDOW_DAYS, FETCH_WORKERS, SEARCH_MAX_PAGES, SEARCH_PAGE_SIZE,
+    SEARCH_MAX_PAGE_SIZE, SEARCH_RESULT_TTL, SEARCH_SINCE_OVERLAP_MINUTES
+)
+from request_timing import span
+
+
+BID_TYPES = ('servc', 'cnstwk', 'thng')
+TYPE_NAMES = {
+    'servc': '용역',
+    'cnstwk': '건설공사',
+    'thng': '물품'
+}
+
+
+def resolve_types(bid_type) -> List[str]:
+    """조회할 입찰 구분 목록 (단일 값, 쉼표 구분 문자열 또는 목록)"""
+    if isinstance(bid_type, str):
+        bid_type = bid_type.split(',')
+    names = [name.strip() for name in bid_type if name and name.strip()]
+    if not names or 'all' in names:
+        return list(BID_TYPES)
+    for name in names:
+        if name not in BID_TYPES:
+            raise ValueError(f'알 수 없는 입찰 구분입니다: {name}')
+    return [name for name in BID_TYPES if name in names]
+
+
+def parse_date_range(start_date: Optional[str], end_date: Optional[str]) -> Tuple[datetime, datetime]:
+    """검색 폼의 날짜(YYYY-MM-DD)를 조회 구간으로 변환"""
+    if start_date:
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+    else:
+        start_dt = datetime.now() - timedelta(days=7)
+
+    if end_date:
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59)
+    else:
+        end_dt = datetime.now()
+
+    return start_dt, end_dt
+
+
+def parse_since(value: Optional[str]) -> Optional[datetime]:
+    """since 파라미터 (이전 응답의 as_of, YYYY-MM-DD HH:MM[:SS])"""
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f'since는 YYYY-MM-DD HH:MM[:SS] 형식이어야 합니다: {value}')
+
+
+def parse_exclude_ids(value) -> List[str]:
+    """exclude_ids 파라미터 (사용자가 삭제한 항목 id - 결과와 count에서 뺌)"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        raise ValueError('exclude_ids는 항목 id 목록이어야 합니다.')
+    return [str(bid_id) for bid_id in value if bid_id]
+
+
+def delta_window(since: datetime, start_dt: datetime, end_dt: datetime) -> Optional[Tuple[datetime, datetime]]:
+    """since 이후 올라왔을 수 있는 공고의 조회 구간 (겹침 포함, 조회할 필요가 없으면 None)"""
+    delta_start = max(start_dt, since - timedelta(minutes=SEARCH_SINCE_OVERLAP_MINUTES))
+    return (delta_start, end_dt) if delta_start <= end_dt else None
+
+
+def as_of(columns: BidColumns) -> str:
+    """결과를 upstream에서 가져온 시각 (다음 검색의 since로 사용)"""
+    return datetime.fromtimestamp(columns.fetched_at).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def page_params(data: Dict) -> Tuple[Optional[int], Optional[str], str, str]:
+    """요청의 페이지/정렬 파라미터 (limit, cursor, sort, order)"""
+    limit = data.get('limit')
+    cursor = data.get('cursor')
+    sort = data.get('sort', DEFAULT_SORT)
+    order = data.get('order', DEFAULT_ORDER)
+
+    if limit is not None and limit != '':
+        limit = int(limit)
+        if not 1 <= limit <= SEARCH_MAX_PAGE_SIZE:
+            raise ValueError(f'limit은 1~{SEARCH_MAX_PAGE_SIZE} 사이여야 합니다.')
+    elif cursor:
+        limit = SEARCH_PAGE_SIZE
+    else:
+        limit = None
+
+    return limit, cursor, sort, order
+
+
+def search_params(data: Dict) -> Tuple[List[str], datetime, datetime, BidQuery]:
+    """요청의 검색 조건 (입찰 구분 목록, 시작/종료 일시, 필터 조건)"""
+    types = resolve_types(data.get('bid_types') or data.get('bid_type', 'all'))
+    start_dt, end_dt = parse_date_range(data.get('start_date'), data.get('end_date'))
+    return types, start_dt, end_dt, BidQuery.from_request(data, types)
+
+
+def fetch_key(data: Dict, types: List[str]) -> Tuple:
+    """upstream 조회 범위 키 (입찰 구분, 요청한 기간)"""
+    return frozenset(types), data.get('start_date') or '', data.get('end_date') or ''
+
+
+def reusable_columns(columns: Optional[BidColumns], key: Tuple) -> bool:
+    """
+    이미 가져온 결과로 요청을 처리할 수 있는지 여부
+
+    같은 기간을 조회했고 요청한 입찰 구분을 모두 포함하며, 가져온 지
+    SEARCH_RESULT_TTL초가 지나지 않았으면 필터만 다시 적용한다.
+    """
+    if columns is None or columns.fetch_key is None:
+        return False
+    if time.time() - columns.fetched_at > SEARCH_RESULT_TTL:
+        return False
+    types, start_date, end_date = key
+    fetched_types, fetched_start, fetched_end = columns.fetch_key
+    return types <= fetched_types and (start_date, end_date) == (fetched_start, fetched_end)
+
+
+def search_page(index: BidIndex,
+                limit: Optional[int],
+                cursor: Optional[str],
+                sort: str,
+                order: str) -> Dict:
+    """검색 결과의 한 페이지 응답 본문 (limit이 없으면 전체)"""
+    with span('sort'):
+        if limit is None:
+            items, next_cursor = list(index.ordered(sort, order)), None
+        else:
+            items, next_cursor = index.page(limit, cursor, sort, order)
+
+    return {
+        'success': True,
+        'data': items,
+        'count': len(index),
+        'result_id': index.result_id,
+        'next_cursor': next_cursor
+    }
+
+
+def normalize_bid(type_name: str, item: Dict) -> Dict:
+    """API 응답 항목을 웹 응답 형식으로 가공"""
+    return {
+        'id': f"{type_name}_{item.get('bidNtceNo') or ''}",
+        'bidType': TYPE_NAMES.get(type_name, type_name),
+        'bidNtceNo': item.get('bidNtceNo') or '',
+        'bidNtceNm': item.get('bidNtceNm') or '',
+        'dminsttNm': item.get('dminsttNm') or '',
+        'bidNtceDt': item.get('bidNtceDt') or '',
+        'bidClseDt': item.get('bidClseDt') or '',
+        'presmptPrce': item.get('presmptPrce') or '',
+        'bidNtceUrl': item.get('bidNtceUrl') or '',
+        'ntceInsttNm': item.get('ntceInsttNm') or '',
+    }
+
+
+def page_chunk(type_name: str, page_no: int, result: Dict, query: Optional[BidQuery] = None) -> Dict:
+    """
+    페이지 응답 하나를 검색 청크로 변환 (query가 있으면 조건에 맞는 항목만)
+
+    Returns:
+        {'bid_type', 'page', 'items', 'total', 'error'}
+    """
+    chunk = {'bid_type': type_name, 'page': page_no, 'items': [], 'total': 0, 'error': None}
+
+    if not result or 'response' not in result:
+        chunk['error'] = (result or {}).get('error', '응답이 없습니다.')
+        return chunk
+
+    header = result['response'].get('header', {})
+    if header.get('resultCode') != '00':
+        chunk['error'] = header.get('resultMsg') or f"resultCode {header.get('resultCode')}"
+        return chunk
+
+    body = result['response'].get('body', {})
+    try:
+        chunk['total'] = int(body.get('totalCount', 0))
+    except (TypeError, ValueError):
+        pass
+
+    with span('reshape'):
+        chunk['items'] = [normalize_bid(type_name, item) for item in body.get('items', [])]
+    if query is not None:
+        with span('filter'):
+            chunk['items'] = query.filter(chunk['items'])
+    return chunk
+
+
+def mark_truncated(chunk: Dict, max_pages: Optional[int], num_of_rows: int = 100) -> Dict:
+    """max_pages로 잘려 전체 건수(total)를 다 받지 못하는 청크면 'truncated' 표시"""
+    chunk['truncated'] = bool(max_pages) and chunk['total'] > max_pages * num_of_rows
+    return chunk
+
+
+def iter_search_chunks(client,
+                       types: List[str],
+                       start_dt: datetime,
+                       end_dt: datetime,
+                       query: Optional[BidQuery] = None,
+                       max_pages: int = SEARCH_MAX_PAGES) -> Iterator[Dict]:
+    """
+    입찰 구분별로 병렬 조회하며 페이지가 도착하는 순서대로 청크를 yield
+
+    구분별로 max_pages 페이지까지만 조회하며, 전체 건수가 그보다 많으면
+    청크에 'truncated'가 표시된다. 소비자가 중간에 순회를 멈추면 남은
+    페이지 조회도 중단된다.
+    """
+    chunks: 'queue.Queue[Optional[Dict]]' = queue.Queue()
+    stopped = threading.Event()
+
+    def fetch_type(type_name: str) -> None:
+        try:
+            pages = client.iter_bid_pages(
+                bid_type=type_name,
+                start_date=start_dt,
+                end_date=end_dt,
+                num_of_rows=100,
+                max_pages=max_pages
+            )
+            for page_no, result in enumerate(pages, 1):
+                if stopped.is_set():
+                    return
+                chunks.put(mark_truncated(page_chunk(type_name, page_no, result, query), max_pages))
+        except Exception as e:
+            chunks.put({'bid_type': type_name, 'page': 0, 'items': [], 'total': 0, 'error': str(e)})
+        finally:
+            chunks.put(None)
+
+    with ThreadPoolExecutor(max_workers=len(types)) as pool:
+        for type_name in types:
+            # 요청 단계 시간(request_timing)이 조회 스레드에서도 기록되도록 컨텍스트를 넘김
+            pool.submit(contextvars.copy_context().run, fetch_type, type_name)
+
+        try:
+            remaining = len(types)
+            while remaining:
+                chunk = chunks.get()
+                if chunk is None:
+                    remaining -= 1
+                    continue
+                yield chunk
+        finally:
+            stopped.set()
+
+
+def date_windows(start_dt: datetime, end_dt: datetime, days: int = FETCH_WINDOW_DAYS):
+    """조회 기간을 days일 단위 구간으로 분할 (구간끼리 겹치지 않도록 1분 간격)"""
+    window_start = start_dt
+    while window_start <= end_dt:
+        window_end = min(window_start + timedelta(days=days) - timedelta(minutes=1), end_dt)
+        yield window_start, window_end
+        window_start = window_end + timedelta(minutes=1)
+
+
+def iter_range_chunks(client,
+                      types: List[str],
+                      start_dt: datetime,
+                      end_dt: datetime,
+                      query: Optional[BidQuery] = None,
+                      window_days: int = FETCH_WINDOW_DAYS,
+                      workers: int = FETCH_WORKERS,
+                      max_pages: Optional[int] = None,
+                      parser=None) -> Iterator[Dict]:
+    """
+    긴 기간을 (구간, 입찰 구분) 작업으로 나눠 workers개 스레드에서 병렬 조회
+
+    iter_search_chunks와 같은 청크에 'window'(구간 시작일)가 더해진다. 청크 큐의
+    크기를 FETCH_BUFFER_CHUNKS로 제한하므로 소비자가 느리면 조회도 기다리고,
+    기간 길이와 관계없이 메모리 사용량이 일정하다. parser(page_parser.ParserPool)를
+    주면 응답 해석을 프로세스 풀에 맡긴다.
+    """
+    tasks = [(window_start, window_end, type_name)
+             for window_start, window_end in date_windows(start_dt, end_dt, window_days)
+             for type_name in types]
+    chunks: 'queue.Queue[Optional[Dict]]' = queue.Queue(maxsize=FETCH_BUFFER_CHUNKS)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch_window(window_start: datetime, window_end: datetime, type_name: str) -> None:
+        window = f'{window_start:%Y-%m-%d}'
+        if stopped.is_set():
+            return
+        try:
+            if parser is not None:
+                pages = parser.iter_pages(client, type_name, window_start, window_end, max_pages)
+            else:
+                pages = (page_chunk(type_name, page_no, result) for page_no, result in enumerate(
+                    client.iter_bid_pages(
+                        bid_type=type_name,
+                        start_date=window_start,
+                        end_date=window_end,
+                        num_of_rows=100,
+                        max_pages=max_pages
+                    ), 1))
+            for chunk in pages:
+                if query is not None and chunk['items']:
+                    with span('filter'):
+                        chunk['items'] = query.filter(chunk['items'])
+                if not put({**chunk, 'window': window}):
+                    return
+        except Exception as e:
+            put({'bid_type': type_name, 'page': 0, 'items': [], 'total': 0, 'error': str(e), 'window': window})
+        finally:
+            put(None)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for task in tasks:
+            pool.submit(contextvars.copy_context().run, fetch_window, *task)
+
+        try:
+            remaining = len(tasks)
+            while remaining:
+                chunk = chunks.get()
+                if chunk is None:
+                    remaining -= 1
+                    continue
+                yield chunk
+        finally:
+            # 소비자가 중간에 멈추면 시작하지 않은 작업은 취소
+            stopped.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_search_chunks(client,
+                              types: List[str],
+                              start_dt: datetime,
+                              end_dt: datetime,
+                              query: Optional[BidQuery] = None,
+                              max_pages: int = SEARCH_MAX_PAGES) -> AsyncIterator[Dict]:
+    """
+    iter_search_chunks의 asyncio 버전 (AsyncG2BClient 사용)
+
+    소비자가 중간에 순회를 멈추면 진행 중인 조회 태스크를 취소한다.
+    """
+    chunks: 'asyncio.Queue[Optional[Dict]]' = asyncio.Queue()
+
+    async def fetch_type(type_name: str) -> None:
+        try:
+            page_no = 0
+            async for result in client.iter_bid_pages(
+                bid_type=type_name,
+                start_date=start_dt,
+                end_date=end_dt,
+                num_of_rows=100,
+                max_pages=max_pages
+            ):
+                page_no += 1
+                await chunks.put(mark_truncated(page_chunk(type_name, page_no, result, query), max_pages))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await chunks.put({'bid_type': type_name, 'page': 0, 'items': [], 'total': 0, 'error': str(e)})
+        finally:
+            chunks.put_nowait(None)
+
+    tasks = [asyncio.create_task(fetch_type(type_name)) for type_name in types]
+    try:
+        remaining = len(types)
+        while remaining:
+            chunk = await chunks.get()
+            if chunk is None:
+                remaining -= 1
+                continue
+            yield chunk
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def export_bids(index: BidIndex, selected_ids: List[str]) -> Optional[Iterator[Dict]]:
+    """내보낼 항목을 지연 순회 (선택 항목이 없으면 전체), 내보낼 항목이 없으면 None"""
+    if selected_ids:
+        if not any(bid_id in index for bid_id in selected_ids):
+            return None
+        return index.iter_many(selected_ids)
+    if not len(index):
+        return None
+    return index.ordered()
+
+
+class SearchSummary:
+    """청크를 누적해 구분별 건수와 오류를 요약"""
+
+    def __init__(self):
+        self.by_type: Dict[str, int] = {}
+        self.errors: List[Dict] = []
+        self.truncated_types: List[str] = []
+
+    def add(self, chunk: Dict) -> None:
+        self.by_type[chunk['bid_type']] = self.by_type.get(chunk['bid_type'], 0) + len(chunk['items'])
+        if chunk['error']:
+            self.errors.append({'bid_type': chunk['bid_type'], 'page': chunk['page'], 'error': chunk['error']})
+        if chunk.get('truncated') and chunk['bid_type'] not in self.truncated_types:
+            self.truncated_types.append(chunk['bid_type'])
+
+    def restore(self, columns: BidColumns) -> None:
+        """재사용하는 결과를 가져올 때의 오류와 잘린 입찰 구분을 다시 보고"""
+        self.errors = list(columns.errors)
+        self.truncated_types = list(columns.truncated_types)
+
+    @property
+    def truncated(self) -> bool:
+        """조회 페이지 한도로 일부 공고를 받지 못했는지"""
+        return bool(self.truncated_types)
+
+    def to_dict(self) -> Dict:
+        return {'by_type': self.by_type, 'errors': self.errors,
+                'truncated': self.truncated, 'truncated_types': self.truncated_types}
+
+
+class SearchStream:
+    """스트리밍 검색 응답 인코더 (검색 청크 → NDJSON/SSE 이벤트)"""
+
+    def __init__(self, limit: Optional[int] = None, sse: bool = False):
+        self.limit = limit
+        self.sse = sse
+        self.summary = SearchSummary()
+        self._sent = 0
+
+    @property
+    def mimetype(self) -> str:
+        return 'text/event-stream' if self.sse else 'application/x-ndjson'
+
+    def encode(self, event: str, payload: Dict) -> str:
+        if self.sse:
+            return f'event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n'
+        return json.dumps({'event': event, **payload}, ensure_ascii=False) + '\n'
+
+    def chunk_event(self, chunk: Dict) -> str:
+        """청크를 누적하고 chunk 또는 error 이벤트로 인코딩"""
+        self.summary.add(chunk)
+
+        if chunk['error']:
+            return self.encode('error', {'bid_type': chunk['bid_type'], 'page': chunk['page'],
+                                         'error': chunk['error']})
+
+        # limit이 있으면 화면 첫 페이지 분량까지만 행을 전송
+        items = chunk['items']
+        if self.limit is not None:
+            items = items[:max(0, self.limit - self._sent)]
+        self._sent += len(items)
+
+        return self.encode('chunk', {'bid_type': chunk['bid_type'], 'page': chunk['page'],
+                                     'total': chunk['total'], 'items': items})
+
+    def failure_event(self, error: Exception) -> str:
+        """검색이 중간에 실패했을 때 summary 대신 보내는 마지막 error 이벤트 (fatal)"""
+        return self.encode('error', {'fatal': True, 'error': str(error)})
+
+    def summary_event(self, index: BidIndex, sort: str, order: str, columns: Optional[BidColumns] = None) -> str:
+        """누적된 결과로 만든 인덱스의 summary 이벤트 (columns를 주면 조회 시각 as_of 포함)"""
+        result = {**self.summary.to_dict(), 'result_id': index.result_id, 'count': len(index)}
+        if columns is not None:
+            result['as_of'] = as_of(columns)
+        if self.limit is not None:
+            page, next_cursor = index.page(self.limit, None, sort, order)
+            result.update({'data': page, 'next_cursor': next_cursor})
+        return self.encode('summary', result)
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+프로세스 간 공유 캐시
+SQLite-backed cache, single-flight and rate limiter shared by server workers
+
+운영 모드에서는 웹 서버가 여러 워커 프로세스로 실행되므로, upstream 응답
+캐시와 요청 속도 제한, 검색 결과(result_id) 보관을 프로세스 메모리가 아니라
+같은 SQLite 파일(WAL 모드)에 둔다. 워커를 늘려도 같은 조회는 한 번만
+upstream으로 나가고, 어느 워커가 요청을 받아도 같은 검색 결과를 이어서 조회한다.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import metrics
+from bid_index import BidIndex
+from config import (
+    CACHE_PATH, CACHE_PURGE_INTERVAL, RESULT_SET_TTL, RESULT_SET_LOCAL_SIZE, RESULT_SET_SHARED_MAX_ROWS,
+    RESULT_SET_SHARED_WAIT
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# 다른 프로세스가 조회 중일 때 결과를 기다리는 간격 (초)
+POLL_INTERVAL = 0.05
+
+logger = logging.getLogger('g2b.results')
+
+
+def _lease_owner() -> str:
+    return f'{os.getpid()}:{threading.get_ident()}'
+
+
+def cache_key(*parts: Any) -> str:
+    """캐시 키 (값들의 JSON 해시)"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class SharedCache:
+    """
+    SQLite 공유 캐시
+
+    연결은 스레드/프로세스마다 따로 열어 쓴다 (fork 이전에 만든 연결은
+    자식 프로세스에서 쓰지 않는다).
+    """
+
+    def __init__(self, path: str = CACHE_PATH, purge_interval: float = CACHE_PURGE_INTERVAL):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._purged_at = time.monotonic()
+        self._local = threading.local()
+        # 같은 프로세스 안에서 같은 키를 조회 중인 스레드끼리 합치기 위한 키별 잠금 ([잠금, 사용 중인 스레드 수])
+        self._key_locks: Dict[str, list] = {}
+        self._key_locks_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        쓰기 트랜잭션 (BEGIN IMMEDIATE) - 안에서 부르는 get/scan/set은 같은 스레드 연결을 쓰므로
+        다른 워커의 쓰기와 겹치지 않게 읽고 쓸 수 있다.
+        """
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._conn().execute('INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                             (key, value, time.time() + ttl))
+        self._maybe_purge()
+
+    def _maybe_purge(self) -> None:
+        """purge_interval초마다 만료된 항목 삭제 (지우지 않으면 파일이 계속 커짐)"""
+        now = time.monotonic()
+        if now - self._purged_at < self.purge_interval:
+            return
+        self._purged_at = now
+        try:
+            self.purge_expired()
+        except sqlite3.Error:
+            # 다른 워커가 쓰는 중이면 다음 주기에 다시 시도
+            logger.warning('만료된 공유 캐시 항목 삭제 실패', exc_info=True)
+
+    def scan(self, prefix: str) -> Dict[str, bytes]:
+        """접두어로 시작하는 만료되지 않은 키와 값"""
+        rows = self._conn().execute('SELECT key, value FROM cache WHERE key >= ? AND key < ? AND expires_at > ?',
+                                    (prefix, prefix + '\uffff', time.time()))
+        return dict(rows.fetchall())
+
+    def delete(self, key: str) -> None:
+        self._conn().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        conn = self._conn()
+        removed = conn.execute('DELETE FROM cache WHERE expires_at <= ?', (now,)).rowcount
+        conn.execute('DELETE FROM leases WHERE expires_at <= ?', (now,))
+        return removed
+
+    def try_lease(self, key: str, seconds: float, owner: Optional[str] = None) -> bool:
+        """키에 대한 조회 권한(임대) 획득 시도 - 한 프로세스만 성공 (owner 기본: 프로세스:스레드)"""
+        now = time.time()
+        conn = self._conn()
+        conn.execute('DELETE FROM leases WHERE key = ? AND expires_at <= ?', (key, now))
+        cursor = conn.execute('INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)',
+                              (key, owner or _lease_owner(), now + seconds))
+        return cursor.rowcount == 1
+
+    def release_lease(self, key: str, owner: Optional[str] = None) -> None:
+        self._conn().execute('DELETE FROM leases WHERE key = ? AND owner = ?',
+                             (key, owner or _lease_owner()))
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        """키별 잠금 - 다른 키의 compute()를 기다리지 않도록, 쓰는 스레드가 없으면 지운다"""
+        with self._key_locks_lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._key_locks_lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def single_flight(self,
+                      key: str,
+                      compute: Callable[[], Any],
+                      ttl: float,
+                      cacheable: Callable[[Any], bool] = lambda value: True,
+                      lease_seconds: float = 60) -> Any:
+        """
+        캐시된 값이 있으면 반환하고, 없으면 한 곳에서만 compute()를 실행
+
+        같은 프로세스의 다른 스레드는 잠금에서, 다른 프로세스는 임대가
+        풀리거나 값이 저장될 때까지 기다렸다가 저장된 값을 쓴다.
+        값은 JSON으로 저장한다.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.stats['hits'] += 1
+            return json.loads(cached)
+
+        with self._key_lock(key):
+            cached = self.get(key)
+            if cached is not None:
+                self.stats['coalesced'] += 1
+                return json.loads(cached)
+
+            deadline = time.time() + lease_seconds
+            while not self.try_lease(key, lease_seconds):
+                time.sleep(POLL_INTERVAL)
+                cached = self.get(key)
+                if cached is not None:
+                    self.stats['coalesced'] += 1
+                    return json.loads(cached)
+                if time.time() > deadline:
+                    break
+
+            self.stats['misses'] += 1
+            try:
+                value = compute()
+                if cacheable(value):
+                    self.set(key, json.dumps(value, ensure_ascii=False).encode('utf-8'), ttl)
+                return value
+            finally:
+                self.release_lease(key)
+
+    async def async_single_flight(self,
+                                  key: str,
+                                  compute: Callable[[], Awaitable[Any]],
+                                  ttl: float,
+                                  cacheable: Callable[[Any], bool] = lambda value: True,
+                                  lease_seconds: float = 60) -> Any:
+        """
+        single_flight의 asyncio 버전 (같은 이벤트 루프의 요청은 Future로 합침)
+
+        SQLite 조회/임대/저장은 다른 워커와 잠금을 다툴 수 있으므로 스레드에서 실행한다.
+        """
+        cached = await asyncio.to_thread(self.get, key)
+        if cached is not None:
+            self.stats['hits'] += 1
+            return json.loads(cached)
+
+        if key in self._inflight:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._async_fill(key, compute, ttl, cacheable, lease_seconds)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없을 때 경고가 나지 않도록 예외를 확인 처리
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _async_fill(self, key, compute, ttl, cacheable, lease_seconds) -> Any:
+        # 임대와 반납이 서로 다른 스레드에서 실행될 수 있으므로 임대마다 소유자를 정해 둠
+        owner = f'{os.getpid()}:{uuid.uuid4().hex}'
+        deadline = time.time() + lease_seconds
+        while not await asyncio.to_thread(self.try_lease, key, lease_seconds, owner):
+            await asyncio.sleep(POLL_INTERVAL)
+            cached = await asyncio.to_thread(self.get, key)
+            if cached is not None:
+                self.stats['coalesced'] += 1
+                return json.loads(cached)
+            if time.time() > deadline:
+                break
+
+        self.stats['misses'] += 1
+        try:
+            value = await compute()
+            if cacheable(value):
+                await asyncio.to_thread(self.set, key, json.dumps(value, ensure_ascii=False).encode('utf-8'), ttl)
+            return value
+        finally:
+            await asyncio.to_thread(self.release_lease, key, owner)
+
+
+class RateLimiter:
+    """
+    워커 프로세스 전체에 걸친 토큰 버킷 속도 제한
+
+    reserve()는 토큰 하나를 예약하고 기다려야 할 시간(초)을 돌려주므로
+    동기 코드는 time.sleep, 비동기 코드는 asyncio.sleep으로 기다린다.
+    """
+
+    def __init__(self, cache: SharedCache, name: str, rate: float, burst: int):
+        self.cache = cache
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        conn = self.cache._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated_at FROM buckets WHERE name = ?', (self.name,)).fetchone()
+            tokens = self.burst if row is None else min(self.burst, row[0] + (now - row[1]) * self.rate)
+            tokens -= 1
+            conn.execute('INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)',
+                         (self.name, tokens, now))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return max(0.0, -tokens / self.rate)
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def async_acquire(self) -> None:
+        # reserve()는 BEGIN IMMEDIATE로 다른 워커를 기다릴 수 있으므로 스레드에서 실행
+        delay = await asyncio.to_thread(self.reserve)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class ResultStore:
+    """
+    검색 결과(result_id별 BidIndex) 보관
+
+    최근 결과는 프로세스 메모리(LRU)에 두고, 공유 캐시에는 압축한 JSON을
+    저장해 다른 워커가 같은 result_id를 받으면 불러와 인덱스를 다시 만든다.
+    결과가 바뀔 때마다(삭제) 버전을 올려, 다른 워커의 메모리 사본은 버전이
+    다르면 다시 불러온다. cache가 없으면 프로세스 안에서만 보관한다.
+
+    요청 중에는 버전만 기록하고, 직렬화·압축과 본문 기록은 백그라운드
+    스레드에서 한다. 본문에도 버전을 붙여 두어 다른 워커는 같은 버전의
+    본문이 기록될 때까지 잠시 기다린다. max_shared_rows보다 큰 결과는
+    공유하지 않는다 (다른 워커에서는 만료된 결과로 보임).
+    """
+
+    def __init__(self,
+                 cache: Optional[SharedCache] = None,
+                 ttl: float = RESULT_SET_TTL,
+                 local_size: int = RESULT_SET_LOCAL_SIZE,
+                 max_shared_rows: int = RESULT_SET_SHARED_MAX_ROWS,
+                 wait_seconds: float = RESULT_SET_SHARED_WAIT):
+        self.cache = cache
+        self.ttl = ttl
+        self.local_size = local_size
+        self.max_shared_rows = max_shared_rows
+        self.wait_seconds = wait_seconds
+        self._local: 'OrderedDict[str, Tuple[BidIndex, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+        # 기록 순서를 지키도록 스레드 하나로 (fork 뒤 첫 기록 때 생성됨)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='result-store')
+
+    def put(self, index: BidIndex) -> BidIndex:
+        """새 검색 결과 등록"""
+        self._remember(index)
+        self.save(index)
+        return index
+
+    def save(self, index: BidIndex) -> None:
+        """결과가 바뀌었을 때(삭제 등) 공유 캐시 갱신 (본문은 백그라운드에서 기록)"""
+        if self.cache is None:
+            return
+        if len(index) > self.max_shared_rows:
+            self.cache.delete(f'result-version:{index.result_id}')
+            self._remember(index)
+            return
+        version = uuid.uuid4().hex.encode('ascii')
+        self.cache.set(f'result-version:{index.result_id}', version, self.ttl)
+        self._remember(index, version)
+        self._writer.submit(self._write, index, version)
+
+    def _write(self, index: BidIndex, version: bytes) -> None:
+        try:
+            payload = json.dumps(list(index.ordered()), ensure_ascii=False).encode('utf-8')
+            self.cache.set(f'result:{index.result_id}', version + b':' + zlib.compress(payload, 1), self.ttl)
+        except Exception:
+            logger.exception('검색 결과 %s 공유 캐시 기록 실패', index.result_id)
+
+    def flush(self) -> None:
+        """대기 중인 공유 캐시 기록이 끝날 때까지 대기"""
+        self._writer.submit(lambda: None).result()
+
+    def get(self, result_id: Optional[str]) -> Optional[BidIndex]:
+        """result_id의 결과 (result_id가 없거나 만료되었으면 None)"""
+        if not result_id:
+            return None
+        version = self.cache.get(f'result-version:{result_id}') if self.cache is not None else None
+        with self._lock:
+            entry = self._local.get(result_id)
+            if entry is not None and (self.cache is None or entry[1] == version):
+                self._local.move_to_end(result_id)
+                metrics.RESULT_STORE_LOOKUPS.inc('local')
+                return entry[0]
+        payload = self._shared_payload(result_id, version) if version is not None else None
+        if payload is None:
+            metrics.RESULT_STORE_LOOKUPS.inc('expired')
+            return None
+        index = BidIndex(json.loads(zlib.decompress(payload)), result_id=result_id)
+        self._remember(index, version)
+        metrics.RESULT_STORE_LOOKUPS.inc('shared')
+        return index
+
+    def _shared_payload(self, result_id: str, version: bytes) -> Optional[bytes]:
+        """version의 본문 (다른 워커가 아직 기록 중이면 wait_seconds까지 대기)"""
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            payload = self.cache.get(f'result:{result_id}')
+            if payload is not None and payload.startswith(version + b':'):
+                return payload[len(version) + 1:]
+            if time.monotonic() >= deadline or self.cache.get(f'result-version:{result_id}') != version:
+                return None
+            time.sleep(POLL_INTERVAL)
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    def memory_bytes(self) -> int:
+        """메모리에 보관 중인 검색 결과의 대략적인 크기"""
+        with self._lock:
+            indexes = [index for index, _ in self._local.values()]
+        return sum(index.memory_bytes() for index in indexes)
+
+    def _remember(self, index: BidIndex, version: Optional[bytes] = None) -> None:
+        with self._lock:
+            self._local[index.result_id] = (index, version)
+            self._local.move_to_end(index.result_id)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
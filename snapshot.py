@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+GitHub Pages용 정적 데이터 스냅샷
+Build compressed per-day, per-bid-type JSON shards plus a manifest and an agency index for static hosting
+
+빌드할 때 upstream을 한 번 조회해 (입찰 구분, 날짜)별 파일로 나눠 두면, 정적 페이지
+(index.html)는 검색 기간에 필요한 파일만 받아 표시한다. 방문자마다 upstream이나
+CORS 프록시를 거치지 않는다.
+
+    snapshots/
+    ├── manifest.json              # 생성 시각, 날짜별·입찰 구분별 건수/파일 크기/해시
+    ├── agencies.json              # 수요기관명과 공고 수 (많은 순)
+    └── servc/2025-03-01.json.gz   # {"count": n, "columns": {필드: [값, ...]}}
+
+- 파일은 열 단위 문자열 배열이라(index.html의 응답 해석 결과와 같은 모양) 작고 바로 행으로 바꿀 수 있다.
+- 같은 내용이면 같은 바이트가 되도록 gzip 시각을 0으로 고정하고, 목록에 내용 해시를 남긴다
+  (페이지는 해시를 붙여 요청하므로 바뀐 파일만 다시 받는다).
+- 이미 있는 파일 중 최근 refresh_days일보다 오래된 날짜는 다시 조회하지 않는다
+  (CI에서 이전 실행의 파일을 캐시로 이어받으면 매번 최근 며칠만 조회).
+- 조회에 실패한 (입찰 구분, 날짜)는 이전 파일이 있으면 그대로 두고, 없으면 목록에서 빠진다
+  (페이지는 목록에 없는 날짜가 섞인 검색을 실시간 조회로 처리).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from config import FETCH_WORKERS, SNAPSHOT_DAYS, SNAPSHOT_DIR, SNAPSHOT_REFRESH_DAYS
+
+FIELDS = ('bidNtceNo', 'bidNtceNm', 'dminsttNm', 'bidNtceDt', 'bidClseDt',
+          'presmptPrce', 'bidNtceDtlUrl', 'bidNtceUrl', 'ntceInsttNm')
+MANIFEST = 'manifest.json'
+AGENCIES = 'agencies.json'
+VERSION = 1
+
+
+def shard_path(bid_type: str, day: date) -> str:
+    """스냅샷 디렉터리 안의 파일 경로 (목록과 페이지가 함께 씀)"""
+    return f'{bid_type}/{day:%Y-%m-%d}.json.gz'
+
+
+def encode_shard(items: List[Dict]) -> bytes:
+    """항목들을 열 단위 gzip JSON으로 (같은 항목이면 같은 바이트)"""
+    columns = {field: [str(item.get(field) or '') for item in items] for field in FIELDS}
+    payload = json.dumps({'count': len(items), 'columns': columns}, ensure_ascii=False, separators=(',', ':'))
+    return gzip.compress(payload.encode('utf-8'), mtime=0)
+
+
+def decode_shard(data: bytes) -> Dict:
+    return json.loads(gzip.decompress(data))
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f'{path}.tmp'
+    with open(temp, 'wb') as f:
+        f.write(data)
+    os.replace(temp, path)
+
+
+class SnapshotBuilder:
+    """
+    스냅샷 생성
+
+    Args:
+        client: G2BClient (속도 제한은 클라이언트의 rate_limiter를 따름)
+        out_dir: 스냅샷 디렉터리
+        end_day: 마지막 날짜 (기본: 오늘), 그로부터 days일
+        refresh_days: 파일이 있어도 다시 조회할 최근 일수
+    """
+
+    def __init__(self,
+                 client,
+                 types: List[str],
+                 out_dir: str = SNAPSHOT_DIR,
+                 days: int = SNAPSHOT_DAYS,
+                 end_day: Optional[date] = None,
+                 refresh_days: int = SNAPSHOT_REFRESH_DAYS,
+                 workers: int = FETCH_WORKERS):
+        if days < 1:
+            raise ValueError('스냅샷 기간은 1일 이상이어야 합니다.')
+        self.client = client
+        self.types = types
+        self.out_dir = out_dir
+        self.end_day = end_day or date.today()
+        self.days = [self.end_day - timedelta(days=offset) for offset in range(days)]
+        self.refresh_from = self.end_day - timedelta(days=max(refresh_days, 1) - 1)
+        self.workers = workers
+        self._lock = threading.Lock()
+        self.errors: List[str] = []
+        self.fetched = 0
+        self.reused = 0
+
+    def build(self) -> Dict:
+        """스냅샷을 만들고 목록(manifest) 반환"""
+        previous = self._load_manifest()
+        tasks = [(bid_type, day) for day in self.days for bid_type in self.types]
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            entries = list(pool.map(lambda task: self._shard(*task, previous), tasks))
+
+        manifest_days: Dict[str, Dict] = {}
+        agencies: Counter = Counter()
+        for (bid_type, day), entry in zip(tasks, entries):
+            if entry is None:
+                continue
+            manifest_days.setdefault(f'{day:%Y-%m-%d}', {})[bid_type] = entry[0]
+            agencies.update(entry[1])
+
+        self._prune()
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        manifest = {
+            'version': VERSION,
+            'generated_at': now,
+            'start': f'{self.days[-1]:%Y-%m-%d}',
+            'end': f'{self.end_day:%Y-%m-%d}',
+            'types': self.types,
+            'fields': list(FIELDS),
+            'agencies': AGENCIES,
+            'days': dict(sorted(manifest_days.items())),
+        }
+        agency_list = sorted(agencies.items(), key=lambda pair: (-pair[1], pair[0]))
+        _write_atomic(os.path.join(self.out_dir, AGENCIES),
+                      json.dumps({'generated_at': now, 'agencies': agency_list},
+                                 ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        _write_atomic(os.path.join(self.out_dir, MANIFEST),
+                      json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+        return manifest
+
+    def _shard(self, bid_type: str, day: date, previous: Dict) -> Optional[Tuple[Dict, Counter]]:
+        """(입찰 구분, 날짜) 파일 하나를 만들거나 재사용해 (목록 항목, 기관별 공고 수) 반환"""
+        path = os.path.join(self.out_dir, shard_path(bid_type, day))
+        old_entry = previous.get(f'{day:%Y-%m-%d}', {}).get(bid_type)
+        if day < self.refresh_from and old_entry and os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            with self._lock:
+                self.reused += 1
+            return old_entry, self._agencies(decode_shard(data)['columns'])
+
+        try:
+            items = self._fetch_day(bid_type, day)
+        except Exception as e:
+            with self._lock:
+                self.errors.append(f'{day:%Y-%m-%d} {bid_type}: {e}')
+            if old_entry and os.path.exists(path):
+                with open(path, 'rb') as f:
+                    return old_entry, self._agencies(decode_shard(f.read())['columns'])
+            return None
+
+        data = encode_shard(items)
+        digest = hashlib.sha1(data).hexdigest()[:12]
+        if not old_entry or old_entry.get('hash') != digest or not os.path.exists(path):
+            _write_atomic(path, data)
+        with self._lock:
+            self.fetched += 1
+        entry = {'count': len(items), 'bytes': len(data), 'hash': digest,
+                 'fetched_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        return entry, Counter(name for name in (item.get('dminsttNm') for item in items) if name)
+
+    def _fetch_day(self, bid_type: str, day: date) -> List[Dict]:
+        """하루치 공고 전체 (오류 응답이면 예외)"""
+        start = datetime.combine(day, datetime.min.time())
+        items: List[Dict] = []
+        for result in self.client.iter_bid_pages(bid_type=bid_type, start_date=start,
+                                                 end_date=start + timedelta(hours=23, minutes=59),
+                                                 num_of_rows=100):
+            if not result or 'response' not in result:
+                raise RuntimeError((result or {}).get('error', '응답이 없습니다.'))
+            header = result['response'].get('header', {})
+            if header.get('resultCode') != '00':
+                raise RuntimeError(header.get('resultMsg') or f"resultCode {header.get('resultCode')}")
+            items.extend(result['response'].get('body', {}).get('items', []))
+        return items
+
+    @staticmethod
+    def _agencies(columns: Dict[str, List[str]]) -> Counter:
+        return Counter(name for name in columns.get('dminsttNm', []) if name)
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(os.path.join(self.out_dir, MANIFEST), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('version') != VERSION:
+            return {}
+        return manifest.get('days', {})
+
+    def _prune(self) -> None:
+        """기간에서 벗어난 날짜의 파일 삭제"""
+        keep = {f'{day:%Y-%m-%d}.json.gz' for day in self.days}
+        for bid_type in os.listdir(self.out_dir) if os.path.isdir(self.out_dir) else []:
+            directory = os.path.join(self.out_dir, bid_type)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.endswith('.json.gz') and (bid_type not in self.types or name not in keep):
+                    os.remove(os.path.join(directory, name))
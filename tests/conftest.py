@@ -0,0 +1,29 @@
+"""
+테스트 공통 설정
+
+웹 앱과 CLI는 가져올 때(import) config의 환경 변수를 읽으므로, 테스트 모듈보다
+먼저 임시 데이터 폴더와 대역 서버(mock_upstream)를 지정해 저장소의 data/와
+실제 upstream을 건드리지 않게 한다.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mock_upstream import MockUpstream  # noqa: E402
+
+UPSTREAM = MockUpstream().start()
+os.environ['G2B_BASE_URL'] = UPSTREAM.url
+os.environ['G2B_DATA_DIR'] = tempfile.mkdtemp(prefix='g2b-test-')
+os.environ['G2B_UPSTREAM_RATE_LIMIT'] = '0'
+
+
+@pytest.fixture
+def upstream():
+    """테스트 세션 동안 켜 두는 대역 서버"""
+    return UPSTREAM
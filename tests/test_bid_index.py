@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+검색 결과 인덱스(BidIndex) 커서 테스트
+
+- 변조된 커서는 정렬 키와 비교하다 TypeError(500)가 나지 않고 CursorError(400)가 되는지 확인
+
+실행: python -m pytest tests
+"""
+
+import base64
+import json
+
+import pytest
+
+from bid_index import BidIndex, CursorError, cursor_result_id
+
+BIDS = [{'id': f'servc_{number}', 'bidNtceNo': f'R25BK{number:08d}', 'bidNtceDt': f'2025-01-{number + 1:02d} 10:00:00',
+         'presmptPrce': str(1000 * number)} for number in range(10)]
+
+
+def make_cursor(*payload):
+    encoded = json.dumps(list(payload)).encode('utf-8')
+    return base64.urlsafe_b64encode(encoded).decode('ascii').rstrip('=')
+
+
+def test_page_follows_cursor():
+    index = BidIndex(BIDS)
+    for sort in ('bidNtceDt', 'presmptPrce'):
+        first, cursor = index.page(4, None, sort, 'asc')
+        second, _ = index.page(4, cursor, sort, 'asc')
+        assert [bid['id'] for bid in first + second] == [bid['id'] for bid in BIDS[:8]]
+
+
+@pytest.mark.parametrize('sort, key', [
+    ('bidNtceDt', [1, 'R25BK00000001', 'servc_1']),           # 날짜 대신 숫자
+    ('presmptPrce', ['1000', 'R25BK00000001', 'servc_1']),    # 숫자 대신 문자열
+    ('presmptPrce', [True, 'R25BK00000001', 'servc_1']),
+    ('bidNtceDt', ['2025-01-02 10:00:00', None, 'servc_1']),
+    ('bidNtceDt', ['2025-01-02 10:00:00', 'R25BK00000001']),  # 키 길이
+    ('bidNtceDt', [['2025-01-02'], 'R25BK00000001', 'servc_1']),
+])
+def test_tampered_cursor_key_raises_cursor_error(sort, key):
+    index = BidIndex(BIDS)
+    for order in ('asc', 'desc'):
+        with pytest.raises(CursorError):
+            index.page(4, make_cursor(index.result_id, sort, order, key), sort, order)
+
+
+def test_tampered_cursor_header_raises_cursor_error():
+    with pytest.raises(CursorError):
+        cursor_result_id(make_cursor(['result'], 'bidNtceDt', 'asc', ['', '', '']))
+    with pytest.raises(CursorError):
+        cursor_result_id('not-a-cursor')
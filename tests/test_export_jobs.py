@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+내보내기 작업(ExportJobManager) 사용자별 동시 작업 수 테스트
+
+- 중단된 워커가 남긴 진행 중 상태(pid가 없거나 기록이 오래된 작업)는 세지 않는지 확인
+- 대기 중인 작업도 주기적으로 기록되어 한도에 계속 포함되는지 확인
+
+실행: python -m pytest tests
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import export_jobs
+from export_jobs import ExportJob, ExportJobManager, JobLimitError
+from shared_cache import SharedCache
+
+
+def make_manager(tmp_path, **kwargs):
+    cache = SharedCache(str(tmp_path / 'cache.db'))
+    return ExportJobManager(directory=str(tmp_path / 'exports'), cache=cache, **kwargs)
+
+
+def publish_orphan(manager, pid, heartbeat_ts):
+    """다른 워커가 남긴 실행 중 작업 상태"""
+    job = ExportJob('u', 'csv', '중단된 작업')
+    job.status = 'running'
+    snapshot = {**job.snapshot(), 'pid': pid, 'heartbeat_ts': heartbeat_ts}
+    manager.cache.set(f'export-job:{job.id}', json.dumps(snapshot).encode('utf-8'), 60)
+    return job.id
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def blocking_rows(release):
+    def rows():
+        release.wait(10)
+        yield {'id': 'servc_1'}
+    return rows()
+
+
+def test_stale_jobs_do_not_count_toward_limit(tmp_path):
+    manager = make_manager(tmp_path, max_per_user=1)
+    dead = publish_orphan(manager, dead_pid(), time.time())
+    silent = publish_orphan(manager, None, time.time())
+    old = publish_orphan(manager, os.getpid(), time.time() - export_jobs.EXPORT_JOB_STALE_AFTER - 1)
+
+    release = threading.Event()
+    try:
+        manager.submit_results('u', 'csv', blocking_rows(release))
+        with pytest.raises(JobLimitError):
+            manager.submit_results('u', 'csv', blocking_rows(release))
+    finally:
+        release.set()
+
+    for job_id in (dead, silent, old):
+        assert manager.get(job_id).status == 'failed'
+
+
+def test_heartbeat_keeps_queued_jobs_counted(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_jobs, 'EXPORT_JOB_STALE_AFTER', 0.3)
+    manager = make_manager(tmp_path, max_workers=1, max_per_user=2, heartbeat=0.05)
+
+    release = threading.Event()
+    try:
+        running = manager.submit_results('u', 'csv', blocking_rows(release))
+        queued = manager.submit_results('u', 'csv', blocking_rows(release))
+        time.sleep(0.6)
+        # 행이 나오지 않는 작업과 대기 중인 작업도 기록 시각이 갱신되어 한도에 포함됨
+        assert manager._shared_active('u') == 2
+        assert manager.get(queued.id).status == 'queued'
+        with pytest.raises(JobLimitError):
+            manager.submit_results('u', 'csv', blocking_rows(release))
+    finally:
+        release.set()
+    manager._pool.shutdown(wait=True)
+    assert manager.get(running.id).status == 'done'
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+저장된 검색 대조(SearchMatcher)와 알림 전송(AlertDispatcher) 테스트
+
+- 색인 대조 결과를 검색 하나씩 조건을 직접 확인하는 방식과 무작위로 비교
+- 로컬 HTTP 서버를 웹훅 대신 띄워 전송 실패/재전송 확인
+
+실행: python -m pytest tests
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bid_filter import INSTITUTION_FIELDS  # noqa: E402
+from bid_store import BidStore  # noqa: E402
+from saved_searches import (  # noqa: E402
+    AlertDispatcher, AlertQueue, FileSink, SavedSearchStore, SearchMatcher, WebhookSink, normalize_criteria
+)
+
+WORDS = ['정보', '시스템', '유지', '관리', '용역', '공사', '물품', '구매', 'AI', 'ai', '보', '스템']
+AGENCIES = ['조달청', '서울특별시', '서울특별시 본청', '국방부', '국방', '부산광역시', '청']
+PRICES = [0, 1000, 5000, 5000.5, 10000, 250000, 1000000]
+
+
+def brute_force(searches, bid):
+    """검색마다 조건을 직접 확인해 통과하는 검색 id 집합"""
+    try:
+        price = float(bid.get('presmptPrce'))
+    except (TypeError, ValueError):
+        price = None
+    title = (bid.get('bidNtceNm') or '').lower()
+    matched = set()
+    for search in searches:
+        criteria = search['criteria']
+        if criteria['bid_types'] and bid['id'].split('_', 1)[0] not in criteria['bid_types']:
+            continue
+        if criteria['keywords'] and not any(keyword in title for keyword in criteria['keywords']):
+            continue
+        field = INSTITUTION_FIELDS[criteria['institution']]
+        if criteria['agencies'] and not any(agency in (bid.get(field) or '') for agency in criteria['agencies']):
+            continue
+        if criteria['min_price'] is not None or criteria['max_price'] is not None:
+            if price is None:
+                continue
+            if criteria['min_price'] is not None and price < criteria['min_price']:
+                continue
+            if criteria['max_price'] is not None and price > criteria['max_price']:
+                continue
+        matched.add(search['id'])
+    return matched
+
+
+def random_search(rnd, search_id):
+    while True:
+        data = {}
+        if rnd.random() < 0.5:
+            data['keywords'] = rnd.sample(WORDS, rnd.randint(1, 3))
+        if rnd.random() < 0.4:
+            data['agencies'] = rnd.sample(AGENCIES, rnd.randint(1, 2))
+            data['institution'] = rnd.choice(list(INSTITUTION_FIELDS))
+        if rnd.random() < 0.4:
+            data['bid_types'] = rnd.sample(['servc', 'cnstwk', 'thng'], rnd.randint(1, 2))
+        if rnd.random() < 0.4:
+            low, high = sorted(rnd.sample(PRICES, 2))
+            data['min_price'] = low if rnd.random() < 0.7 else None
+            data['max_price'] = high if rnd.random() < 0.7 else None
+        try:
+            criteria = normalize_criteria(data)
+        except ValueError:
+            continue   # 조건이 하나도 없는 경우
+        return {'id': search_id, 'owner': 'u', 'name': f's{search_id}', 'criteria': criteria}
+
+
+def random_bid(rnd, number):
+    price = rnd.choice(PRICES + [rnd.uniform(0, 2000000), '', None, 'abc'])
+    return {
+        'id': f"{rnd.choice(['servc', 'cnstwk', 'thng'])}_{number}",
+        'bidNtceNm': ' '.join(rnd.sample(WORDS, rnd.randint(0, 4))),
+        'dminsttNm': rnd.choice(AGENCIES + ['', '기타기관']),
+        'ntceInsttNm': rnd.choice(AGENCIES + ['']),
+        'presmptPrce': '' if price is None else str(price),
+    }
+
+
+def test_matcher_equals_brute_force():
+    rnd = random.Random(20250301)
+    for round_ in range(30):
+        searches = [random_search(rnd, search_id) for search_id in range(1, rnd.randint(1, 80))]
+        matcher = SearchMatcher(searches)
+        for number in range(200):
+            bid = random_bid(rnd, number)
+            mask = matcher.match_mask(bid)
+            got = {searches[bit].get('id') for bit in range(len(searches)) if mask >> bit & 1}
+            assert got == brute_force(searches, bid), (round_, bid)
+
+
+def test_price_bounds_are_inclusive():
+    searches = [
+        {'id': 1, 'owner': 'u', 'name': 'a', 'criteria': normalize_criteria({'min_price': 1000, 'max_price': 5000})},
+        {'id': 2, 'owner': 'u', 'name': 'b', 'criteria': normalize_criteria({'min_price': 5000})},
+        {'id': 3, 'owner': 'u', 'name': 'c', 'criteria': normalize_criteria({'max_price': 1000})},
+    ]
+    matcher = SearchMatcher(searches)
+    for price, expected in [(999, {3}), (1000, {1, 3}), (3000, {1}), (5000, {1, 2}), (5001, {2}), ('', set())]:
+        bid = {'id': 'servc_1', 'bidNtceNm': '', 'presmptPrce': str(price)}
+        assert {search['id'] for search, _ in matcher.match([bid])} == expected, price
+
+
+class Webhook:
+    """처음 fail_count번은 500으로 응답하는 웹훅 대역 서버 (delay초 늦게 응답)"""
+
+    def __init__(self, fail_count=0, delay=0):
+        self.fail_count = fail_count
+        self.delay = delay
+        self.received = []
+        self.requests = 0
+        webhook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                time.sleep(webhook.delay)
+                webhook.requests += 1
+                if webhook.requests <= webhook.fail_count:
+                    self.send_response(500)
+                else:
+                    webhook.received.extend(json.loads(body)['alerts'])
+                    self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/hook'
+
+    def close(self):
+        self.server.shutdown()
+
+
+def read_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def make_dispatcher(tmp_path, webhook, batch_size=2, background=False):
+    store = BidStore(str(tmp_path / 'bids.db'))
+    searches = SavedSearchStore(store)
+    searches.create('u', '용역', normalize_criteria({'keywords': '용역'}))
+    file_path = str(tmp_path / 'alerts.jsonl')
+    dispatcher = AlertDispatcher(searches, sinks=[FileSink(file_path), WebhookSink(webhook.url, timeout=5)],
+                                 batch_size=batch_size)
+    listener = AlertQueue(dispatcher) if background else dispatcher
+    store.add_listener(listener)
+    return store, listener, file_path
+
+
+BIDS = [{'id': f'servc_{number}', 'bidNtceNm': f'정보시스템 유지관리 용역 {number}', 'presmptPrce': '1000'}
+        for number in range(3)]
+
+
+def test_webhook_failure_does_not_resend_file_alerts(tmp_path, caplog):
+    webhook = Webhook(fail_count=2)   # 첫 배치의 두 묶음(2건, 1건)이 모두 실패
+    try:
+        store, dispatcher, file_path = make_dispatcher(tmp_path, webhook)
+        with caplog.at_level(logging.WARNING, logger='g2b.alerts'):
+            assert dispatcher.dispatch(BIDS) == 3   # 파일에는 전송됨
+        assert len(read_lines(file_path)) == 3
+        assert webhook.received == []
+        assert [record.getMessage().startswith('알림 전송 실패 (webhook:') for record in caplog.records] == [True, True]
+
+        # 같은 공고가 다시 대조되면 실패한 웹훅에만 다시 보냄
+        assert dispatcher.dispatch(BIDS) == 3
+        assert len(read_lines(file_path)) == 3
+        assert sorted(alert['bid']['id'] for alert in webhook.received) == [bid['id'] for bid in BIDS]
+
+        # 모든 대상에 보낸 뒤에는 더 보내지 않음
+        assert dispatcher.dispatch(BIDS) == 0
+        assert len(webhook.received) == 3
+    finally:
+        webhook.close()
+
+
+def test_amended_bid_is_not_alerted_twice(tmp_path):
+    webhook = Webhook()
+    try:
+        store, dispatcher, file_path = make_dispatcher(tmp_path, webhook)
+        store.ingest(BIDS[:1])
+        store.ingest([{**BIDS[0], 'presmptPrce': '2000'}])   # 정정 공고
+        assert len(read_lines(file_path)) == 1
+        assert len(webhook.received) == 1
+        assert dispatcher.sent == 1
+    finally:
+        webhook.close()
+
+
+def test_legacy_alert_log_counts_as_sent_to_every_sink(tmp_path):
+    path = str(tmp_path / 'bids.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE alert_log (search_id INTEGER NOT NULL, bid_id TEXT NOT NULL,'
+                 ' sent_at REAL NOT NULL, PRIMARY KEY (search_id, bid_id))')
+    conn.execute("INSERT INTO alert_log VALUES (1, 'servc_0', 0)")
+    conn.commit()
+    conn.close()
+
+    webhook = Webhook()
+    try:
+        store, dispatcher, file_path = make_dispatcher(tmp_path, webhook)
+        assert dispatcher.dispatch(BIDS) == 2
+        assert sorted(alert['bid']['id'] for alert in read_lines(file_path)) == ['servc_1', 'servc_2']
+        assert len(webhook.received) == 2
+    finally:
+        webhook.close()
+
+
+def test_alert_queue_does_not_block_ingest(tmp_path):
+    webhook = Webhook(delay=1)
+    try:
+        store, alert_queue, file_path = make_dispatcher(tmp_path, webhook, batch_size=10, background=True)
+        started = time.monotonic()
+        store.ingest(BIDS)
+        assert time.monotonic() - started < 0.5   # 웹훅 응답을 기다리지 않음
+        alert_queue.join()
+        assert sorted(alert['bid']['id'] for alert in webhook.received) == [bid['id'] for bid in BIDS]
+    finally:
+        webhook.close()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+공유 캐시(SharedCache) 테스트
+
+- 저장할 때 주기적으로 만료된 항목을 지워 캐시 파일이 계속 커지지 않는지 확인
+- single_flight가 다른 키의 계산을 기다리지 않는지 확인
+
+실행: python -m pytest tests
+"""
+
+import threading
+import time
+
+from shared_cache import SharedCache
+
+
+def cache_rows(cache):
+    return cache._conn().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+
+def test_set_purges_expired_entries(tmp_path):
+    cache = SharedCache(str(tmp_path / 'cache.db'), purge_interval=0.1)
+    for number in range(10):
+        cache.set(f'old:{number}', b'x', 0.01)
+    assert cache_rows(cache) == 10
+
+    time.sleep(0.15)
+    cache.set('new', b'y', 60)
+    assert cache_rows(cache) == 1
+    assert cache.get('new') == b'y'
+
+
+def test_purge_waits_for_interval(tmp_path):
+    cache = SharedCache(str(tmp_path / 'cache.db'), purge_interval=3600)
+    cache.set('old', b'x', 0.01)
+    time.sleep(0.05)
+    cache.set('new', b'y', 60)
+    # 주기 전에는 지우지 않지만 만료된 값은 돌려주지 않음
+    assert cache_rows(cache) == 2
+    assert cache.get('old') is None
+
+
+def colliding_keys():
+    """예전 잠금 분산(hash % 64)에서 같은 잠금을 쓰던 서로 다른 두 키"""
+    seen = {}
+    for number in range(1000):
+        key = f'key:{number}'
+        other = seen.setdefault(hash(key) % 64, key)
+        if other != key:
+            return other, key
+
+
+def test_single_flight_locks_per_key(tmp_path):
+    cache = SharedCache(str(tmp_path / 'cache.db'))
+    calls = []
+
+    def compute(key):
+        def run():
+            calls.append(key)
+            time.sleep(0.5)
+            return key
+        return run
+
+    keys = colliding_keys() * 2   # 서로 다른 키 둘을 각각 두 스레드가 조회
+    results = [None] * len(keys)
+
+    def search(number):
+        results[number] = cache.single_flight(keys[number], compute(keys[number]), ttl=60)
+
+    threads = [threading.Thread(target=search, args=(number,)) for number in range(len(keys))]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 다른 키는 서로 기다리지 않고, 같은 키는 한 번만 계산
+    assert time.monotonic() - started < 0.9
+    assert sorted(calls) == sorted(set(keys))
+    assert results == list(keys)
+    assert cache._key_locks == {}
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+검색 API(/api/search, /api/search/stream) 테스트 (Flask, ASGI)
+
+- 저장소 반영(ingest) 중에 다른 검색이 끼어들어도 각 요청은 자기 결과만 돌려주는지 확인
+
+실행: python -m pytest tests
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+from starlette.testclient import TestClient
+
+from web import app as flask_module
+from web import asgi_app as asgi_module
+
+RANGES = [('2025-01-06', '2025-01-07'), ('2025-02-10', '2025-02-11')]
+
+
+def slow_ingest(monkeypatch, module, seconds=0.5):
+    """저장소 반영을 늦춰 다음 검색이 그 사이에 끝나도록 함"""
+    ingest = module.bid_store.ingest
+
+    def slow(bids):
+        time.sleep(seconds)
+        return ingest(bids)
+
+    monkeypatch.setattr(module.bid_store, 'ingest', slow)
+
+
+def search_body(start, end):
+    return {'start_date': start, 'end_date': end, 'bid_type': 'servc', 'refresh': True}
+
+
+def stream_rows(text):
+    events = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return events[-1]
+
+
+def assert_in_range(bids, start, end):
+    assert bids
+    days = {bid['bidNtceDt'][:10] for bid in bids}
+    assert days <= {start, end}, (start, end, sorted(days))
+
+
+def test_flask_concurrent_searches_keep_their_own_results(monkeypatch):
+    slow_ingest(monkeypatch, flask_module)
+    responses = {}
+
+    def search(path, start, end):
+        # 스트리밍 응답은 요청한 스레드에서 읽어야 함 (요청 컨텍스트)
+        response = flask_module.app.test_client().post(path, json=search_body(start, end))
+        responses[path, start] = response.get_data(as_text=True)
+
+    for path in ('/api/search', '/api/search/stream'):
+        threads = []
+        for start, end in RANGES:
+            thread = threading.Thread(target=search, args=(path, start, end))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.1)
+        for thread in threads:
+            thread.join()
+
+    for start, end in RANGES:
+        assert_in_range(json.loads(responses['/api/search', start])['data'], start, end)
+        summary = stream_rows(responses['/api/search/stream', start])
+        assert summary['event'] == 'summary'
+        index = flask_module.results.get(summary['result_id'])
+        assert_in_range(list(index.ordered()), start, end)
+
+
+def test_asgi_concurrent_searches_keep_their_own_results(monkeypatch):
+    slow_ingest(monkeypatch, asgi_module)
+
+    async def search(client, path, start, end, delay):
+        await asyncio.sleep(delay)
+        return await client.post(path, json=search_body(start, end))
+
+    async def run(path):
+        transport = httpx.ASGITransport(app=asgi_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test', timeout=60) as client:
+            return await asyncio.gather(*(search(client, path, start, end, 0.1 * number)
+                                          for number, (start, end) in enumerate(RANGES)))
+
+    async def main():
+        return await run('/api/search'), await run('/api/search/stream')
+
+    searched, streamed = asyncio.run(main())
+    for (start, end), response, stream in zip(RANGES, searched, streamed):
+        assert_in_range(response.json()['data'], start, end)
+        summary = stream_rows(stream.text)
+        assert summary['event'] == 'summary'
+        index = asgi_module.results.get(summary['result_id'])
+        assert_in_range(list(index.ordered()), start, end)
+
+
+def response_json(response):
+    return response.get_json() if hasattr(response, 'get_json') else response.json()
+
+
+def response_text(response):
+    return response.get_data(as_text=True) if hasattr(response, 'get_data') else response.text
+
+
+def test_delete_only_changes_its_own_result():
+    start, end = RANGES[0]
+    for module, client in ((flask_module, flask_module.app.test_client()), (asgi_module, TestClient(asgi_module.app))):
+        first = response_json(client.post('/api/search', json=search_body(start, end)))
+        deleted = first['data'][0]['id']
+        response = client.post('/api/delete', json={'result_id': first['result_id'], 'selected_ids': [deleted]})
+        assert response.status_code == 200
+
+        # 필터만 바꾼 다른 사용자의 검색(같은 기간 재사용)에는 영향 없음
+        body = {**search_body(start, end), 'refresh': False}
+        other = response_json(client.post('/api/search', json=body))
+        assert other['count'] == first['count']
+        assert deleted in {bid['id'] for bid in other['data']}
+
+        # 삭제한 사용자는 exclude_ids로 다시 검색 (스트리밍 포함)
+        summary = stream_rows(response_text(client.post('/api/search/stream', json={**body, 'exclude_ids': [deleted]})))
+        assert summary['count'] == first['count'] - 1
+        assert deleted not in module.results.get(summary['result_id'])
+
+
+def test_reused_columns_keep_fetch_warnings():
+    # 구분별 페이지 한도(SEARCH_MAX_PAGES)를 넘는 기간 - 다시 쓰는 검색도 잘렸다고 알려야 함
+    body = search_body('2025-03-01', '2025-03-31')
+    for client in (flask_module.app.test_client(), TestClient(asgi_module.app)):
+        fetched = response_json(client.post('/api/search', json=body))
+        assert fetched['refetched'] and fetched['truncated']
+
+        reused = response_json(client.post('/api/search', json={**body, 'refresh': False, 'keyword': '용역'}))
+        assert not reused['refetched']
+        assert reused['truncated'] and reused['errors'] == fetched['errors']
+
+        summary = stream_rows(response_text(client.post('/api/search/stream', json={**body, 'refresh': False})))
+        assert summary['truncated'] and summary['truncated_types'] == ['servc']
+        assert summary['as_of'] == fetched['as_of']
+
+
+def test_stream_ends_with_error_event_on_failure(monkeypatch):
+    # 청크를 보낸 뒤(저장소 반영 중) 실패해도 응답이 summary 없이 끊기지 않고 error 이벤트로 끝나야 함
+    def broken_ingest(bids):
+        raise RuntimeError('저장소 오류')
+
+    start, end = RANGES[0]
+    for module, client in ((flask_module, flask_module.app.test_client()), (asgi_module, TestClient(asgi_module.app))):
+        monkeypatch.setattr(module.bid_store, 'ingest', broken_ingest)
+        events = [json.loads(line) for line in response_text(
+            client.post('/api/search/stream', json=search_body(start, end))).splitlines() if line.strip()]
+        assert events[0]['event'] == 'chunk'
+        assert events[-1] == {'event': 'error', 'fatal': True, 'error': '저장소 오류'}
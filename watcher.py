@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+신규 입찰공고 감시
+Incremental poller that reports only bids it has not seen before
+
+입찰 구분별로 마지막으로 조회를 마친 시각(high-water mark)을 기억하고,
+다음 조회는 그 시각부터 지금까지만 요청한다. upstream 반영이 늦는 공고를
+놓치지 않도록 WATCH_OVERLAP_MINUTES만큼 겹쳐 조회하고, 겹친 구간의
+중복은 공고 id의 8바이트 해시 집합으로 걸러낸다. 해시는 겹침 구간을
+벗어나면 지워지므로 하루 종일 켜 두어도 집합이 커지지 않는다.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from bid_filter import BidQuery
+from config import (
+    WATCH_BUSINESS_HOURS, WATCH_INTERVAL, WATCH_MAX_INTERVAL, WATCH_OFF_HOURS_INTERVAL,
+    WATCH_OVERLAP_MINUTES, WATCH_WEEKEND_INTERVAL
+)
+from search_service import page_chunk
+
+
+def _bid_hash(bid_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(bid_id.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class BidWatcher:
+    """
+    입찰 구분별 증분 조회
+
+    Args:
+        client: G2BClient
+        types: 감시할 입찰 구분 목록
+        since: 처음 조회를 시작할 시각
+        query: 필터 조건 (맞는 공고만 보고)
+        state_path: 상태(high-water mark, 본 공고) 저장 파일 - 다시 시작해도 이어서 감시
+        store: BidStore (주면 필터와 관계없이 조회한 공고를 모두 반영)
+    """
+
+    def __init__(self,
+                 client,
+                 types: List[str],
+                 since: datetime,
+                 query: Optional[BidQuery] = None,
+                 state_path: Optional[str] = None,
+                 store=None):
+        self.client = client
+        self.types = types
+        self.query = query
+        self.state_path = state_path
+        self.store = store
+        self.overlap = timedelta(minutes=WATCH_OVERLAP_MINUTES)
+        self.high_water: Dict[str, datetime] = {type_name: since for type_name in types}
+        # 공고 id 해시 → 마지막으로 응답에 나온 시각 (겹침 구간 밖으로 밀려나면 삭제)
+        self.seen: Dict[int, datetime] = {}
+        self.idle_polls = 0
+        # 저장된 상태에서 이어서 감시하는지 (처음 조회도 새 공고만 나옴)
+        self.resumed = False
+        self._load_state()
+
+    def poll(self, now: Optional[datetime] = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        지난 조회 이후의 새 공고 조회
+
+        Returns:
+            (새 공고 목록, 오류 청크 목록) - 오류가 난 입찰 구분은 high-water mark를
+            옮기지 않으므로 다음 조회에서 같은 구간을 다시 요청한다.
+        """
+        now = now or datetime.now()
+        new_bids, errors, fetched = [], [], []
+        for type_name in self.types:
+            window_start = self.high_water[type_name] - self.overlap
+            failed = False
+            pages = self.client.iter_bid_pages(bid_type=type_name, start_date=window_start, end_date=now,
+                                               num_of_rows=100)
+            for page_no, result in enumerate(pages, 1):
+                chunk = page_chunk(type_name, page_no, result)
+                if chunk['error']:
+                    errors.append(chunk)
+                    failed = True
+                    break
+                fetched.extend(chunk['items'])
+                new_bids.extend(self._unseen(chunk['items'], now))
+            if not failed:
+                self.high_water[type_name] = now
+
+        # 저장소 반영이 실패하면 상태를 저장하지 않아 다음 실행에서 같은 구간을 다시 조회
+        if self.store is not None and fetched:
+            self.store.ingest(fetched)
+        self._prune()
+        self._save_state()
+        if self.query is not None and new_bids:
+            new_bids = self.query.filter(new_bids)
+        self.idle_polls = 0 if new_bids else self.idle_polls + 1
+        return new_bids, errors
+
+    def next_interval(self, now: Optional[datetime] = None) -> float:
+        """
+        다음 조회까지 기다릴 시간 (초)
+
+        주말/업무 시간 외에는 긴 기본 간격을 쓰고, 새 공고가 없는 조회가
+        이어지면 간격을 1.5배씩 늘린다 (새 공고가 나오면 원래대로).
+        """
+        now = now or datetime.now()
+        start_hour, end_hour = WATCH_BUSINESS_HOURS
+        if now.weekday() >= 5:
+            base = WATCH_WEEKEND_INTERVAL
+        elif not start_hour <= now.hour < end_hour:
+            base = WATCH_OFF_HOURS_INTERVAL
+        else:
+            base = WATCH_INTERVAL
+        return min(max(base, WATCH_MAX_INTERVAL), base * 1.5 ** min(self.idle_polls, 10))
+
+    def _unseen(self, bids: List[Dict], now: datetime) -> List[Dict]:
+        # 조회 구간은 공고일시가 아닌 등록 시각 기준일 수 있으므로 마지막으로 응답에 나온 시각을 기억
+        fresh = []
+        for bid in bids:
+            key = _bid_hash(bid['id'])
+            if key not in self.seen:
+                fresh.append(bid)
+            self.seen[key] = now
+        return fresh
+
+    def _prune(self) -> None:
+        """다음 조회 구간 시작 전에 마지막으로 나온 공고는 그 뒤에 등록된 것이 아니므로 다시 오지 않음"""
+        oldest = min(self.high_water.values()) - self.overlap - timedelta(minutes=1)
+        self.seen = {key: notice_dt for key, notice_dt in self.seen.items() if notice_dt >= oldest}
+
+    def _load_state(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        for type_name, value in state.get('high_water', {}).items():
+            if type_name in self.high_water:
+                self.high_water[type_name] = datetime.fromisoformat(value)
+                self.resumed = True
+        self.seen = {int(key): datetime.fromisoformat(value) for key, value in state.get('seen', {}).items()}
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        state = {
+            'high_water': {type_name: value.isoformat() for type_name, value in self.high_water.items()},
+            'seen': {str(key): value.isoformat() for key, value in self.seen.items()},
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        temp_path = f'{self.state_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
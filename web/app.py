@@ -4,24 +4,178 @@
 Flask 백엔드 API 서버
 """
 
+import hmac
 import os
 import sys
-from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, g, render_template, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
-import pandas as pd
-import io
 
 # 프로젝트 루트 디렉토리를 sys.path에 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import ADMIN_TOKEN, AGENCY_LIST_LIMIT, PROFILE_INTERVAL, UPSTREAM_RATE_BURST, UPSTREAM_RATE_LIMIT
+import metrics
+import request_timing
 from g2b_client import G2BClient
+from bid_filter import BidColumns
+from bid_index import BidIndex, CursorError, cursor_result_id
+from agency_index import AgencyIndex, etag_matches
+from bid_rollups import BidRollups, stats_params
+from bid_store import BidStore, sync_bids
+from export_jobs import ExportJobManager, JobLimitError
+from profiling import AllocationTracker, ProfilerBusyError, SamplingProfiler, folded
+from exporters import EXPORT_FORMATS, check_format, content_disposition, export_filename, stream_export
+from saved_searches import AlertDispatcher, AlertQueue, SavedSearchStore, normalize_criteria
+from shared_cache import RateLimiter, ResultStore, SharedCache
+from request_timing import span
+from search_service import (
+    SearchStream, SearchSummary, as_of, delta_window, export_bids, fetch_key,
+    iter_search_chunks, page_params, parse_exclude_ids, parse_since, reusable_columns, search_page, search_params
+)
 
 app = Flask(__name__)
 CORS(app)
 
 # 글로벌 변수
-g2b_client = G2BClient()
-current_bids = []
+# upstream 응답 캐시/속도 제한/검색 결과는 워커 프로세스끼리 공유 (run_web.py --prod)
+shared_cache = SharedCache()
+g2b_client = G2BClient(cache=shared_cache,
+                       rate_limiter=RateLimiter(shared_cache, 'upstream', UPSTREAM_RATE_LIMIT, UPSTREAM_RATE_BURST))
+current_columns = None   # 이 워커가 마지막으로 가져온 전체 결과 (BidColumns)
+results = ResultStore(shared_cache)
+export_jobs = ExportJobManager(cache=shared_cache)
+bid_store = BidStore()
+saved_searches = SavedSearchStore(bid_store)
+# 알림 대조와 전송은 백그라운드에서 (검색 요청이 웹훅 전송을 기다리지 않도록)
+bid_store.add_listener(AlertQueue(AlertDispatcher(saved_searches)))
+agency_index = AgencyIndex(bid_store)
+bid_store.add_listener(agency_index)
+bid_rollups = BidRollups(bid_store)
+bid_store.add_listener(bid_rollups)
+profiler = SamplingProfiler()
+allocations = AllocationTracker()
+
+metrics.REGISTRY.share(shared_cache)
+metrics.track_cache(shared_cache)
+metrics.track_results(results, lambda: current_columns)
+request_timing.configure_logging()
+
+@app.before_request
+def start_timer():
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.timing = request_timing.start(request.method, route)
+
+@app.after_request
+def record_request(response):
+    """
+    라우트별 처리 시간 기록 (라우트 패턴 기준으로 묶음)
+    
+    단계별 시간은 Server-Timing 헤더로 보내고 요청 로그에 남긴다.
+    스트리밍 응답은 헤더에 응답 시작까지의 단계만 담기고, 로그는 전송이 끝난 뒤 남긴다.
+    """
+    timing = g.timing
+    metrics.HTTP_REQUEST_SECONDS.observe(timing.elapsed(), request.method, timing.route)
+    metrics.HTTP_REQUESTS.inc(request.method, timing.route, str(response.status_code))
+    metrics.REGISTRY.maybe_publish()
+    
+    response.headers['Server-Timing'] = timing.server_timing()
+    status = response.status_code
+    if response.is_streamed:
+        response.call_on_close(lambda: timing.log(status))
+    else:
+        timing.log(status)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus 지표 (모든 워커 합산)"""
+    return Response(metrics.REGISTRY.render(), mimetype=metrics.CONTENT_TYPE)
+
+def _admin_error():
+    """관리자 요청이 아니면 오류 응답 (ADMIN_TOKEN이 없으면 기능 자체가 꺼져 있음)"""
+    if not ADMIN_TOKEN:
+        return jsonify({
+            'success': False,
+            'error': '관리자 기능이 꺼져 있습니다.'
+        }), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({
+            'success': False,
+            'error': '관리자 토큰이 올바르지 않습니다.'
+        }), 403
+    return None
+
+@app.route('/api/admin/profile', methods=['POST'])
+def admin_profile():
+    """
+    샘플링 프로파일 (이 워커 프로세스)
+    
+    seconds 동안 모든 스레드의 호출 스택을 샘플링해 folded 형식
+    (flamegraph.pl, speedscope)으로 돌려준다. format=json이면 스택별 샘플 수.
+    """
+    error = _admin_error()
+    if error:
+        return error
+    try:
+        data = request.get_json(silent=True) or {}
+        stacks = profiler.profile(float(data.get('seconds', 10)),
+                                  interval=float(data.get('interval', PROFILE_INTERVAL)),
+                                  idle=bool(data.get('idle', False)))
+    except ProfilerBusyError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 409
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    if data.get('format') == 'json':
+        return jsonify({'success': True, 'pid': os.getpid(), 'samples': profiler.samples, 'stacks': stacks})
+    return Response(folded(stacks), mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename="profile-{os.getpid()}.folded"'})
+
+@app.route('/api/admin/tracemalloc', methods=['GET', 'POST'])
+def admin_tracemalloc():
+    """
+    할당 추적 (이 워커 프로세스)
+    
+    POST {action: start|reset|stop} 으로 켜고 끄며, GET ?view=top|diff 로
+    할당 위치 상위 목록이나 시작(reset) 시점 대비 증감을 본다.
+    """
+    error = _admin_error()
+    if error:
+        return error
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            action = data.get('action', 'start')
+            if action == 'start':
+                allocations.start(int(data.get('frames', 10)))
+            elif action == 'reset':
+                allocations.reset()
+            elif action == 'stop':
+                allocations.stop()
+            else:
+                raise ValueError(f'지원하지 않는 동작입니다: {action}')
+            return jsonify({'success': True, 'pid': os.getpid(), 'tracing': allocations.running})
+        
+        view = request.args.get('view', 'top')
+        files = request.args.get('files')
+        options = {
+            'limit': int(request.args.get('limit', 20)),
+            'key_type': request.args.get('key_type', 'lineno'),
+        }
+        if files is not None:
+            options['files'] = [name for name in files.split(',') if name]
+        stats = allocations.diff(**options) if view == 'diff' else allocations.top(**options)
+        return jsonify({'success': True, 'pid': os.getpid(), 'view': view, 'stats': stats})
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
 
 @app.route('/')
 def index():
@@ -33,192 +187,393 @@ def search_bids():
     """입찰공고 검색 API"""
     try:
         data = request.get_json()
+        limit, cursor, sort, order = page_params(data)
+        result_id = data.get('result_id')
         
-        # 파라미터 추출
-        start_date = data.get('start_date')
-        end_date = data.get('end_date')
-        bid_type = data.get('bid_type', 'all')
-        agency_filter = data.get('agency_filter', '')
+        global current_columns
         
-        # 날짜 파싱
-        if start_date:
-            start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        else:
-            start_dt = datetime.now() - timedelta(days=7)
-            
-        if end_date:
-            end_dt = datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59)
-        else:
-            end_dt = datetime.now()
+        # 커서 또는 result_id가 있으면 기존 결과를 재조회 없이 페이지 조회
+        if cursor or result_id:
+            index = results.get(result_id or cursor_result_id(cursor))
+            if index is None:
+                return jsonify({
+                    'success': False,
+                    'error': '검색 결과가 변경되었습니다. 다시 검색해주세요.'
+                }), 409
+            page = search_page(index, limit, cursor, sort, order)
+            with span('serialize'):
+                return jsonify(page)
+        
+        types, start_dt, end_dt, query = search_params(data)
+        since = parse_since(data.get('since'))
+        excluded = parse_exclude_ids(data.get('exclude_ids'))
+        key = fetch_key(data, types)
+        summary = SearchSummary()
+        
+        # since 이후 공고만 조회 (클라이언트 캐시 갱신) - 나머지는 로컬 저장소에서 채움
+        if since is not None:
+            metrics.SEARCH_FETCHES.inc('delta')
+            window = delta_window(since, start_dt, end_dt)
+            delta = []
+            if window is not None:
+                for chunk in iter_search_chunks(g2b_client, types, *window):
+                    delta.extend(chunk['items'])
+                    summary.add(chunk)
+                with span('store'):
+                    bid_store.ingest(delta)
+            with span('columns'):
+                columns = BidColumns(list(bid_store.iter_bids(types, start_dt, end_dt)), key,
+                                     summary.errors, summary.truncated_types)
+                current_columns = columns
+            with span('filter'):
+                index = BidIndex(query.apply(columns))
+                index.remove(excluded)
+                results.put(index)
+                delta_index = BidIndex(query.filter(delta))
+                delta_index.remove(excluded)
+                changed = search_page(delta_index, None, None, sort, order)['data']
+            with span('serialize'):
+                return jsonify({'success': True, 'data': changed, 'count': len(index), 'result_id': index.result_id,
+                                'next_cursor': None, 'as_of': as_of(columns), 'errors': summary.errors,
+                                'truncated': summary.truncated, 'refetched': True, 'delta': True})
         
-        # 입찰공고 조회
-        global current_bids
-        current_bids = []
+        # 다른 요청이 current_columns를 바꿔도 이 요청은 자기 결과만 쓰도록 지역 변수로 처리
+        columns = current_columns
+        refetched = data.get('refresh') or not reusable_columns(columns, key)
+        metrics.SEARCH_FETCHES.inc('true' if refetched else 'false')
         
-        # 조회할 타입 결정
-        if bid_type == 'all':
-            types = ['servc', 'cnstwk', 'thng']
+        # 입찰공고 조회 (입찰 구분별 병렬, 전체 페이지) - 필터만 바뀌었으면 생략
+        if refetched:
+            bids = []
+            for chunk in iter_search_chunks(g2b_client, types, start_dt, end_dt):
+                bids.extend(chunk['items'])
+                summary.add(chunk)
+            with span('columns'):
+                columns = BidColumns(bids, key, summary.errors, summary.truncated_types)
+                current_columns = columns
+            with span('store'):
+                bid_store.ingest(bids)
         else:
-            types = [bid_type]
-        
-        for type_name in types:
-            result = g2b_client.get_bid_list(
-                bid_type=type_name,
-                start_date=start_dt,
-                end_date=end_dt,
-                num_of_rows=100
-            )
-            
-            if result and 'response' in result:
-                header = result['response'].get('header', {})
-                if header.get('resultCode') == '00':
-                    body = result['response'].get('body', {})
-                    items = body.get('items', [])
-                    
-                    # 데이터 가공
-                    for item in items:
-                        bid_data = {
-                            'id': f"{type_name}_{item.get('bidNtceNo', '')}",
-                            'bidType': g2b_client._get_type_name(type_name),
-                            'bidNtceNo': item.get('bidNtceNo', ''),
-                            'bidNtceNm': item.get('bidNtceNm', ''),
-                            'dminsttNm': item.get('dminsttNm', ''),
-                            'bidNtceDt': item.get('bidNtceDt', ''),
-                            'bidClseDt': item.get('bidClseDt', ''),
-                            'presmptPrce': item.get('presmptPrce', ''),
-                            'bidNtceUrl': item.get('bidNtceUrl', ''),
-                            'ntceInsttNm': item.get('ntceInsttNm', ''),
-                        }
-                        
-                        # 기관 필터링
-                        if agency_filter and agency_filter != 'all':
-                            if agency_filter not in bid_data['dminsttNm']:
-                                continue
-                        
-                        current_bids.append(bid_data)
-        
-        # 날짜순 정렬 (최신순)
-        current_bids.sort(key=lambda x: x.get('bidNtceDt', ''), reverse=True)
+            # 재사용하는 결과를 가져올 때의 조회 실패/잘림도 함께 알림
+            summary.restore(columns)
         
-        return jsonify({
-            'success': True,
-            'data': current_bids,
-            'count': len(current_bids)
-        })
+        with span('filter'):
+            index = BidIndex(query.apply(columns))
+            index.remove(excluded)
+            results.put(index)
+        page = search_page(index, limit, None, sort, order)
+        with span('serialize'):
+            return jsonify({**page, 'as_of': as_of(columns), 'errors': summary.errors,
+                            'truncated': summary.truncated, 'refetched': bool(refetched)})
         
+    except (CursorError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/api/search/stream', methods=['GET', 'POST'])
+def search_bids_stream():
+    """
+    입찰공고 스트리밍 검색 API
+    
+    입찰 구분/페이지 조회가 끝날 때마다 청크를 내보내고, 마지막에
+    건수와 오류를 담은 summary 이벤트를 보낸다.
+    format=ndjson(기본) 또는 format=sse (EventSource용 GET 지원)
+    """
+    try:
+        data = request.get_json(silent=True) or request.args.to_dict()
+        limit, _, sort, order = page_params(data)
+        types, start_dt, end_dt, query = search_params(data)
+        excluded = set(parse_exclude_ids(data.get('exclude_ids')))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    stream = SearchStream(limit, sse=(data.get('format') == 'sse'
+                                      or request.accept_mimetypes.best == 'text/event-stream'))
+    
+    key = fetch_key(data, types)
+    
+    def search():
+        global current_columns
+        columns = current_columns
+        refetched = data.get('refresh') or not reusable_columns(columns, key)
+        metrics.SEARCH_FETCHES.inc('true' if refetched else 'false')
+        if refetched:
+            # 전체 결과는 보관하고, 화면에는 조건에 맞는 항목만 전송
+            bids = []
+            for chunk in iter_search_chunks(g2b_client, types, start_dt, end_dt):
+                bids.extend(chunk['items'])
+                items = [bid for bid in query.filter(chunk['items']) if bid['id'] not in excluded]
+                yield stream.chunk_event({**chunk, 'items': items})
+            with span('columns'):
+                columns = BidColumns(bids, key, stream.summary.errors, stream.summary.truncated_types)
+                current_columns = columns
+            with span('store'):
+                bid_store.ingest(bids)
+        else:
+            stream.summary.restore(columns)
+        
+        with span('filter'):
+            index = BidIndex(query.apply(columns))
+            index.remove(excluded)
+            results.put(index)
+        yield stream.summary_event(index, sort, order, columns)
+    
+    def generate():
+        # 청크를 보낸 뒤에는 상태 코드를 바꿀 수 없으므로 실패도 마지막 이벤트로 알림
+        try:
+            yield from search()
+        except Exception as e:
+            yield stream.failure_event(e)
+    
+    return Response(stream_with_context(generate()), mimetype=stream.mimetype,
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/agencies')
 def get_agencies():
-    """기관 목록 조회 API"""
+    """
+    기관 목록 조회 API (기관 색인 자동완성, upstream을 조회하지 않음)
+
+    Query: q(기관명 앞부분/부분 일치), institution(demand/notice), limit
+    """
     try:
-        # 최근 데이터에서 기관 목록 추출
-        agencies = set()
-        
-        # 샘플 데이터로 최근 입찰공고에서 기관 목록을 추출
-        for type_name in ['servc', 'cnstwk', 'thng']:
-            result = g2b_client.get_bid_list(
-                bid_type=type_name,
-                num_of_rows=50
-            )
-            
-            if result and 'response' in result:
-                header = result['response'].get('header', {})
-                if header.get('resultCode') == '00':
-                    body = result['response'].get('body', {})
-                    items = body.get('items', [])
-                    
-                    for item in items:
-                        agency = item.get('dminsttNm', '').strip()
-                        if agency:
-                            agencies.add(agency)
-        
-        agency_list = sorted(list(agencies))
-        
+        etag = agency_index.etag
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=headers)
+
+        items, total = agency_index.search(
+            request.args.get('q', ''),
+            institution=request.args.get('institution', 'demand'),
+            limit=int(request.args.get('limit', AGENCY_LIST_LIMIT))
+        )
+        response = jsonify({
+            'success': True,
+            'agencies': [item['name'] for item in items],
+            'items': items,
+            'total': total
+        })
+        response.headers.update(headers)
+        return response
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/stats')
+def get_stats():
+    """
+    집계 API (저장소에 반영된 공고의 일별·입찰 구분별·기관별 공고 수와 예정가격)
+
+    Query: group_by, bucket, start_date, end_date, bid_type, agency, sort, limit
+    """
+    try:
+        params = stats_params(request.args)
         return jsonify({
             'success': True,
-            'agencies': agency_list
+            'group_by': params['group_by'],
+            'bucket': params['bucket'],
+            **bid_rollups.query(**params)
         })
-        
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
-@app.route('/api/export/excel', methods=['POST'])
-def export_excel():
-    """Excel 내보내기 API"""
+@app.route('/api/export', methods=['POST'])
+@app.route('/api/export/excel', methods=['POST'], defaults={'fmt': 'xlsx'})
+def export_results(fmt=None):
+    """
+    내보내기 API (xlsx, csv, parquet)
+    
+    검색 결과를 한 행씩 읽어 파일 바이트를 바로 응답으로 흘려보낸다.
+    """
     try:
         data = request.get_json()
-        selected_ids = data.get('selected_ids', [])
+        fmt = fmt or data.get('format', 'xlsx')
+        check_format(fmt)
         
-        # 선택된 항목 필터링
-        if selected_ids:
-            export_data = [bid for bid in current_bids if bid['id'] in selected_ids]
-        else:
-            export_data = current_bids
+        # 기간 전체 내보내기는 백그라운드 작업으로 등록
+        if data.get('background') and data.get('source') == 'upstream':
+            types, start_dt, end_dt, query = search_params(data)
+            job = export_jobs.submit_upstream(_request_user(), fmt, g2b_client,
+                                              types, start_dt, end_dt, query)
+            return jsonify({'success': True, **_job_payload(job)}), 202
         
-        if not export_data:
+        # 선택된 항목 (없으면 전체 검색 결과)
+        if not data.get('result_id'):
+            return jsonify({
+                'success': False,
+                'error': 'result_id가 필요합니다.'
+            }), 400
+        index = results.get(data['result_id'])
+        if index is None:
+            return jsonify({
+                'success': False,
+                'error': '검색 결과를 찾을 수 없습니다. 다시 검색해주세요.'
+            }), 404
+        bids = export_bids(index, data.get('selected_ids', []))
+        if bids is None:
             return jsonify({
                 'success': False,
                 'error': '내보낼 데이터가 없습니다.'
             }), 400
         
-        # DataFrame 생성
-        df_data = []
-        for bid in export_data:
-            # 가격 포맷팅
-            price = bid.get('presmptPrce', '')
-            if price and price != 'N/A':
-                try:
-                    price_num = int(price)
-                    if price_num >= 100000000:
-                        price_formatted = f"{price_num/100000000:.1f}억원"
-                    elif price_num >= 10000000:
-                        price_formatted = f"{price_num/10000000:.0f}천만원"
-                    else:
-                        price_formatted = f"{price_num:,}원"
-                except:
-                    price_formatted = price
-            else:
-                price_formatted = ''
-            
-            df_data.append({
-                '구분': bid.get('bidType', ''),
-                '공고번호': bid.get('bidNtceNo', ''),
-                '공고명': bid.get('bidNtceNm', ''),
-                '발주기관': bid.get('dminsttNm', ''),
-                '공고일시': bid.get('bidNtceDt', ''),
-                '마감일시': bid.get('bidClseDt', ''),
-                '예정가격': price_formatted,
-                '공고기관': bid.get('ntceInsttNm', ''),
-            })
-        
-        df = pd.DataFrame(df_data)
-        
-        # Excel 파일 생성
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='입찰공고', index=False)
-        
-        output.seek(0)
-        
-        # 파일명 생성
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'나라장터_입찰공고_{timestamp}.xlsx'
-        
-        return send_file(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=filename
+        if data.get('background'):
+            job = export_jobs.submit_results(_request_user(), fmt, bids)
+            return jsonify({'success': True, **_job_payload(job)}), 202
+        
+        return Response(
+            stream_with_context(stream_export(bids, fmt)),
+            mimetype=EXPORT_FORMATS[fmt],
+            headers={'Content-Disposition': content_disposition(export_filename(fmt))}
         )
         
+    except JobLimitError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 429
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _request_user():
+    """요청 사용자 - 작업/저장된 검색의 소유자 (X-User-Id 헤더, 없으면 접속 주소)"""
+    return request.headers.get('X-User-Id') or request.remote_addr or 'anonymous'
+
+def _job_payload(job):
+    """작업 상태 응답 (상태/다운로드 URL 포함)"""
+    payload = job.to_dict()
+    payload['status_url'] = f'/api/export/jobs/{job.id}'
+    payload['download_url'] = f'/api/export/jobs/{job.id}/download' if job.status == 'done' else None
+    return payload
+
+def _owned_job(job_id):
+    """요청자의 작업 (다른 사용자의 작업이면 None)"""
+    job = export_jobs.get(job_id)
+    if job is None or job.owner != _request_user():
+        return None
+    return job
+
+@app.route('/api/export/jobs/<job_id>', methods=['GET', 'DELETE'])
+def export_job_status(job_id):
+    """내보내기 작업 상태 조회 (GET) / 취소 (DELETE)"""
+    job = _owned_job(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': '작업을 찾을 수 없습니다.'
+        }), 404
+    
+    if request.method == 'DELETE':
+        export_jobs.cancel(job_id)
+    
+    return jsonify({'success': True, **_job_payload(job)})
+
+@app.route('/api/export/jobs/<job_id>/download')
+def export_job_download(job_id):
+    """완료된 내보내기 작업 파일 다운로드"""
+    job = _owned_job(job_id)
+    if job is None or job.status != 'done' or not job.path:
+        return jsonify({
+            'success': False,
+            'error': '내려받을 수 있는 파일이 없습니다.'
+        }), 404
+    
+    return send_file(
+        job.path,
+        mimetype=EXPORT_FORMATS[job.fmt],
+        as_attachment=True,
+        download_name=job.filename
+    )
+
+@app.route('/api/saved-searches', methods=['GET', 'POST'])
+def saved_search_list():
+    """저장된 검색 목록 (GET) / 저장 (POST)"""
+    try:
+        if request.method == 'GET':
+            return jsonify({'success': True, 'searches': saved_searches.list(_request_user())})
+        
+        data = request.get_json()
+        name = (data.get('name') or '').strip()
+        if not name:
+            return jsonify({
+                'success': False,
+                'error': '검색 이름을 입력해주세요.'
+            }), 400
+        search = saved_searches.create(_request_user(), name, normalize_criteria(data))
+        return jsonify({'success': True, 'search': search}), 201
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/saved-searches/<int:search_id>', methods=['DELETE'])
+def saved_search_delete(search_id):
+    """저장된 검색 삭제"""
+    if not saved_searches.delete(_request_user(), search_id):
+        return jsonify({
+            'success': False,
+            'error': '저장된 검색을 찾을 수 없습니다.'
+        }), 404
+    return jsonify({'success': True})
+
+@app.route('/api/sync', methods=['POST'])
+def sync():
+    """
+    입찰공고 동기화 API
+    
+    기간 내 공고를 조회해 로컬 저장소에 반영하고, 새 공고/정정 공고를
+    저장된 검색과 대조해 알림을 보낸다.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        types, start_dt, end_dt, _ = search_params(data)
+        result = sync_bids(g2b_client, bid_store, types, start_dt, end_dt)
+        return jsonify({'success': True, **result})
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -232,14 +587,26 @@ def delete_bids():
         data = request.get_json()
         selected_ids = data.get('selected_ids', [])
         
-        global current_bids
-        # 선택된 항목들을 current_bids에서 제거
-        current_bids = [bid for bid in current_bids if bid['id'] not in selected_ids]
+        if not data.get('result_id'):
+            return jsonify({
+                'success': False,
+                'error': 'result_id가 필요합니다.'
+            }), 400
+        index = results.get(data['result_id'])
+        if index is None:
+            return jsonify({
+                'success': False,
+                'error': '검색 결과가 변경되었습니다. 다시 검색해주세요.'
+            }), 409
+        
+        # 이 검색 결과(result_id)에서만 제거 - 다시 검색할 때는 클라이언트가 exclude_ids로 보냄
+        index.remove(selected_ids)
+        results.save(index)
         
         return jsonify({
             'success': True,
             'message': f'{len(selected_ids)}개 항목이 삭제되었습니다.',
-            'remaining_count': len(current_bids)
+            'remaining_count': len(index)
         })
         
     except Exception as e:
@@ -249,4 +616,5 @@ def delete_bids():
         }), 500
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    port = int(sys.argv[sys.argv.index('--port') + 1]) if '--port' in sys.argv else 5000
+    app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
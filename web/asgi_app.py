@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""
+나라장터 입찰공고 조회 웹 애플리케이션
+ASGI(비동기) 백엔드 API 서버
+
+app.py와 같은 라우트를 제공하지만 upstream 조회를 AsyncG2BClient로
+await 하므로, 응답을 기다리는 검색 요청이 워커 스레드를 점유하지 않는다.
+SQLite(저장소, 공유 캐시)를 쓰는 호출은 다른 워커와 잠금을 다툴 수 있으므로
+run_in_threadpool로 실행해 이벤트 루프를 막지 않는다.
+
+실행: uvicorn asgi_app:app --host 0.0.0.0 --port 5000  (web 디렉토리에서)
+"""
+
+import asyncio
+import hmac
+import os
+import sys
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from starlette.templating import Jinja2Templates
+
+# 프로젝트 루트 디렉토리를 sys.path에 추가
+WEB_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(WEB_DIR))
+import metrics
+import request_timing
+from g2b_client import AsyncG2BClient, G2BClient
+from bid_filter import BidColumns
+from bid_index import BidIndex, CursorError, cursor_result_id
+from agency_index import AgencyIndex, etag_matches
+from bid_rollups import BidRollups, stats_params
+from bid_store import BidStore, sync_bids
+from config import (
+    ADMIN_TOKEN, AGENCY_LIST_LIMIT, ASYNC_MAX_SEARCHES, PROFILE_INTERVAL, UPSTREAM_RATE_BURST, UPSTREAM_RATE_LIMIT
+)
+from export_jobs import ExportJobManager, JobLimitError
+from profiling import AllocationTracker, ProfilerBusyError, SamplingProfiler, folded
+from exporters import EXPORT_FORMATS, check_format, content_disposition, export_filename, stream_export
+from saved_searches import AlertDispatcher, AlertQueue, SavedSearchStore, normalize_criteria
+from shared_cache import RateLimiter, ResultStore, SharedCache
+from request_timing import span
+from search_service import (
+    SearchStream, SearchSummary, aiter_search_chunks, as_of, delta_window,
+    export_bids, fetch_key, page_params, parse_exclude_ids, parse_since, reusable_columns, search_page, search_params
+)
+
+templates = Jinja2Templates(directory=os.path.join(WEB_DIR, 'templates'))
+# Flask 템플릿의 url_for('static', filename=...) 호출 호환
+templates.env.globals['url_for'] = lambda endpoint, filename: f'/static/{filename}'
+
+# 글로벌 변수
+# upstream 응답 캐시/속도 제한/검색 결과는 워커 프로세스끼리 공유 (app.py 참고)
+shared_cache = SharedCache()
+upstream_limiter = RateLimiter(shared_cache, 'upstream', UPSTREAM_RATE_LIMIT, UPSTREAM_RATE_BURST)
+g2b_client = AsyncG2BClient(cache=shared_cache, rate_limiter=upstream_limiter)
+current_columns = None   # 이 워커가 마지막으로 가져온 전체 결과 (BidColumns)
+results = ResultStore(shared_cache)
+export_jobs = ExportJobManager(cache=shared_cache)
+job_client = G2BClient(cache=shared_cache, rate_limiter=upstream_limiter)
+bid_store = BidStore()
+saved_searches = SavedSearchStore(bid_store)
+# 알림 대조와 전송은 백그라운드에서 (검색 요청이 웹훅 전송을 기다리지 않도록)
+bid_store.add_listener(AlertQueue(AlertDispatcher(saved_searches)))
+agency_index = AgencyIndex(bid_store)
+bid_store.add_listener(agency_index)
+bid_rollups = BidRollups(bid_store)
+bid_store.add_listener(bid_rollups)
+search_slots = asyncio.Semaphore(ASYNC_MAX_SEARCHES)
+profiler = SamplingProfiler()
+allocations = AllocationTracker()
+
+metrics.REGISTRY.share(shared_cache)
+metrics.track_cache(shared_cache)
+metrics.track_results(results, lambda: current_columns)
+request_timing.configure_logging()
+
+
+class RequestTimingMiddleware:
+    """
+    라우트별 처리 시간 기록 (app.py의 record_request 참고)
+
+    지표와 Server-Timing 헤더는 응답 시작까지, 요청 로그는 전송이 끝난 뒤 기준이다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        # 라우트 패턴은 라우팅 후에 정해지므로 응답 시작 시점에 채움
+        timing = request_timing.start(scope['method'], 'unmatched')
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                timing.route = getattr(scope.get('route'), 'path', 'unmatched')
+                metrics.HTTP_REQUEST_SECONDS.observe(timing.elapsed(), timing.method, timing.route)
+                metrics.HTTP_REQUESTS.inc(timing.method, timing.route, str(status))
+                metrics.REGISTRY.maybe_publish()
+                message['headers'] = [*message.get('headers', []),
+                                      (b'server-timing', timing.server_timing().encode('latin-1'))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            timing.log(status)
+
+
+def error_response(message, status_code):
+    return JSONResponse({'success': False, 'error': message}, status_code=status_code)
+
+
+def busy_response():
+    return error_response('동시 검색 요청이 많습니다. 잠시 후 다시 시도해주세요.', 503)
+
+
+async def request_data(request: Request):
+    """JSON 본문 (없으면 쿼리 파라미터)"""
+    try:
+        return await request.json()
+    except ValueError:
+        return dict(request.query_params)
+
+
+async def index(request: Request):
+    """메인 페이지"""
+    return templates.TemplateResponse(request, 'index.html')
+
+
+async def search_bids(request: Request):
+    """입찰공고 검색 API"""
+    global current_columns
+    try:
+        data = await request_data(request)
+        limit, cursor, sort, order = page_params(data)
+        result_id = data.get('result_id')
+
+        # 커서 또는 result_id가 있으면 기존 결과를 재조회 없이 페이지 조회
+        if cursor or result_id:
+            index = await run_in_threadpool(results.get, result_id or cursor_result_id(cursor))
+            if index is None:
+                return error_response('검색 결과가 변경되었습니다. 다시 검색해주세요.', 409)
+            page = search_page(index, limit, cursor, sort, order)
+            with span('serialize'):
+                return JSONResponse(page)
+
+        types, start_dt, end_dt, query = search_params(data)
+        since = parse_since(data.get('since'))
+        excluded = parse_exclude_ids(data.get('exclude_ids'))
+        key = fetch_key(data, types)
+        summary = SearchSummary()
+
+        # since 이후 공고만 조회 (app.py 참고)
+        if since is not None:
+            metrics.SEARCH_FETCHES.inc('delta')
+            window = delta_window(since, start_dt, end_dt)
+            delta = []
+            if window is not None:
+                if search_slots.locked():
+                    return busy_response()
+                async with search_slots:
+                    async for chunk in aiter_search_chunks(g2b_client, types, *window):
+                        delta.extend(chunk['items'])
+                        summary.add(chunk)
+                with span('store'):
+                    await run_in_threadpool(bid_store.ingest, delta)
+            with span('columns'):
+                stored = await run_in_threadpool(lambda: list(bid_store.iter_bids(types, start_dt, end_dt)))
+                columns = BidColumns(stored, key, summary.errors, summary.truncated_types)
+                current_columns = columns
+            with span('filter'):
+                index = BidIndex(query.apply(columns))
+                index.remove(excluded)
+                await run_in_threadpool(results.put, index)
+                delta_index = BidIndex(query.filter(delta))
+                delta_index.remove(excluded)
+                changed = search_page(delta_index, None, None, sort, order)['data']
+            with span('serialize'):
+                return JSONResponse({'success': True, 'data': changed, 'count': len(index),
+                                     'result_id': index.result_id, 'next_cursor': None,
+                                     'as_of': as_of(columns), 'errors': summary.errors,
+                                     'truncated': summary.truncated, 'refetched': True, 'delta': True})
+
+        # await 사이에 다른 요청이 current_columns를 바꿀 수 있으므로 지역 변수로 처리
+        columns = current_columns
+        refetched = data.get('refresh') or not reusable_columns(columns, key)
+        metrics.SEARCH_FETCHES.inc('true' if refetched else 'false')
+
+        # 필터만 바뀌었으면 이미 가져온 결과에 다시 적용
+        if refetched:
+            if search_slots.locked():
+                return busy_response()
+            async with search_slots:
+                bids = []
+                async for chunk in aiter_search_chunks(g2b_client, types, start_dt, end_dt):
+                    bids.extend(chunk['items'])
+                    summary.add(chunk)
+            with span('columns'):
+                columns = BidColumns(bids, key, summary.errors, summary.truncated_types)
+                current_columns = columns
+            with span('store'):
+                await run_in_threadpool(bid_store.ingest, bids)
+        else:
+            summary.restore(columns)
+
+        with span('filter'):
+            index = BidIndex(query.apply(columns))
+            index.remove(excluded)
+            await run_in_threadpool(results.put, index)
+        page = search_page(index, limit, None, sort, order)
+        with span('serialize'):
+            return JSONResponse({**page, 'as_of': as_of(columns), 'errors': summary.errors,
+                                 'truncated': summary.truncated, 'refetched': bool(refetched)})
+
+    except (CursorError, ValueError) as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+async def search_bids_stream(request: Request):
+    """입찰공고 스트리밍 검색 API (app.py의 /api/search/stream 참고)"""
+    try:
+        data = await request_data(request)
+        limit, _, sort, order = page_params(data)
+        types, start_dt, end_dt, query = search_params(data)
+        excluded = set(parse_exclude_ids(data.get('exclude_ids')))
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    key = fetch_key(data, types)
+    columns = current_columns
+    refetch = data.get('refresh') or not reusable_columns(columns, key)
+    metrics.SEARCH_FETCHES.inc('true' if refetch else 'false')
+    if refetch and search_slots.locked():
+        return busy_response()
+
+    stream = SearchStream(limit, sse=(data.get('format') == 'sse'
+                                      or 'text/event-stream' in request.headers.get('accept', '')))
+
+    async def search(columns):
+        global current_columns
+        if refetch:
+            bids = []
+            async with search_slots:
+                async for chunk in aiter_search_chunks(g2b_client, types, start_dt, end_dt):
+                    bids.extend(chunk['items'])
+                    items = [bid for bid in query.filter(chunk['items']) if bid['id'] not in excluded]
+                    yield stream.chunk_event({**chunk, 'items': items})
+            with span('columns'):
+                columns = BidColumns(bids, key, stream.summary.errors, stream.summary.truncated_types)
+                current_columns = columns
+            with span('store'):
+                await run_in_threadpool(bid_store.ingest, bids)
+        else:
+            stream.summary.restore(columns)
+
+        with span('filter'):
+            index = BidIndex(query.apply(columns))
+            index.remove(excluded)
+            await run_in_threadpool(results.put, index)
+        yield stream.summary_event(index, sort, order, columns)
+
+    async def generate(columns):
+        # 청크를 보낸 뒤에는 상태 코드를 바꿀 수 없으므로 실패도 마지막 이벤트로 알림
+        try:
+            async for event in search(columns):
+                yield event
+        except Exception as e:
+            yield stream.failure_event(e)
+
+    return StreamingResponse(generate(columns), media_type=stream.mimetype,
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+async def metrics_endpoint(request: Request):
+    """Prometheus 지표 (모든 워커 합산)"""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def admin_error(request: Request):
+    """관리자 요청이 아니면 오류 응답 (app.py의 _admin_error 참고)"""
+    if not ADMIN_TOKEN:
+        return error_response('관리자 기능이 꺼져 있습니다.', 404)
+    if not hmac.compare_digest(request.headers.get('x-admin-token', ''), ADMIN_TOKEN):
+        return error_response('관리자 토큰이 올바르지 않습니다.', 403)
+    return None
+
+
+async def admin_profile(request: Request):
+    """샘플링 프로파일 (app.py의 /api/admin/profile 참고, 기다리는 동안 이벤트 루프도 샘플링됨)"""
+    error = admin_error(request)
+    if error:
+        return error
+    try:
+        data = await request_data(request)
+        stacks = await run_in_threadpool(profiler.profile, float(data.get('seconds', 10)),
+                                         interval=float(data.get('interval', PROFILE_INTERVAL)),
+                                         idle=bool(data.get('idle', False)))
+    except ProfilerBusyError as e:
+        return error_response(str(e), 409)
+    except (TypeError, ValueError) as e:
+        return error_response(str(e), 400)
+
+    if data.get('format') == 'json':
+        return JSONResponse({'success': True, 'pid': os.getpid(), 'samples': profiler.samples, 'stacks': stacks})
+    return PlainTextResponse(folded(stacks),
+                             headers={'Content-Disposition': f'attachment; filename="profile-{os.getpid()}.folded"'})
+
+
+async def admin_tracemalloc(request: Request):
+    """할당 추적 (app.py의 /api/admin/tracemalloc 참고)"""
+    error = admin_error(request)
+    if error:
+        return error
+    try:
+        if request.method == 'POST':
+            data = await request_data(request)
+            action = data.get('action', 'start')
+            if action == 'start':
+                allocations.start(int(data.get('frames', 10)))
+            elif action == 'reset':
+                allocations.reset()
+            elif action == 'stop':
+                allocations.stop()
+            else:
+                raise ValueError(f'지원하지 않는 동작입니다: {action}')
+            return JSONResponse({'success': True, 'pid': os.getpid(), 'tracing': allocations.running})
+
+        params = request.query_params
+        view = params.get('view', 'top')
+        options = {'limit': int(params.get('limit', 20)), 'key_type': params.get('key_type', 'lineno')}
+        if params.get('files') is not None:
+            options['files'] = [name for name in params['files'].split(',') if name]
+        method = allocations.diff if view == 'diff' else allocations.top
+        stats = await run_in_threadpool(method, **options)
+        return JSONResponse({'success': True, 'pid': os.getpid(), 'view': view, 'stats': stats})
+    except (TypeError, ValueError) as e:
+        return error_response(str(e), 400)
+
+
+async def get_agencies(request: Request):
+    """기관 목록 조회 API (기관 색인 자동완성, upstream을 조회하지 않음)"""
+    try:
+        etag = await run_in_threadpool(lambda: agency_index.etag)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=headers)
+
+        items, total = await run_in_threadpool(
+            agency_index.search,
+            request.query_params.get('q', ''),
+            institution=request.query_params.get('institution', 'demand'),
+            limit=int(request.query_params.get('limit', AGENCY_LIST_LIMIT))
+        )
+        return JSONResponse({
+            'success': True,
+            'agencies': [item['name'] for item in items],
+            'items': items,
+            'total': total
+        }, headers=headers)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+async def get_stats(request: Request):
+    """집계 API (저장소에 반영된 공고의 일별·입찰 구분별·기관별 공고 수와 예정가격)"""
+    try:
+        params = stats_params(request.query_params)
+        stats = await run_in_threadpool(bid_rollups.query, **params)
+        return JSONResponse({'success': True, 'group_by': params['group_by'], 'bucket': params['bucket'], **stats})
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+async def export_results(request: Request, fmt=None):
+    """내보내기 API (xlsx, csv, parquet; app.py의 /api/export 참고)"""
+    try:
+        data = await request_data(request)
+        fmt = fmt or data.get('format', 'xlsx')
+        check_format(fmt)
+
+        # 기간 전체 내보내기는 백그라운드 작업으로 등록 (작업 스레드에서는 동기 클라이언트 사용)
+        if data.get('background') and data.get('source') == 'upstream':
+            types, start_dt, end_dt, query = search_params(data)
+            job = await run_in_threadpool(export_jobs.submit_upstream, request_user(request), fmt,
+                                          job_client, types, start_dt, end_dt, query)
+            return JSONResponse({'success': True, **job_payload(job)}, status_code=202)
+
+        if not data.get('result_id'):
+            return error_response('result_id가 필요합니다.', 400)
+        index = await run_in_threadpool(results.get, data['result_id'])
+        if index is None:
+            return error_response('검색 결과를 찾을 수 없습니다. 다시 검색해주세요.', 404)
+        bids = export_bids(index, data.get('selected_ids', []))
+        if bids is None:
+            return error_response('내보낼 데이터가 없습니다.', 400)
+
+        if data.get('background'):
+            job = await run_in_threadpool(export_jobs.submit_results, request_user(request), fmt, bids)
+            return JSONResponse({'success': True, **job_payload(job)}, status_code=202)
+
+        # 동기 제너레이터는 Starlette가 스레드 풀에서 순회하므로 이벤트 루프를 막지 않음
+        return StreamingResponse(
+            stream_export(bids, fmt),
+            media_type=EXPORT_FORMATS[fmt],
+            headers={'Content-Disposition': content_disposition(export_filename(fmt))}
+        )
+    except JobLimitError as e:
+        return error_response(str(e), 429)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+def request_user(request: Request):
+    """요청 사용자 - 작업/저장된 검색의 소유자 (X-User-Id 헤더, 없으면 접속 주소)"""
+    return request.headers.get('x-user-id') or (request.client.host if request.client else 'anonymous')
+
+
+def job_payload(job):
+    """작업 상태 응답 (상태/다운로드 URL 포함)"""
+    payload = job.to_dict()
+    payload['status_url'] = f'/api/export/jobs/{job.id}'
+    payload['download_url'] = f'/api/export/jobs/{job.id}/download' if job.status == 'done' else None
+    return payload
+
+
+async def owned_job(request: Request):
+    """요청자의 작업 (다른 사용자의 작업이면 None)"""
+    job = await run_in_threadpool(export_jobs.get, request.path_params['job_id'])
+    if job is None or job.owner != request_user(request):
+        return None
+    return job
+
+
+async def export_job_status(request: Request):
+    """내보내기 작업 상태 조회 (GET) / 취소 (DELETE)"""
+    job = await owned_job(request)
+    if job is None:
+        return error_response('작업을 찾을 수 없습니다.', 404)
+
+    if request.method == 'DELETE':
+        await run_in_threadpool(export_jobs.cancel, job.id)
+
+    return JSONResponse({'success': True, **job_payload(job)})
+
+
+async def export_job_download(request: Request):
+    """완료된 내보내기 작업 파일 다운로드"""
+    job = await owned_job(request)
+    if job is None or job.status != 'done' or not job.path:
+        return error_response('내려받을 수 있는 파일이 없습니다.', 404)
+
+    return FileResponse(job.path, media_type=EXPORT_FORMATS[job.fmt],
+                        headers={'Content-Disposition': content_disposition(job.filename)})
+
+
+async def export_excel(request: Request):
+    """Excel 내보내기 API"""
+    return await export_results(request, fmt='xlsx')
+
+
+async def saved_search_list(request: Request):
+    """저장된 검색 목록 (GET) / 저장 (POST)"""
+    try:
+        if request.method == 'GET':
+            searches = await run_in_threadpool(saved_searches.list, request_user(request))
+            return JSONResponse({'success': True, 'searches': searches})
+
+        data = await request_data(request)
+        name = (data.get('name') or '').strip()
+        if not name:
+            return error_response('검색 이름을 입력해주세요.', 400)
+        search = await run_in_threadpool(saved_searches.create, request_user(request), name,
+                                         normalize_criteria(data))
+        return JSONResponse({'success': True, 'search': search}, status_code=201)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+async def saved_search_delete(request: Request):
+    """저장된 검색 삭제"""
+    deleted = await run_in_threadpool(saved_searches.delete, request_user(request),
+                                      request.path_params['search_id'])
+    if not deleted:
+        return error_response('저장된 검색을 찾을 수 없습니다.', 404)
+    return JSONResponse({'success': True})
+
+
+async def sync(request: Request):
+    """입찰공고 동기화 API (app.py의 /api/sync 참고, 작업 스레드에서 동기 클라이언트 사용)"""
+    try:
+        data = await request_data(request)
+        types, start_dt, end_dt, _ = search_params(data)
+        result = await run_in_threadpool(sync_bids, job_client, bid_store, types, start_dt, end_dt)
+        return JSONResponse({'success': True, **result})
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+async def delete_bids(request: Request):
+    """선택된 항목 삭제 API"""
+    try:
+        data = await request_data(request)
+        selected_ids = data.get('selected_ids', [])
+
+        if not data.get('result_id'):
+            return error_response('result_id가 필요합니다.', 400)
+        index = await run_in_threadpool(results.get, data['result_id'])
+        if index is None:
+            return error_response('검색 결과가 변경되었습니다. 다시 검색해주세요.', 409)
+
+        # 이 검색 결과(result_id)에서만 제거 (app.py 참고)
+        index.remove(selected_ids)
+        await run_in_threadpool(results.save, index)
+
+        return JSONResponse({
+            'success': True,
+            'message': f'{len(selected_ids)}개 항목이 삭제되었습니다.',
+            'remaining_count': len(index)
+        })
+    except Exception as e:
+        return error_response(str(e), 500)
+
+
+app = Starlette(
+    routes=[
+        Route('/', index),
+        Route('/api/search', search_bids, methods=['POST']),
+        Route('/api/search/stream', search_bids_stream, methods=['GET', 'POST']),
+        Route('/api/agencies', get_agencies),
+        Route('/api/stats', get_stats),
+        Route('/api/export', export_results, methods=['POST']),
+        Route('/api/export/excel', export_excel, methods=['POST']),
+        Route('/api/export/jobs/{job_id}', export_job_status, methods=['GET', 'DELETE']),
+        Route('/api/export/jobs/{job_id}/download', export_job_download),
+        Route('/api/saved-searches', saved_search_list, methods=['GET', 'POST']),
+        Route('/api/saved-searches/{search_id:int}', saved_search_delete, methods=['DELETE']),
+        Route('/api/sync', sync, methods=['POST']),
+        Route('/api/delete', delete_bids, methods=['POST']),
+        Route('/metrics', metrics_endpoint),
+        Route('/api/admin/profile', admin_profile, methods=['POST']),
+        Route('/api/admin/tracemalloc', admin_tracemalloc, methods=['GET', 'POST']),
+        Mount('/static', app=StaticFiles(directory=os.path.join(WEB_DIR, 'static')), name='static'),
+    ],
+    middleware=[Middleware(RequestTimingMiddleware),
+                Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])]
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -1,9 +1,213 @@
 // 나라장터 입찰공고 검색 시스템 JavaScript
 
+function escapeHtml(value) {
+    return String(value ?? '').replace(/[&<>"']/g, ch => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
+}
+
+// 검색 결과 표 - 메모리의 결과 배열에서 보이는 행(과 앞뒤 여유 행)만 그리는 가상 스크롤
+class ResultGrid {
+    constructor(scroller, tbody, renderRow, options = {}) {
+        this.scroller = scroller;
+        this.tbody = tbody;
+        this.renderRow = renderRow;          // (item, index) => '<tr class="grid-row">...</tr>'
+        this.columns = options.columns || 8;
+        this.overscan = options.overscan || 10;
+        this.onNearEnd = options.onNearEnd || null;
+        this.rowHeight = options.rowHeight || 72;
+        this.measured = false;
+        this.items = [];
+        this.range = null;
+        this.frame = null;
+
+        this.scroller.addEventListener('scroll', () => this.scheduleRender(), { passive: true });
+        window.addEventListener('resize', () => this.scheduleRender(true));
+    }
+
+    // 결과 배열 교체 (같은 배열에 행을 추가/삭제한 뒤에도 호출)
+    setItems(items, keepScroll = false) {
+        this.items = items;
+        if (!keepScroll) {
+            this.scroller.scrollTop = 0;
+        }
+        this.scheduleRender(true);
+    }
+
+    // 보이는 행 다시 그리기 (선택 상태 변경 등)
+    refresh() {
+        this.scheduleRender(true);
+    }
+
+    // 스크롤/변경을 프레임당 한 번의 DOM 쓰기로 모음
+    scheduleRender(force = false) {
+        if (force) {
+            this.range = null;
+        }
+        if (this.frame !== null) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = null;
+            this.render();
+        });
+    }
+
+    visibleRange() {
+        const top = Math.max(0, this.scroller.scrollTop - this.tbody.offsetTop);
+        const height = Math.max(this.scroller.clientHeight, window.innerHeight);
+        const count = Math.ceil(height / this.rowHeight) + 2 * this.overscan;
+        // 행이 줄어 스크롤 위치가 끝을 넘어도 마지막 행들은 그림
+        const first = Math.min(Math.floor(top / this.rowHeight), this.items.length - count + this.overscan);
+        const start = Math.max(0, first - this.overscan);
+        return [start, Math.min(this.items.length, start + count)];
+    }
+
+    render() {
+        const [start, end] = this.visibleRange();
+        if (this.range && this.range[0] === start && this.range[1] === end) return;
+        this.range = [start, end];
+
+        const rows = [];
+        for (let index = start; index < end; index++) {
+            rows.push(this.renderRow(this.items[index], index));
+        }
+        // 그리지 않은 행 자리는 위아래 빈 행의 높이로 채움
+        this.tbody.innerHTML = this.spacer(start * this.rowHeight) + rows.join('') +
+            this.spacer((this.items.length - end) * this.rowHeight);
+
+        // 처음 보이는 행에서 실제 행 높이를 한 번 재서 보정
+        if (!this.measured && rows.length > 0) {
+            const height = this.tbody.querySelector('tr.grid-row').offsetHeight;
+            if (height > 0) {
+                this.measured = true;
+                if (Math.abs(height - this.rowHeight) >= 1) {
+                    this.rowHeight = height;
+                    this.scheduleRender(true);
+                }
+            }
+        }
+
+        if (this.onNearEnd && end >= this.items.length - this.overscan) {
+            this.onNearEnd();
+        }
+    }
+
+    spacer(height) {
+        if (height <= 0) return '';
+        return `<tr class="grid-spacer" aria-hidden="true" style="height: ${height}px"><td colspan="${this.columns}"></td></tr>`;
+    }
+}
+
+// 검색 결과 캐시 (IndexedDB) - (필터 조건, 입찰 구분, 공고일)별로 결과와 조회 시각(as_of)을 보관
+class SearchCache {
+    constructor(maxAgeDays = 7) {
+        this.maxAge = maxAgeDays * 24 * 60 * 60 * 1000;
+        this.db = null;
+        this.available = typeof window.indexedDB !== 'undefined';
+    }
+
+    static key(filterKey, type, day) {
+        return `${filterKey}|${type}|${day}`;
+    }
+
+    async open() {
+        if (this.db) return this.db;
+        this.db = await new Promise((resolve, reject) => {
+            const request = indexedDB.open('g2b-search-cache', 1);
+            request.onupgradeneeded = () => {
+                request.result.createObjectStore('days', { keyPath: 'key' }).createIndex('saved_at', 'saved_at');
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+        this.prune();
+        return this.db;
+    }
+
+    // 주어진 키의 기록 (없는 키는 undefined)
+    async getMany(keys) {
+        const db = await this.open();
+        const store = db.transaction('days').objectStore('days');
+        return Promise.all(keys.map(key => new Promise((resolve, reject) => {
+            const request = store.get(key);
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        })));
+    }
+
+    // 기록을 한 트랜잭션으로 저장
+    async putMany(records) {
+        const db = await this.open();
+        const transaction = db.transaction('days', 'readwrite');
+        const store = transaction.objectStore('days');
+        const savedAt = Date.now();
+        records.forEach(record => store.put({ ...record, saved_at: savedAt }));
+        return new Promise((resolve, reject) => {
+            transaction.oncomplete = () => resolve();
+            transaction.onerror = () => reject(transaction.error);
+        });
+    }
+
+    // 삭제한 항목을 기록에서 빼고 id를 남김 (다음 갱신에서 exclude_ids로 보냄) - idsByKey: Map(키 → id 목록)
+    async removeBids(idsByKey) {
+        const db = await this.open();
+        const transaction = db.transaction('days', 'readwrite');
+        const store = transaction.objectStore('days');
+        idsByKey.forEach((ids, key) => {
+            const request = store.get(key);
+            request.onsuccess = () => {
+                const record = request.result;
+                if (!record) return;
+                const removed = new Set(ids);
+                record.bids = record.bids.filter(bid => !removed.has(bid.id));
+                record.deleted = [...new Set([...(record.deleted || []), ...ids])];
+                store.put(record);
+            };
+        });
+        return new Promise((resolve, reject) => {
+            transaction.oncomplete = () => resolve();
+            transaction.onerror = () => reject(transaction.error);
+        });
+    }
+
+    // 오래된 기록 정리
+    prune() {
+        const range = IDBKeyRange.upperBound(Date.now() - this.maxAge);
+        const request = this.db.transaction('days', 'readwrite').objectStore('days').index('saved_at').openCursor(range);
+        request.onsuccess = () => {
+            const cursor = request.result;
+            if (cursor) {
+                cursor.delete();
+                cursor.continue();
+            }
+        };
+    }
+}
+
 class BidSearchApp {
     constructor() {
         this.selectedItems = new Set();
         this.allData = [];
+        this.pageSize = 100;
+        this.resultId = null;
+        this.nextCursor = null;
+        this.totalCount = 0;
+        this.backgroundExportThreshold = 20000;
+        this.loadingMore = false;
+        this.cache = new SearchCache();
+        this.cacheContext = null;   // 캐시로 검색한 결과면 { filterKey, types, days, deleted }
+        this.deleted = { fetchKey: null, ids: new Set() };   // 같은 기간/입찰 구분을 다시 검색할 때 뺄 삭제 항목
+        this.cacheMaxDays = 31;              // 이보다 긴 기간은 캐시하지 않음
+        this.cachePageSize = 1000;           // 캐시에 저장할 나머지 결과를 받는 페이지 크기 (SEARCH_MAX_PAGE_SIZE)
+        this.streamSummary = null;
+        this.agencyLimit = 20;               // 기관 자동완성 후보 수
+        this.agencyTimer = null;
+        this.agencyRequest = 0;
+        this.grid = new ResultGrid(
+            document.getElementById('resultsScroll'),
+            document.getElementById('resultsTableBody'),
+            (item, index) => this.createTableRow(item, index),
+            { onNearEnd: () => this.loadMore() }
+        );
         this.init();
     }
 
@@ -29,6 +233,22 @@ class BidSearchApp {
             this.toggleSelectAll(e.target.checked);
         });
 
+        // 행 체크박스 (다시 그려지는 행마다 등록하지 않고 tbody에서 한 번에 처리)
+        document.getElementById('resultsTableBody').addEventListener('change', (e) => {
+            if (!e.target.classList.contains('row-checkbox')) return;
+            this.handleRowSelection(e.target.dataset.id, e.target.checked);
+            e.target.closest('tr').classList.toggle('selected', e.target.checked);
+        });
+
+        // 기관명 자동완성 (입력이 멈추면 서버의 기관 색인에서 후보 조회)
+        document.getElementById('agencyFilter').addEventListener('input', (e) => {
+            clearTimeout(this.agencyTimer);
+            this.agencyTimer = setTimeout(() => this.loadAgencies(e.target.value), 150);
+        });
+        document.getElementById('institution').addEventListener('change', () => {
+            this.loadAgencies(document.getElementById('agencyFilter').value);
+        });
+
         // 버튼 이벤트
         document.getElementById('selectAllBtn').addEventListener('click', () => {
             this.selectAll();
@@ -41,6 +261,10 @@ class BidSearchApp {
         document.getElementById('exportExcelBtn').addEventListener('click', () => {
             this.exportToExcel();
         });
+
+        document.getElementById('loadMoreBtn').addEventListener('click', () => {
+            this.loadMore();
+        });
     }
 
     updateCurrentTime() {
@@ -68,20 +292,21 @@ class BidSearchApp {
         return date.toISOString().split('T')[0];
     }
 
-    async loadAgencies() {
+    async loadAgencies(q = '') {
+        // 늦게 도착한 이전 입력의 응답은 버림 (ETag로 바뀌지 않은 목록은 브라우저 캐시에서 재사용)
+        const request = ++this.agencyRequest;
         try {
-            const response = await axios.get('/api/agencies');
-            if (response.data.success) {
-                const select = document.getElementById('agencyFilter');
-                select.innerHTML = '<option value="all">전체</option>';
-                
-                response.data.agencies.forEach(agency => {
-                    const option = document.createElement('option');
-                    option.value = agency;
-                    option.textContent = agency;
-                    select.appendChild(option);
-                });
-            }
+            const response = await axios.get('/api/agencies', {
+                params: {
+                    q: q.trim(),
+                    institution: document.getElementById('institution').value,
+                    limit: this.agencyLimit
+                }
+            });
+            if (request !== this.agencyRequest || !response.data.success) return;
+            document.getElementById('agencyOptions').innerHTML = response.data.items.map(item =>
+                `<option value="${escapeHtml(item.name)}" label="${escapeHtml(`${item.name} (${item.count.toLocaleString()}건)`)}"></option>`
+            ).join('');
         } catch (error) {
             console.error('기관 목록 로드 실패:', error);
         }
@@ -92,23 +317,35 @@ class BidSearchApp {
             start_date: document.getElementById('startDate').value,
             end_date: document.getElementById('endDate').value,
             bid_type: document.getElementById('bidType').value,
-            agency_filter: document.getElementById('agencyFilter').value
+            agency_filter: document.getElementById('agencyFilter').value.trim() || 'all',
+            institution: document.getElementById('institution').value,
+            keyword: document.getElementById('keyword').value,
+            min_price: document.getElementById('minPrice').value,
+            max_price: document.getElementById('maxPrice').value,
+            deadline_from: document.getElementById('deadlineFrom').value,
+            deadline_to: document.getElementById('deadlineTo').value,
+            limit: this.pageSize
         };
 
+        // 삭제는 검색 결과(result_id)에만 반영되므로, 같은 기간을 다시 검색하면 exclude_ids로 보냄
+        const fetchKey = JSON.stringify([formData.start_date, formData.end_date, formData.bid_type]);
+        if (this.deleted.fetchKey !== fetchKey) {
+            this.deleted = { fetchKey, ids: new Set() };
+        }
+        if (this.deleted.ids.size > 0) {
+            formData.exclude_ids = [...this.deleted.ids];
+        }
+
         this.showLoading(true);
         this.hideResults();
+        this.cacheContext = null;
 
         try {
-            const response = await axios.post('/api/search', formData);
-            
-            if (response.data.success) {
-                this.allData = response.data.data;
-                this.displayResults(this.allData);
-                this.showSuccessMessage(`${response.data.count}개의 입찰공고를 찾았습니다.`);
-            } else {
-                this.showErrorMessage(response.data.error || '검색에 실패했습니다.');
-                this.showEmptyState();
+            if (await this.cachedSearch(formData)) {
+                return;
             }
+
+            await this.freshSearch(formData);
         } catch (error) {
             console.error('검색 실패:', error);
             this.showErrorMessage('서버 오류가 발생했습니다. 잠시 후 다시 시도해주세요.');
@@ -118,30 +355,372 @@ class BidSearchApp {
         }
     }
 
+    // 캐시 없이 검색 (스트리밍을 지원하면 도착하는 대로 표시, 아니면 첫 페이지)
+    // 성공하면 요약(result_id, as_of, errors)을 돌려줌
+    async freshSearch(formData) {
+        if (this.supportsStreaming()) {
+            return this.streamSearch(formData);
+        }
+
+        const response = await axios.post('/api/search', formData);
+
+        if (!response.data.success) {
+            this.showErrorMessage(response.data.error || '검색에 실패했습니다.');
+            this.showEmptyState();
+            return null;
+        }
+        this.allData = response.data.data;
+        this.resultId = response.data.result_id;
+        this.nextCursor = response.data.next_cursor;
+        this.totalCount = response.data.count;
+        this.displayResults(this.allData);
+        if (response.data.errors.length > 0) {
+            this.showWarningMessage(`일부 조회에 실패했습니다 (${response.data.errors.length}건).`);
+        }
+        if (response.data.truncated) {
+            this.showWarningMessage('검색 결과가 너무 많아 일부만 가져왔습니다. 기간이나 조건을 좁혀주세요.');
+        }
+        if (response.data.count > 0) {
+            this.showSuccessMessage(`${response.data.count}개의 입찰공고를 찾았습니다.`);
+        }
+        return response.data;
+    }
+
+    searchDays(startDate, endDate) {
+        const days = [];
+        const end = new Date(`${endDate}T00:00:00Z`);
+        for (let day = new Date(`${startDate}T00:00:00Z`); day <= end; day.setUTCDate(day.getUTCDate() + 1)) {
+            days.push(this.formatDate(day));
+        }
+        return days;
+    }
+
+    // 캐시를 거치는 검색 - 캐시가 있으면 바로 표시한 뒤 since 이후 공고만 받아 합침
+    // 캐시가 없으면 일반 검색으로 표시하고 나머지 결과까지 받아 저장
+    // (캐시를 쓸 수 없는 조건이면 false를 돌려주고 기존 경로로 검색)
+    async cachedSearch(formData) {
+        if (!this.cache.available || !formData.start_date || !formData.end_date) return false;
+        const days = this.searchDays(formData.start_date, formData.end_date);
+        if (days.length === 0 || days.length > this.cacheMaxDays) return false;
+
+        const types = formData.bid_type === 'all' ? ['servc', 'cnstwk', 'thng'] : [formData.bid_type];
+        const { start_date, end_date, bid_type, limit, exclude_ids, ...filters } = formData;
+        const filterKey = JSON.stringify(filters);
+        const keys = types.flatMap(type => days.map(day => SearchCache.key(filterKey, type, day)));
+        const request = { ...formData };
+
+        let records;
+        try {
+            records = await this.cache.getMany(keys);
+        } catch (error) {
+            console.warn('검색 캐시를 읽지 못했습니다:', error);
+            return false;
+        }
+
+        // 사용자가 삭제한 항목은 서버 결과와 count에서도 빼도록 요청
+        const deleted = new Map(records.filter(Boolean).map(record => [record.key, record.deleted || []]));
+        const excluded = [...new Set([...(exclude_ids || []), ...[...deleted.values()].flat()])];
+        if (excluded.length > 0) request.exclude_ids = excluded;
+        const context = { filterKey, types, days, deleted };
+
+        if (records.every(Boolean)) {
+            const cached = new Map();
+            records.forEach(record => record.bids.forEach(bid => cached.set(bid.id, bid)));
+            this.showLoading(false);
+            this.resultId = null;
+            this.nextCursor = null;
+            this.totalCount = cached.size;
+            this.displayResults(this.sortBids([...cached.values()]));
+
+            const since = records.reduce((min, record) => record.as_of < min ? record.as_of : min, records[0].as_of);
+            try {
+                const response = await axios.post('/api/search', { ...request, since });
+                if (response.data.success) {
+                    const added = response.data.data.filter(bid => !cached.has(bid.id)).length;
+                    response.data.data.forEach(bid => cached.set(bid.id, bid));
+                    // 서버 결과 수와 다르면(서버 저장소가 비었거나 캐시가 오래됨) 전체를 다시 받음
+                    if (cached.size === response.data.count) {
+                        this.applyCachedResult(response.data, [...cached.values()]);
+                        this.cacheContext = context;
+                        // 일부 조회가 실패했으면 조회 시각을 앞당기지 않음 (다음 검색에서 다시 확인)
+                        if (response.data.errors.length === 0) {
+                            this.saveCache(context, this.allData, response.data.as_of);
+                        }
+                        this.showSuccessMessage(`${response.data.count}개의 입찰공고를 찾았습니다.` +
+                            (added > 0 ? ` (새 공고 ${added}건)` : ''));
+                        return true;
+                    }
+                }
+            } catch (error) {
+                // 갱신하지 못하면 result_id가 없어 삭제/내보내기를 할 수 없으므로 일반 검색으로 다시 받음
+                console.warn('새 공고 확인 실패:', error);
+            }
+            this.showLoading(true);
+        }
+
+        const summary = await this.freshSearch(request);
+        if (summary) {
+            this.cacheContext = context;
+            this.persistResult(context, summary);
+        }
+        return true;
+    }
+
+    // 일반 검색으로 받은 결과를 캐시에 저장 - 첫 페이지만 받았으면 나머지 페이지를 result_id로 이어 받음
+    async persistResult(context, summary) {
+        // 일부 조회가 실패했으면 저장하지 않음 (다음 검색에서 다시 확인)
+        if (!summary.result_id || summary.errors.length > 0) return;
+
+        const bids = new Map(this.allData.map(bid => [bid.id, bid]));
+        let cursor = this.nextCursor;
+        try {
+            while (cursor) {
+                const response = await axios.post('/api/search', {
+                    result_id: summary.result_id,
+                    cursor,
+                    limit: this.cachePageSize
+                });
+                if (!response.data.success) return;
+                response.data.data.forEach(bid => bids.set(bid.id, bid));
+                cursor = response.data.next_cursor;
+            }
+        } catch (error) {
+            console.warn('검색 캐시에 저장할 결과를 받지 못했습니다:', error);
+            return;
+        }
+        // 그 사이 다른 검색을 시작했으면 저장하지 않음
+        if (this.cacheContext !== context) return;
+        this.saveCache(context, [...bids.values()], summary.as_of);
+    }
+
+    // 캐시로 그린 표를 갱신 결과로 교체 (스크롤과 선택은 유지)
+    applyCachedResult(response, bids) {
+        this.resultId = response.result_id;
+        this.nextCursor = null;
+        this.totalCount = response.count;
+        if (bids.length === 0) {
+            this.allData = [];
+            this.showEmptyState();
+            return;
+        }
+        this.allData = this.sortBids(bids);
+        this.grid.setItems(this.allData, true);
+        this.updateResultCount(this.totalCount);
+        this.updateSelectAllButton();
+        this.updateLoadMoreButton();
+    }
+
+    // 서버 기본 정렬과 같은 순서 (공고일시, 공고번호 내림차순)
+    sortBids(bids) {
+        return bids.sort((a, b) =>
+            (b.bidNtceDt || '').localeCompare(a.bidNtceDt || '') || (b.bidNtceNo || '').localeCompare(a.bidNtceNo || ''));
+    }
+
+    // (입찰 구분, 공고일)별로 나눠 저장 - 공고가 없는 날도 조회했다는 기록으로 남김
+    saveCache({ filterKey, types, days, deleted }, bids, asOf) {
+        const groups = new Map(types.flatMap(type => days.map(day => [SearchCache.key(filterKey, type, day), []])));
+        const removed = new Set([...deleted.values()].flat());
+        bids.forEach(bid => {
+            const group = groups.get(this.cacheKeyOf(filterKey, bid));
+            if (group && !removed.has(bid.id)) group.push(bid);
+        });
+        const records = [...groups].map(([key, group]) => ({ key, bids: group, as_of: asOf, deleted: deleted.get(key) || [] }));
+        this.cache.putMany(records).catch(error => console.warn('검색 캐시를 저장하지 못했습니다:', error));
+    }
+
+    cacheKeyOf(filterKey, bid) {
+        return SearchCache.key(filterKey, bid.id.split('_')[0], (bid.bidNtceDt || '').slice(0, 10));
+    }
+
+    // 캐시로 검색한 결과에서 삭제한 항목을 캐시에서도 뺌 (다음 갱신에서 다시 나타나지 않도록)
+    forgetCached(bids) {
+        const { filterKey, deleted } = this.cacheContext;
+        const idsByKey = new Map();
+        bids.forEach(bid => {
+            const key = this.cacheKeyOf(filterKey, bid);
+            if (!idsByKey.has(key)) idsByKey.set(key, []);
+            idsByKey.get(key).push(bid.id);
+            deleted.set(key, [...(deleted.get(key) || []), bid.id]);
+        });
+        this.cache.removeBids(idsByKey).catch(error => console.warn('검색 캐시를 갱신하지 못했습니다:', error));
+    }
+
+    supportsStreaming() {
+        return typeof window.fetch === 'function' &&
+            typeof window.ReadableStream === 'function' &&
+            typeof window.TextDecoder === 'function';
+    }
+
+    async streamSearch(formData) {
+        // 입찰 구분/페이지가 도착할 때마다 행을 추가하는 증분 렌더링 경로
+        const response = await fetch('/api/search/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/x-ndjson'
+            },
+            body: JSON.stringify(formData)
+        });
+
+        if (!response.ok) {
+            const body = await response.json().catch(() => ({}));
+            throw new Error(body.error || `HTTP ${response.status}`);
+        }
+
+        this.allData = [];
+        this.resultId = null;
+        this.nextCursor = null;
+        this.totalCount = 0;
+        this.streamSummary = null;
+        this.selectedItems.clear();
+        this.grid.setItems(this.allData);
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+
+            lines.filter(line => line.trim()).forEach(line => {
+                this.handleStreamEvent(JSON.parse(line));
+            });
+        }
+
+        if (buffer.trim()) {
+            this.handleStreamEvent(JSON.parse(buffer));
+        }
+        // summary 없이 끝났으면 (연결 끊김 등) 실패로 처리
+        if (!this.streamSummary) {
+            throw new Error('검색 결과 요약을 받지 못했습니다.');
+        }
+        return this.streamSummary;
+    }
+
+    handleStreamEvent(event) {
+        if (event.event === 'chunk') {
+            if (event.items.length === 0) return;
+
+            const offset = this.allData.length;
+            this.appendRows(event.items);
+
+            if (offset === 0) {
+                this.showLoading(false);
+                this.showResults();
+            }
+            this.updateResultCount(this.allData.length);
+        } else if (event.event === 'error' && event.fatal) {
+            // 서버에서 검색이 중간에 실패함 - summary가 오지 않으므로 검색 실패로 처리
+            throw new Error(event.error);
+        } else if (event.event === 'error') {
+            console.warn(`${event.bid_type} ${event.page}페이지 조회 실패:`, event.error);
+        } else if (event.event === 'summary') {
+            this.streamSummary = event;
+            this.resultId = event.result_id;
+            this.totalCount = event.count;
+            this.nextCursor = event.next_cursor || null;
+
+            // 도착 순서대로 그린 행을 정렬된 첫 페이지로 교체 (선택 상태 유지)
+            if (event.data) {
+                this.allData = event.data;
+                this.grid.setItems(this.allData);
+                this.updateLoadMoreButton();
+            }
+
+            if (this.totalCount === 0) {
+                this.showEmptyState();
+            } else {
+                this.showResults();
+                this.updateResultCount(this.totalCount);
+                this.updateSelectAllButton();
+                this.showSuccessMessage(`${this.totalCount}개의 입찰공고를 찾았습니다.`);
+            }
+
+            if (event.errors.length > 0) {
+                this.showWarningMessage(`일부 조회에 실패했습니다 (${event.errors.length}건).`);
+            }
+            if (event.truncated) {
+                this.showWarningMessage('검색 결과가 너무 많아 일부만 가져왔습니다. 기간이나 조건을 좁혀주세요.');
+            }
+        }
+    }
+
+    async loadMore() {
+        // 스크롤이 끝에 가까워지면 표에서도 호출됨
+        if (!this.nextCursor || this.loadingMore) return;
+
+        const button = document.getElementById('loadMoreBtn');
+        button.disabled = true;
+        this.loadingMore = true;
+
+        try {
+            const response = await axios.post('/api/search', {
+                result_id: this.resultId,
+                cursor: this.nextCursor,
+                limit: this.pageSize
+            });
+
+            if (response.data.success) {
+                this.nextCursor = response.data.next_cursor;
+                this.totalCount = response.data.count;
+                this.appendRows(response.data.data);
+                this.updateResultCount(this.totalCount);
+                this.updateSelectAllButton();
+            } else {
+                this.showErrorMessage(response.data.error || '다음 페이지를 불러오지 못했습니다.');
+            }
+        } catch (error) {
+            console.error('다음 페이지 로드 실패:', error);
+            const message = error.response && error.response.data && error.response.data.error;
+            this.showErrorMessage(message || '서버 오류가 발생했습니다.');
+        } finally {
+            button.disabled = false;
+            this.loadingMore = false;
+            this.updateLoadMoreButton();
+        }
+    }
+
     displayResults(data) {
         if (!data || data.length === 0) {
             this.showEmptyState();
             return;
         }
 
-        const tbody = document.getElementById('resultsTableBody');
-        tbody.innerHTML = '';
-        
-        data.forEach((item, index) => {
-            const row = this.createTableRow(item, index);
-            tbody.appendChild(row);
-        });
+        this.selectedItems.clear();
+        this.allData = data;
+        this.grid.setItems(this.allData);
+        this.updateLoadMoreButton();
 
-        this.updateResultCount(data.length);
+        this.updateResultCount(this.totalCount || data.length);
         this.showResults();
-        this.selectedItems.clear();
         this.updateSelectAllButton();
     }
 
+    appendRows(data) {
+        // 결과 배열 끝에 추가 (보이는 범위에 들어온 행만 다음 프레임에 그려짐)
+        for (const item of data) {
+            this.allData.push(item);
+        }
+        this.grid.setItems(this.allData, true);
+        this.updateLoadMoreButton();
+    }
+
+    updateLoadMoreButton() {
+        const remaining = this.totalCount - this.allData.length;
+        const button = document.getElementById('loadMoreBtn');
+        button.classList.toggle('hidden', !this.nextCursor);
+        document.getElementById('loadMoreCount').textContent = remaining > 0 ? `(${remaining}건 남음)` : '';
+    }
+
     createTableRow(item, index) {
-        const row = document.createElement('tr');
-        row.className = 'hover:bg-gray-50 transition-colors duration-200';
-        row.dataset.id = item.id;
+        const selected = this.selectedItems.has(item.id);
+        const id = escapeHtml(item.id);
+        const title = escapeHtml(item.bidNtceNm);
 
         // 날짜 포맷팅
         const bidDate = this.formatDisplayDate(item.bidNtceDt);
@@ -153,27 +732,27 @@ class BidSearchApp {
         // 입찰 구분 뱃지 클래스
         const badgeClass = this.getBadgeClass(item.bidType);
 
-        row.innerHTML = `
+        return `<tr class="grid-row hover:bg-gray-50 transition-colors duration-200${selected ? ' selected' : ''}" data-id="${id}">
             <td class="px-6 py-4 whitespace-nowrap">
                 <input type="checkbox" class="row-checkbox rounded border-gray-300 text-blue-600 focus:ring-blue-500" 
-                       data-id="${item.id}">
+                       data-id="${id}" ${selected ? 'checked' : ''}>
             </td>
             <td class="px-6 py-4 whitespace-nowrap">
                 <span class="px-2 inline-flex text-xs leading-5 font-semibold rounded-full ${badgeClass}">
-                    ${item.bidType}
+                    ${escapeHtml(item.bidType)}
                 </span>
             </td>
             <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
                 ${bidDate}
             </td>
             <td class="px-6 py-4">
-                <div class="text-sm font-medium text-gray-900 max-w-md truncate" title="${item.bidNtceNm}">
-                    ${item.bidNtceNm}
+                <div class="text-sm font-medium text-gray-900 max-w-md truncate" title="${title}">
+                    ${title}
                 </div>
-                <div class="text-sm text-gray-500">공고번호: ${item.bidNtceNo}</div>
+                <div class="text-sm text-gray-500 whitespace-nowrap">공고번호: ${escapeHtml(item.bidNtceNo)}</div>
             </td>
             <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
-                ${item.dminsttNm}
+                ${escapeHtml(item.dminsttNm)}
             </td>
             <td class="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
                 ${closeDate}
@@ -183,7 +762,7 @@ class BidSearchApp {
             </td>
             <td class="px-6 py-4 whitespace-nowrap text-sm">
                 ${item.bidNtceUrl ? 
-                    `<a href="${item.bidNtceUrl}" target="_blank" 
+                    `<a href="${escapeHtml(item.bidNtceUrl)}" target="_blank" 
                        class="text-blue-600 hover:text-blue-900 flex items-center">
                         <i class="fas fa-external-link-alt mr-1"></i>
                         상세보기
@@ -191,16 +770,7 @@ class BidSearchApp {
                     '<span class="text-gray-400">링크없음</span>'
                 }
             </td>
-        `;
-
-        // 체크박스 이벤트 리스너
-        const checkbox = row.querySelector('.row-checkbox');
-        checkbox.addEventListener('change', (e) => {
-            this.handleRowSelection(e.target.dataset.id, e.target.checked);
-            row.classList.toggle('selected', e.target.checked);
-        });
-
-        return row;
+        </tr>`;
     }
 
     getBadgeClass(bidType) {
@@ -215,14 +785,15 @@ class BidSearchApp {
     formatDisplayDate(dateString) {
         if (!dateString) return '-';
         try {
-            const date = new Date(dateString);
-            return date.toLocaleDateString('ko-KR', {
+            // 행을 그릴 때마다 호출되므로 포맷터는 한 번만 만듦
+            this.dateFormat = this.dateFormat || new Intl.DateTimeFormat('ko-KR', {
                 month: '2-digit',
                 day: '2-digit',
                 hour: '2-digit',
                 minute: '2-digit',
                 hour12: false
-            }).replace(/\./g, '/');
+            });
+            return this.dateFormat.format(new Date(dateString)).replace(/\./g, '/');
         } catch {
             return dateString.substring(0, 16);
         }
@@ -254,18 +825,15 @@ class BidSearchApp {
     }
 
     toggleSelectAll(selectAll) {
-        const checkboxes = document.querySelectorAll('.row-checkbox');
-        checkboxes.forEach(checkbox => {
-            checkbox.checked = selectAll;
-            const row = checkbox.closest('tr');
-            row.classList.toggle('selected', selectAll);
-            
-            if (selectAll) {
-                this.selectedItems.add(checkbox.dataset.id);
-            } else {
-                this.selectedItems.delete(checkbox.dataset.id);
+        // 불러온 결과 전체를 선택 집합에 반영하고 보이는 행만 다시 그림
+        if (selectAll) {
+            for (const item of this.allData) {
+                this.selectedItems.add(item.id);
             }
-        });
+        } else {
+            this.selectedItems.clear();
+        }
+        this.grid.refresh();
         this.updateSelectAllButton();
     }
 
@@ -276,7 +844,7 @@ class BidSearchApp {
 
     updateSelectAllButton() {
         const headerCheckbox = document.getElementById('headerCheckbox');
-        const totalRows = document.querySelectorAll('.row-checkbox').length;
+        const totalRows = this.allData.length;
         const selectedCount = this.selectedItems.size;
         
         if (selectedCount === 0) {
@@ -303,21 +871,23 @@ class BidSearchApp {
 
         try {
             const response = await axios.post('/api/delete', {
+                result_id: this.resultId,
                 selected_ids: Array.from(this.selectedItems)
             });
 
             if (response.data.success) {
-                // 선택된 행들을 DOM에서 제거
-                this.selectedItems.forEach(id => {
-                    const row = document.querySelector(`tr[data-id="${id}"]`);
-                    if (row) {
-                        row.remove();
-                    }
-                });
-
+                this.selectedItems.forEach(id => this.deleted.ids.add(id));
+                if (this.cacheContext) {
+                    this.forgetCached(this.allData.filter(item => this.selectedItems.has(item.id)));
+                }
+                // 선택된 행을 결과 배열에서 빼고 보이는 범위만 다시 그림
+                this.allData = this.allData.filter(item => !this.selectedItems.has(item.id));
+                this.grid.setItems(this.allData, true);
+                this.totalCount = response.data.remaining_count;
                 this.selectedItems.clear();
                 this.updateSelectAllButton();
                 this.updateResultCount(response.data.remaining_count);
+                this.updateLoadMoreButton();
                 this.showSuccessMessage(response.data.message);
             } else {
                 this.showErrorMessage(response.data.error || '삭제에 실패했습니다.');
@@ -329,19 +899,26 @@ class BidSearchApp {
     }
 
     async exportToExcel() {
-        const selectedIds = this.selectedItems.size > 0 ? 
-            Array.from(this.selectedItems) : 
-            this.allData.map(item => item.id);
+        // 선택 항목이 없으면 빈 목록을 보내 서버의 전체 검색 결과를 내보냄
+        const selectedIds = Array.from(this.selectedItems);
+        const exportCount = selectedIds.length || this.totalCount;
 
-        if (selectedIds.length === 0) {
+        if (exportCount === 0) {
             this.showWarningMessage('내보낼 데이터가 없습니다.');
             return;
         }
 
+        // 건수가 많으면 백그라운드 작업으로 생성한 뒤 내려받음
+        if (exportCount > this.backgroundExportThreshold) {
+            await this.runExportJob({ format: 'xlsx', result_id: this.resultId, selected_ids: selectedIds }, exportCount);
+            return;
+        }
+
         this.showLoading(true, '엑셀 파일을 생성하는 중...');
 
         try {
             const response = await axios.post('/api/export/excel', {
+                result_id: this.resultId,
                 selected_ids: selectedIds
             }, {
                 responseType: 'blob'
@@ -364,7 +941,7 @@ class BidSearchApp {
             document.body.removeChild(link);
             window.URL.revokeObjectURL(url);
             
-            this.showSuccessMessage(`${selectedIds.length}개 항목이 엑셀 파일로 저장되었습니다.`);
+            this.showSuccessMessage(`${exportCount}개 항목이 엑셀 파일로 저장되었습니다.`);
         } catch (error) {
             console.error('엑셀 내보내기 실패:', error);
             this.showErrorMessage('엑셀 파일 생성에 실패했습니다.');
@@ -373,6 +950,34 @@ class BidSearchApp {
         }
     }
 
+    async runExportJob(payload, exportCount) {
+        this.showLoading(true, '내보내기 작업을 등록하는 중...');
+
+        try {
+            const response = await axios.post('/api/export', { ...payload, background: true });
+            let job = response.data;
+
+            while (job.status === 'queued' || job.status === 'running') {
+                this.showLoading(true, `엑셀 파일을 생성하는 중... (${job.rows_written.toLocaleString()}/${exportCount.toLocaleString()}행)`);
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                job = (await axios.get(job.status_url)).data;
+            }
+
+            if (job.status === 'done') {
+                window.location.href = job.download_url;
+                this.showSuccessMessage(`${job.rows_written}개 항목이 엑셀 파일로 저장되었습니다.`);
+            } else {
+                this.showErrorMessage(job.error || '내보내기 작업이 완료되지 않았습니다.');
+            }
+        } catch (error) {
+            console.error('내보내기 작업 실패:', error);
+            const message = error.response && error.response.data && error.response.data.error;
+            this.showErrorMessage(message || '엑셀 파일 생성에 실패했습니다.');
+        } finally {
+            this.showLoading(false);
+        }
+    }
+
     updateResultCount(count) {
         document.getElementById('resultCount').textContent = `${count}건`;
     }
@@ -446,7 +1051,7 @@ class BidSearchApp {
     }
 }
 
-// 앱 초기화
+// 앱 초기화 (벤치마크 등에서 쓸 수 있도록 window.bidSearchApp으로 노출)
 document.addEventListener('DOMContentLoaded', () => {
-    new BidSearchApp();
+    window.bidSearchApp = new BidSearchApp();
 });
\ No newline at end of file